@@ -0,0 +1,25 @@
+#
+# PartCAD, 2025
+#
+# Licensed under Apache License, Version 2.0.
+#
+
+@cli
+Feature: `pc system cache` commands
+
+  Background: Initialize Private PartCAD project
+    Given I am in "/tmp/sandbox/behave" directory
+    And I have temporary $HOME in "/tmp/sandbox/home"
+
+  @pc-system-cache @success
+  Scenario: Show cache statistics
+    When I run "partcad system cache stats"
+    Then the command should exit with a status code of "0"
+    And STDOUT should contain "DONE: CacheStats: global:"
+
+  @pc-system-cache @success
+  Scenario: Collect cache garbage
+    When I run "partcad system cache gc --max-size 0"
+    Then the command should exit with a status code of "0"
+    And STDOUT should match the regex "Removed \d+ cache entries"
+    And STDOUT should contain "Cache size: 0.00MB"
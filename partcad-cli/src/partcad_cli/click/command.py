@@ -10,10 +10,7 @@ import logging
 import locale
 import platform
 import re
-import sentry_sdk
 import sys
-import sentry_sdk.session
-import yaml
 
 import partcad as pc
 from partcad_cli.click.loader import Loader
@@ -54,7 +51,7 @@ option_groups = [
     },
     {
         "name": "Dependency management options",
-        "options": ["--force-update", "--offline", "--internal-state-dir"],
+        "options": ["--force-update", "--offline", "--lazy-loading", "--internal-state-dir"],
     },
     {
         "name": "API keys",
@@ -71,7 +68,7 @@ option_groups = [
     },
     {
         "name": "Sandbox options",
-        "options": ["--python-sandbox"],
+        "options": ["--python-sandbox", "--python-worker-pool", "--python-worker-pool-size", "--render-batch"],
     },
     {
         "name": "Telemetry options",
@@ -89,7 +86,7 @@ option_groups = [
     },
     {
         "name": "Performance options",
-        "options": ["--threads-max"],
+        "options": ["--threads-max", "--process-pool-size", "--jobs", "--max-memory"],
     },
     {
         "name": "Caching options",
@@ -97,9 +94,16 @@ option_groups = [
             "--cache",
             "--cache-max-entry-size",
             "--cache-min-entry-size",
+            "--cache-max-size",
+            "--cache-eviction-policy",
+            "--cache-memory-max",
             "--cache-memory-max-entry-size",
             "--cache-memory-double-cache-max-entry-size",
             "--cache-dependencies-ignore",
+            "--cache-dependencies-paranoid",
+            "--cache-hash-algorithm",
+            "--cache-serialization",
+            "--cache-compression",
         ],
     },
     {
@@ -176,6 +180,33 @@ click.rich_click.COMMAND_GROUPS = {
     show_envvar=True,
     help="Maximum number of processing threads to use (not a strict limit)",
 )
+@click.option(
+    "--process-pool-size",
+    type=int,
+    default=None,
+    show_envvar=True,
+    help=(
+        "Number of worker processes running CPU-bound geometry code"
+        " (defaults to the number of CPU threads minus one, 0 to use threads)"
+    ),
+)
+@click.option(
+    "--jobs",
+    type=int,
+    default=None,
+    show_envvar=True,
+    help="Maximum number of shapes to build, render or test at the same time",
+)
+@click.option(
+    "--max-memory",
+    type=int,
+    default=None,
+    show_envvar=True,
+    help=(
+        "Estimated memory in bytes that the shapes built, rendered or tested at the same time may use"
+        " (defaults to half of the physical memory, 0 means no limit)"
+    ),
+)
 @click.option(
     "--cache",
     is_flag=True,
@@ -197,6 +228,27 @@ click.rich_click.COMMAND_GROUPS = {
     show_envvar=True,
     help="Minimum size of a single file cache entry (except test results) in bytes (defaults to 104857600 or 100MB)",
 )
+@click.option(
+    "--cache-max-size",
+    type=int,
+    default=None,
+    show_envvar=True,
+    help="Total size of the filesystem cache in bytes, 0 means no limit (defaults to 5368709120 or 5GB)",
+)
+@click.option(
+    "--cache-eviction-policy",
+    default=None,
+    show_envvar=True,
+    type=click.Choice(["lru", "lfu"]),
+    help="Evict least recently used or least frequently used filesystem cache entries first (defaults to lru)",
+)
+@click.option(
+    "--cache-memory-max",
+    type=int,
+    default=None,
+    show_envvar=True,
+    help="Total memory used by shapes in bytes, 0 means no limit (defaults to 2147483648 or 2GB)",
+)
 @click.option(
     "--cache-memory-max-entry-size",
     type=int,
@@ -218,6 +270,34 @@ click.rich_click.COMMAND_GROUPS = {
     show_envvar=True,
     help="Ignore broken dependencies and cache at your own risk",
 )
+@click.option(
+    "--cache-dependencies-paranoid",
+    is_flag=True,
+    default=None,
+    show_envvar=True,
+    help="Always read the files shapes depend on instead of trusting their size and modification time",
+)
+@click.option(
+    "--cache-hash-algorithm",
+    default=None,
+    show_envvar=True,
+    type=click.Choice(["md5", "sha1", "sha256", "blake2b", "blake2s", "blake3", "xxh3_128"]),
+    help="Algorithm used to produce cache keys (defaults to md5)",
+)
+@click.option(
+    "--cache-serialization",
+    default=None,
+    show_envvar=True,
+    type=click.Choice(["brep", "pickle"]),
+    help="Preferred serialization of shapes in the filesystem cache (defaults to brep)",
+)
+@click.option(
+    "--cache-compression",
+    default=None,
+    show_envvar=True,
+    type=click.Choice(["none", "zstd", "lz4"]),
+    help="Compression of filesystem cache entries (defaults to none)",
+)
 @click.option(
     "--python-sandbox",
     default=None,
@@ -225,6 +305,26 @@ click.rich_click.COMMAND_GROUPS = {
     type=click.Choice(["none", "pypy", "conda"]),
     help="Sandboxing environment for invoking python scripts(defaults to conda)",
 )
+@click.option(
+    "--python-worker-pool",
+    is_flag=True,
+    default=None,
+    show_envvar=True,
+    help="Keep pre-warmed sandbox interpreters running between jobs instead of starting one per job",
+)
+@click.option(
+    "--python-worker-pool-size",
+    type=int,
+    default=None,
+    show_envvar=True,
+    help="Number of sandbox interpreters to keep running per sandbox environment (defaults to 2)",
+)
+@click.option(
+    "--render-batch/--no-render-batch",
+    default=None,
+    show_envvar=True,
+    help="Render all the shapes of a package in one long-lived sandbox interpreter (enabled by default)",
+)
 @click.option(
     "--internal-state-dir",
     type=str,
@@ -246,6 +346,15 @@ click.rich_click.COMMAND_GROUPS = {
     default=None,
     help="Operate in offline mode, without any repo updates",
 )
+@click.option(
+    "--lazy-loading/--no-lazy-loading",
+    default=None,
+    show_envvar=True,
+    help=(
+        "Only instantiate the sketches, parts and assemblies of a package when they are requested"
+        " (enabled by default)"
+    ),
+)
 @click.option(
     "--google-api-key",
     type=str,
@@ -372,16 +481,30 @@ def cli(ctx: click.Context, verbose: bool, quiet: bool, no_ansi: bool, path: str
     # Pull the parameters from the environment before doing anything
     user_config_options = [
         ("PC_THREADS_MAX", "threads_max"),
+        ("PC_PROCESS_POOL_SIZE", "process_pool_size"),
+        ("PC_JOBS", "jobs"),
+        ("PC_MAX_MEMORY", "max_memory"),
         ("PC_CACHE_FILES", "cache"),
         ("PC_CACHE_FILES_MAX_ENTRY_SIZE", "cache_max_entry_size"),
         ("PC_CACHE_FILES_MIN_ENTRY_SIZE", "cache_min_entry_size"),
+        ("PC_CACHE_FILES_MAX_SIZE", "cache_max_size"),
+        ("PC_CACHE_FILES_EVICTION_POLICY", "cache_eviction_policy"),
+        ("PC_CACHE_MEMORY_MAX", "cache_memory_max"),
         ("PC_CACHE_MEMORY_MAX_ENTRY_SIZE", "cache_memory_max_entry_size"),
         ("PC_CACHE_MEMORY_DOUBLE_CACHE_MAX_ENTRY_SIZE", "cache_memory_double_cache_max_entry_size"),
         ("PC_CACHE_DEPENDENCIES_IGNORE", "cache_dependencies_ignore"),
+        ("PC_CACHE_DEPENDENCIES_PARANOID", "cache_dependencies_paranoid"),
+        ("PC_CACHE_HASH_ALGORITHM", "cache_hash_algorithm"),
+        ("PC_CACHE_FILES_SERIALIZATION", "cache_serialization"),
+        ("PC_CACHE_FILES_COMPRESSION", "cache_compression"),
         ("PC_PYTHON_SANDBOX", "python_sandbox"),
+        ("PC_PYTHON_WORKER_POOL", "python_worker_pool"),
+        ("PC_PYTHON_WORKER_POOL_SIZE", "python_worker_pool_size"),
+        ("PC_RENDER_BATCH", "render_batch"),
         ("PC_INTERNAL_STATE_DIR", "internal_state_dir"),
         ("PC_FORCE_UPDATE", "force_update"),
         ("PC_OFFLINE", "offline"),
+        ("PC_LAZY_LOADING", "lazy_loading"),
         ("PC_GOOGLE_API_KEY", "google_api_key"),
         ("PC_OPENAI_API_KEY", "openai_api_key"),
         ("PC_OLLAMA_NUM_THREAD", "ollama_num_thread"),
@@ -445,8 +568,11 @@ def cli(ctx: click.Context, verbose: bool, quiet: bool, no_ansi: bool, path: str
                 cli_span.set_status(pc.telemetry.trace.StatusCode.ERROR)
                 cli_span.end()
                 cli_span = None
-            # TODO(clairbee): investigate how is this value related to PC_TELEMETRY_SENTRY_SHUTDOWN_TIMEOUT and make it configurable
-            sentry_sdk.flush(timeout=1.5)
+            # Only loaded if the telemetry is sent to Sentry
+            sentry_sdk = sys.modules.get("sentry_sdk", None)
+            if sentry_sdk:
+                # TODO(clairbee): investigate how is this value related to PC_TELEMETRY_SENTRY_SHUTDOWN_TIMEOUT and make it configurable
+                sentry_sdk.flush(timeout=1.5)
 
         atexit.register(telemetry_atexit)
 
@@ -466,16 +592,30 @@ def cli(ctx: click.Context, verbose: bool, quiet: bool, no_ansi: bool, path: str
 
         user_config_options = [
             ("PC_THREADS_MAX", "threads_max"),
+            ("PC_PROCESS_POOL_SIZE", "process_pool_size"),
+            ("PC_JOBS", "jobs"),
+            ("PC_MAX_MEMORY", "max_memory"),
             ("PC_CACHE_FILES", "cache"),
             ("PC_CACHE_FILES_MAX_ENTRY_SIZE", "cache_max_entry_size"),
             ("PC_CACHE_FILES_MIN_ENTRY_SIZE", "cache_min_entry_size"),
+            ("PC_CACHE_FILES_MAX_SIZE", "cache_max_size"),
+            ("PC_CACHE_FILES_EVICTION_POLICY", "cache_eviction_policy"),
+            ("PC_CACHE_MEMORY_MAX", "cache_memory_max"),
             ("PC_CACHE_MEMORY_MAX_ENTRY_SIZE", "cache_memory_max_entry_size"),
             ("PC_CACHE_MEMORY_DOUBLE_CACHE_MAX_ENTRY_SIZE", "cache_memory_double_cache_max_entry_size"),
             ("PC_CACHE_DEPENDENCIES_IGNORE", "cache_dependencies_ignore"),
+            ("PC_CACHE_DEPENDENCIES_PARANOID", "cache_dependencies_paranoid"),
+            ("PC_CACHE_HASH_ALGORITHM", "cache_hash_algorithm"),
+            ("PC_CACHE_FILES_SERIALIZATION", "cache_serialization"),
+            ("PC_CACHE_FILES_COMPRESSION", "cache_compression"),
             ("PC_PYTHON_SANDBOX", "python_sandbox"),
+            ("PC_PYTHON_WORKER_POOL", "python_worker_pool"),
+            ("PC_PYTHON_WORKER_POOL_SIZE", "python_worker_pool_size"),
+            ("PC_RENDER_BATCH", "render_batch"),
             ("PC_INTERNAL_STATE_DIR", "internal_state_dir"),
             ("PC_FORCE_UPDATE", "force_update"),
             ("PC_OFFLINE", "offline"),
+            ("PC_LAZY_LOADING", "lazy_loading"),
             ("PC_GOOGLE_API_KEY", "google_api_key"),
             ("PC_OPENAI_API_KEY", "openai_api_key"),
             ("PC_OLLAMA_NUM_THREAD", "ollama_num_thread"),
@@ -516,6 +656,7 @@ def cli(ctx: click.Context, verbose: bool, quiet: bool, no_ansi: bool, path: str
         def get_partcad_context():
             nonlocal ctx, path
             from partcad.globals import init
+            import yaml
 
             try:
                 return pc.init(path, user_config=pc.user_config)
@@ -568,7 +709,9 @@ def main():
     try:
         cli()
     except Exception as e:
-        sentry_sdk.capture_exception(e)
+        sentry_sdk = sys.modules.get("sentry_sdk", None)
+        if sentry_sdk:
+            sentry_sdk.capture_exception(e)
         raise e
 
 
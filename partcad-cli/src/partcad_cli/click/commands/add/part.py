@@ -8,7 +8,6 @@ import rich_click as click
 from pathlib import Path
 
 import partcad as pc
-from partcad.actions.part import add_part_action
 from ...cli_context import CliContext
 
 
@@ -82,6 +81,9 @@ def cli(click_ctx: click.Context, desc: str | None, kind: str, provider: str | N
         if provider:
             config["provider"] = provider
 
+        # Imported here as it takes a while to load
+        from partcad.actions.part import add_part_action
+
         # pc.logging.Process() is done inside "add_part_action"
         add_part_action(package_obj, kind, path, config)
         click.echo(f"Part '{Path(path).stem}' added to the project.")
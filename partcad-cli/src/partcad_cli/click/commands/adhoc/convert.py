@@ -8,7 +8,6 @@ import rich_click as click
 from pathlib import Path
 
 import partcad as pc
-from partcad.adhoc.convert import convert_cad_file
 from ...cli_context import CliContext
 
 
@@ -77,6 +76,9 @@ def cli(cli_ctx: CliContext, input_type, output_type, input_filename, output_fil
         if not output_filename:
             output_filename = Path(input_filename).stem + f".{output_type}"
 
+        # Imported here as it takes a while to load
+        from partcad.adhoc.convert import convert_cad_file
+
         # Perform conversion
         try:
             pc.logging.info(f"Converting {input_filename} ({input_type}) to {output_filename} ({output_type})...")
@@ -7,7 +7,6 @@
 import rich_click as click
 
 import partcad as pc
-from partcad.actions.part import convert_part_action
 from ..cli_context import CliContext
 
 
@@ -59,6 +58,9 @@ def cli(cli_ctx: CliContext, object_name: str, target_format: str, package: str,
 
         pc.logging.info(f"Starting conversion: '{object_name}' -> '{target_format}', dry_run={dry_run}")
 
+        # Imported here as it takes a while to load
+        from partcad.actions.part import convert_part_action
+
         try:
             # pc.logging.Process() is done inside "convert_part_action"
             convert_part_action(package_obj, object_name, target_format, output_dir=output_dir, dry_run=dry_run)
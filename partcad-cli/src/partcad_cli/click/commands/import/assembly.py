@@ -2,7 +2,6 @@ from pathlib import Path
 import rich_click as click
 
 import partcad as pc
-from partcad.actions.assembly import import_assy_action
 from ...cli_context import CliContext
 
 # assembly_type: [file_extensions]
@@ -59,6 +58,9 @@ def cli(cli_ctx: CliContext, package: str, assembly_file: str, desc: str):
 
         config = {"desc": desc} if desc else {}
 
+        # Imported here as it takes a while to load
+        from partcad.actions.assembly import import_assy_action
+
         try:
             assy_name = import_assy_action(package_obj, assembly_type, assembly_file, config)
             click.echo(f"Assembly '{assy_name}' imported successfully.")
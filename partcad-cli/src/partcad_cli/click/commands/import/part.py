@@ -8,7 +8,6 @@ import rich_click as click
 from pathlib import Path
 
 import partcad as pc
-from partcad.actions.part import import_part_action
 from ...commands.convert import SUPPORTED_CONVERT_FORMATS
 from ...cli_context import CliContext
 
@@ -83,6 +82,9 @@ def cli(cli_ctx: CliContext, package: str, existing_part: str, target_format: st
         pc.logging.info(f"Importing part: {existing_part} ({part_type})")
         name = file_path.stem
         config = {"desc": desc} if desc else {}
+        # Imported here as it takes a while to load
+        from partcad.actions.part import import_part_action
+
         try:
             # pc.logging.Process() is done inside import_part_action()
             import_part_action(package_obj, part_type, name, existing_part, config, target_format)
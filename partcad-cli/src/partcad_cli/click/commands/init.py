@@ -10,7 +10,6 @@
 
 import rich_click as click
 import os, sys
-from packaging.specifiers import SpecifierSet, InvalidSpecifier
 
 import partcad as pc
 from ..cli_context import CliContext
@@ -134,6 +133,9 @@ def cli(cli_ctx: CliContext, click_ctx: click.rich_context.RichContext, **kwargs
             dst_path = "partcad.yaml"
 
         if kwargs.get("interactive"):
+            # Imported here as it takes a while to load
+            from packaging.specifiers import SpecifierSet, InvalidSpecifier
+
             pc.logging.info("Validating package configuration...")
             for key in kwargs:
                 if isinstance(kwargs[key], str) and "default: " in kwargs[key]:
@@ -21,6 +21,13 @@ from ..cli_context import CliContext
     help="Produce a verbal output instead of a visual one",
     show_envvar=True,
 )
+@click.option(
+    "--explain-rebuild",
+    "explain_rebuild",
+    is_flag=True,
+    help="Generate the object and list which parts and assemblies were reused from the cache or rebuilt",
+    show_envvar=True,
+)
 @click.option(
     "-P",
     "--package",
@@ -70,7 +77,9 @@ from ..cli_context import CliContext
 @click.argument("object", type=str, required=False)  # help="Part (default), assembly or scene to test"
 @click.pass_context
 @click.pass_obj
-def cli(cli_ctx: CliContext, context, verbal, package, interface, assembly, sketch, scene, params, object):
+def cli(
+    cli_ctx: CliContext, context, verbal, explain_rebuild, package, interface, assembly, sketch, scene, params, object
+):
     with pc.telemetry.set_context(cli_ctx.otel_context):
         ctx: pc.Context = cli_ctx.get_partcad_context()
 
@@ -103,7 +112,13 @@ def cli(cli_ctx: CliContext, context, verbal, package, interface, assembly, sket
             if obj is None:
                 pc.logging.error(f"Object {path} is not found")
             else:
-                if verbal:
+                if explain_rebuild and hasattr(obj, "explain_rebuild"):
+                    import asyncio
+
+                    asyncio.run(obj.get_wrapped(ctx))
+                    for depth, name, status in obj.explain_rebuild():
+                        pc.logging.info(f"{'  ' * depth}{name}: {status}")
+                elif verbal:
                     summary = obj.get_summary(package_obj)
                     pc.logging.info("Summary: %s" % summary)
                     # TODO-99: @alexanderilyin: Test with dedicated test scenario
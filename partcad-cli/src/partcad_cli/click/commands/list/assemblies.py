@@ -44,7 +44,7 @@ def cli(cli_ctx: CliContext, recursive: bool, package: str) -> None:
             for project_name in packages:
                 project = ctx.projects[project_name]
 
-                for assy_name, assy in project.assemblies.items():
+                for assy_name, desc in project.get_assembly_descs().items():
                     line = "\t"
                     if recursive:
                         line += f"{project_name}"
@@ -52,7 +52,7 @@ def cli(cli_ctx: CliContext, recursive: bool, package: str) -> None:
                     line += f"{assy_name}"
                     line += " " + " " * (35 - len(assy_name))
 
-                    desc = assy.desc if assy.desc is not None else ""
+                    desc = desc if desc is not None else ""
                     desc = desc.replace("\n", "\n" + " " * (84 if recursive else 44))
                     line += f"{desc}"
                     output += line + "\n"
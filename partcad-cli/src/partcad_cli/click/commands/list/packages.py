@@ -4,6 +4,8 @@
 # Licensed under Apache License, Version 2.0.
 #
 
+import time
+
 import rich_click as click
 
 import partcad as pc
@@ -20,10 +22,11 @@ When no recursion in requested, it shows the current package if and only if it h
 
 @click.command(help="List imported packages")
 @click.option("-r", "--recursive", is_flag=True, help="Recursively process all imported packages")
+@click.option("--timings", is_flag=True, help="Show the time it took to fetch and parse each package")
 @click.argument("package", type=str, required=False, default=".")  # help='Package to retrieve the object from'
 @click.pass_obj
 @pc.telemetry.start_as_current_span("list packages")
-def cli(cli_ctx: CliContext, recursive: bool, package: str):
+def cli(cli_ctx: CliContext, recursive: bool, timings: bool, package: str):
     with pc.telemetry.set_context(cli_ctx.otel_context):
         ctx: pc.Context = cli_ctx.get_partcad_context()
 
@@ -38,11 +41,13 @@ def cli(cli_ctx: CliContext, recursive: bool, package: str):
             # TODO-103: Show source (URL, PATH) of the package, probably use prettytable as well
             pkg_count = 0
 
+            start = time.perf_counter()
             if recursive:
                 all_packages = ctx.get_all_packages(parent_name=package, has_stuff=True)
                 packages = [p["name"] for p in all_packages]
             else:
                 packages = [package]
+            elapsed = time.perf_counter() - start
 
             output = "PartCAD packages:\n"
             for project_name in packages:
@@ -53,14 +58,18 @@ def cli(cli_ctx: CliContext, recursive: bool, package: str):
                 if padding_size < 4:
                     padding_size = 4
                 line += " " * padding_size
+                if timings:
+                    line += "%8.3fs    " % ctx.package_timings.get(project_name, 0.0)
                 desc = project.desc
                 if hasattr(project, "url"):
                     desc += f"\n{project.url}"
-                desc = desc.replace("\n", "\n" + " " * 68)
+                desc = desc.replace("\n", "\n" + " " * (80 if timings else 68))
                 line += "%s" % desc
                 output += line + "\n"
                 pkg_count = pkg_count + 1
 
             if pkg_count < 1:
                 output += "\t<none>\n"
+            if timings:
+                output += "Discovered %d packages in %.3fs\n" % (len(ctx.package_timings), elapsed)
             pc.logging.info(output)
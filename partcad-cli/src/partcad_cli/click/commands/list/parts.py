@@ -45,7 +45,7 @@ def cli(cli_ctx: CliContext, recursive: bool, package: str) -> None:
             for project_name in packages:
                 project = ctx.projects[project_name]
 
-                for part_name, part in project.parts.items():
+                for part_name, desc in project.get_part_descs().items():
                     line = "\t"
                     if recursive:
                         line += "%s" % project_name
@@ -53,7 +53,7 @@ def cli(cli_ctx: CliContext, recursive: bool, package: str) -> None:
                     line += "%s" % part_name
                     line += " " + " " * (35 - len(part_name))
 
-                    desc = part.desc if part.desc is not None else ""
+                    desc = desc if desc is not None else ""
                     desc = desc.replace("\n", "\n" + " " * (84 if recursive else 44))
                     line += "%s" % desc
                     output += line + "\n"
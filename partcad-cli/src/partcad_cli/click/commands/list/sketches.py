@@ -44,7 +44,7 @@ def cli(cli_ctx: CliContext, recursive: bool, package: str) -> None:
             for project_name in packages:
                 project = ctx.projects[project_name]
 
-                for sketch_name, sketch in project.sketches.items():
+                for sketch_name, desc in project.get_sketch_descs().items():
                     line = "\t"
                     if recursive:
                         line += "%s" % project_name
@@ -52,7 +52,7 @@ def cli(cli_ctx: CliContext, recursive: bool, package: str) -> None:
                     line += "%s" % sketch_name
                     line += " " + " " * (35 - len(sketch_name))
 
-                    desc = sketch.desc if sketch.desc is not None else ""
+                    desc = desc if desc is not None else ""
                     desc = desc.replace("\n", "\n" + " " * (80 if recursive else 44))
                     line += "%s" % desc
                     output += line + "\n"
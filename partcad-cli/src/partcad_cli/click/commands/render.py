@@ -148,3 +148,5 @@ def cli(
                         format=format,
                         output_dir=output_dir,
                     )
+
+            ctx.cache_renders.log_stats()
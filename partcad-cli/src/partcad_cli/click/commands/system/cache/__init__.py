@@ -0,0 +1,21 @@
+#
+# PartCAD, 2025
+#
+# Licensed under Apache License, Version 2.0.
+#
+
+import os
+import rich_click as click
+
+
+from .. import SystemCommands
+
+
+class CacheCommands(SystemCommands):
+    COMMANDS_FOLDER_PATH = os.path.join(SystemCommands.COMMANDS_FOLDER_PATH, "cache")
+    COMMANDS_PACKAGE_NAME = SystemCommands.COMMANDS_PACKAGE_NAME + ".cache"
+
+
+@click.command(cls=CacheCommands, help="Filesystem cache commands")
+def cli() -> None:
+    pass
@@ -0,0 +1,27 @@
+#
+# PartCAD, 2025
+#
+# Licensed under Apache License, Version 2.0.
+#
+
+import rich_click as click
+
+import partcad as pc
+from partcad.cache_index import get_cache_index
+
+
+@click.option(
+    "--max-size",
+    type=int,
+    default=None,
+    help="Shrink the cache to this size in bytes instead of the configured limit, 0 removes all entries.",
+)
+@click.command(help="Synchronize the cache index with the filesystem and evict entries above the size limit")
+@click.pass_obj
+def cli(cli_ctx, max_size: int) -> None:
+    with pc.telemetry.set_context(cli_ctx.otel_context):
+        with pc.logging.Process("CacheGC", "global"):
+            index = get_cache_index(pc.user_config)
+            removed_count, removed_bytes = index.gc(max_size)
+            pc.logging.info(f"Removed {removed_count} cache entries ({removed_bytes / 1048576.0:.2f}MB)")
+            pc.logging.info(f"Cache size: {index.get_total_size() / 1048576.0:.2f}MB")
@@ -0,0 +1,27 @@
+#
+# PartCAD, 2025
+#
+# Licensed under Apache License, Version 2.0.
+#
+
+import rich_click as click
+
+import partcad as pc
+from partcad.cache_index import get_cache_index
+
+
+@click.command(help="Display the filesystem cache usage and hit rate per data type")
+@click.pass_obj
+def cli(cli_ctx) -> None:
+    with pc.telemetry.set_context(cli_ctx.otel_context):
+        with pc.logging.Process("CacheStats", "global"):
+            stats = get_cache_index(pc.user_config).get_stats()
+            if not stats:
+                pc.logging.info("The cache is empty")
+            for data_type, item in sorted(stats.items()):
+                lookups = item["hits"] + item["misses"]
+                hit_rate = 100.0 * item["hits"] / lookups if lookups else 0.0
+                pc.logging.info(
+                    f"{data_type}: {item['entries']} entries, {item['bytes'] / 1048576.0:.2f}MB, "
+                    f"hit rate {hit_rate:.1f}% ({item['hits']} hits, {item['misses']} misses)"
+                )
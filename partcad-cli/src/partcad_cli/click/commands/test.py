@@ -9,10 +9,8 @@
 #
 
 import rich_click as click
-import asyncio
 
 import partcad as pc
-from partcad.test.all import tests as all_tests
 from partcad.user_config import user_config
 
 
@@ -20,7 +18,12 @@ async def cli_test_async(ctx, packages, filter_prefix, sketch, interface, assemb
     """
     TODO-118: @alexanderilyin: Add scene support
     """
-    tasks = []
+    # Imported here as it takes a while to load
+    from partcad.scheduler import BuildScheduler
+    from partcad.test.all import tests as all_tests
+
+    # The shapes shared by the packages are only built once
+    scheduler = BuildScheduler(ctx)
 
     tests_to_run = all_tests(user_config.threads_max)
     if filter_prefix:
@@ -34,7 +37,7 @@ async def cli_test_async(ctx, packages, filter_prefix, sketch, interface, assemb
         prj = ctx.get_project(package)
         if not object:
             # Test all parts and assemblies in this project
-            tasks.append(prj.test_log_wrapper_async(ctx, tests=tests_to_run))
+            await prj.schedule_tests(scheduler, ctx, tests_to_run, use_wrapper=True)
         elif interface:
             # Test the requested interface
             shape = prj.get_interface(object)
@@ -43,7 +46,7 @@ async def cli_test_async(ctx, packages, filter_prefix, sketch, interface, assemb
             elif not shape.finalized:
                 pc.logging.warning(f"{object} is not finalized")
             else:
-                tasks.append(shape.test_async())
+                scheduler.add_task("test", f"{package}:{object}", shape.test_async)
         else:
             # Test the requested part or assembly
             if sketch:
@@ -58,9 +61,10 @@ async def cli_test_async(ctx, packages, filter_prefix, sketch, interface, assemb
             elif not shape.finalized:
                 pc.logging.warning(f"{object} is not finalized")
             else:
-                tasks.extend([t.test_log_wrapper(tests_to_run, ctx, shape) for t in tests_to_run])
+                for t in tests_to_run:
+                    await scheduler.add_test(shape, t, tests_to_run, use_wrapper=True)
 
-    await asyncio.gather(*tasks)
+    await scheduler.run()
 
 
 @click.command(help="Run tests on a part, assembly, or scene")
@@ -137,6 +141,8 @@ def cli(cli_ctx, package, recursive, filter, sketch, interface, assembly, scene,
             else:
                 packages = [package]
 
+            import asyncio
+
             asyncio.run(
                 cli_test_async(
                     ctx,
@@ -149,3 +155,4 @@ def cli(cli_ctx, package, recursive, filter, sketch, interface, assembly, scene,
                     object=object,
                 )
             )
+            pc.logging.debug(f"Cache keys computed: {ctx.stats_hashes_computed}")
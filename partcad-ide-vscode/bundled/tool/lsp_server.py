@@ -1022,6 +1022,7 @@ def do_load_package_contents(args=list()) -> None:
         )
 
     # Extract part configs from part objects, not from the project, as we need a post-processed one
+    project.init_all()
     sketches = list(
         map(
             lambda sketch: {
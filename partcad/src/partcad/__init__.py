@@ -7,48 +7,76 @@
 
 __version__: str = "0.7.135"
 
+import importlib
+import types
+
 from . import telemetry
 
 telemetry.init(__version__)
 
-from build123d import Location
-
-from .globals import (
-    init,
-    fini,
-    create_package,
-    get_part,
-    get_part_cadquery,
-    get_part_build123d,
-    get_assembly,
-    get_assembly_cadquery,
-    get_assembly_build123d,
-    _partcad_context,
-    render,
-)
-from .ai import supported_models
 from .consts import *
-from .context import Context
-from .assembly import Assembly
-from .part import Part
-from .project import Project
-from .project_factory_local import ProjectFactoryLocal
-from .project_factory_git import ProjectFactoryGit
-from .project_factory_tar import ProjectFactoryTar
-from .provider_data_cart import ProviderCart
-from .provider_request_quote import ProviderRequestQuote
-from .shape import Shape
 from .user_config import user_config
-from .logging_ansi_terminal import init as logging_ansi_terminal_init
-from .logging_ansi_terminal import fini as logging_ansi_terminal_fini
-from . import healthcheck
+from .user_config import UserConfig
 from . import logging
-from . import utils
 from . import exception
-from . import interactive
-from . import provider_request_caps
+from .logging_ansi_terminal import init as logging_ansi_terminal_init
+from .logging_ansi_terminal import fini as logging_ansi_terminal_fini
 
-from .user_config import UserConfig
+# The following attributes depend on build123d, OCP, AI SDKs etc. They are only
+# imported on first use, so that the tools that do not need them start quickly.
+_lazy_attributes = {
+    "Location": ("build123d", "Location"),
+    "init": (".globals", "init"),
+    "fini": (".globals", "fini"),
+    "create_package": (".globals", "create_package"),
+    "get_part": (".globals", "get_part"),
+    "get_part_cadquery": (".globals", "get_part_cadquery"),
+    "get_part_build123d": (".globals", "get_part_build123d"),
+    "get_assembly": (".globals", "get_assembly"),
+    "get_assembly_cadquery": (".globals", "get_assembly_cadquery"),
+    "get_assembly_build123d": (".globals", "get_assembly_build123d"),
+    "_partcad_context": (".globals", "_partcad_context"),
+    "render": (".globals", "render"),
+    "supported_models": (".ai", "supported_models"),
+    "Context": (".context", "Context"),
+    "Assembly": (".assembly", "Assembly"),
+    "Part": (".part", "Part"),
+    "Project": (".project", "Project"),
+    "ProjectFactoryLocal": (".project_factory_local", "ProjectFactoryLocal"),
+    "ProjectFactoryGit": (".project_factory_git", "ProjectFactoryGit"),
+    "ProjectFactoryTar": (".project_factory_tar", "ProjectFactoryTar"),
+    "ProviderCart": (".provider_data_cart", "ProviderCart"),
+    "ProviderRequestQuote": (".provider_request_quote", "ProviderRequestQuote"),
+    "Shape": (".shape", "Shape"),
+}
+_lazy_modules = [
+    "healthcheck",
+    "interactive",
+    "provider_request_caps",
+    "utils",
+]
+# Captured as 'globals' is shadowed by the 'partcad.globals' submodule once imported
+_namespace = globals()
+
+
+def __getattr__(name: str):
+    if name in _lazy_attributes:
+        module_name, attribute = _lazy_attributes[name]
+        value = getattr(importlib.import_module(module_name, __name__), attribute)
+    elif name in _lazy_modules:
+        value = importlib.import_module("." + name, __name__)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    # Resolved only once
+    _namespace[name] = value
+    # Importing the 'partcad.render' submodule binds it over the 'render()' function
+    if isinstance(_namespace.get("render", None), types.ModuleType):
+        del _namespace["render"]
+    return value
+
+
+def __dir__():
+    return sorted(list(_namespace.keys()) + list(_lazy_attributes.keys()) + _lazy_modules)
 
 
 # TODO: remove partcad old version usage from vscode extension
@@ -29,6 +29,7 @@ from OCP.TopAbs import TopAbs_SOLID
 import partcad.logging as pc_logging
 from partcad.actions.part import import_part_action
 from partcad.project import Project
+from partcad.sync_processes import process_pool_manager
 
 shape_cache = {}
 
@@ -129,8 +130,8 @@ def save_shape_to_step(shape: TopoDS_Shape, filename: Path):
         raise ValueError(f"Failed to write STEP file: {filename}")
 
 
-def import_part(project: Project, shape: TopoDS_Shape, part_name: str, parent_folder: Path, config: dict) -> str:
-    """Saves shape as STEP and imports it into the project."""
+def get_part_step_file(project: Project, part_name: str, parent_folder: Path) -> tuple[Path, str]:
+    """Returns the STEP file to save the part to and the name of the part in the project."""
 
     project_root = Path(project.config_dir).resolve()
     step_folder = parent_folder.resolve()
@@ -139,10 +140,18 @@ def import_part(project: Project, shape: TopoDS_Shape, part_name: str, parent_fo
     file_safe_name = Path(part_name).name
     step_file = step_folder / f"{file_safe_name}.step"
 
-    save_shape_to_step(shape, step_file)
-
     part_name_without_ext = step_file.with_suffix("").relative_to(project_root).as_posix().replace("\\", "/")
 
+    return step_file, part_name_without_ext
+
+
+def import_part(project: Project, shape: TopoDS_Shape, part_name: str, parent_folder: Path, config: dict) -> str:
+    """Saves shape as STEP and imports it into the project."""
+
+    step_file, part_name_without_ext = get_part_step_file(project, part_name, parent_folder)
+
+    save_shape_to_step(shape, step_file)
+
     import_part_action(project, "step", part_name_without_ext, step_file.resolve().as_posix(), config)
 
     return part_name_without_ext
@@ -160,6 +169,22 @@ def shape_signature(shape: TopoDS_Shape) -> tuple:
 
     return tuple(round(v, 5) for v in (xmin, ymin, zmin, xmax, ymax, zmax, volume))
 
+
+def zero_shape(shape: TopoDS_Shape, trsf: gp_Trsf) -> tuple[TopoDS_Shape, tuple]:
+    """Moves the shape from its place in the assembly to the origin, returns it with its signature."""
+    zeroed_shape = BRepBuilderAPI_Transform(shape, invert_transformation(trsf), True).Shape()
+    return zeroed_shape, shape_signature(zeroed_shape)
+
+
+def collect_parts(node, parts: list) -> list:
+    """Returns the part nodes of the assembly tree, in the order they are flattened."""
+    if node["type"] == "assembly":
+        for child in node.get("children", []):
+            collect_parts(child, parts)
+    else:
+        parts.append(node)
+    return parts
+
 def parse_label_recursive(label, shape_tool, parent_trsf: gp_Trsf, visited):
     """
     Recursively traverses the XDE tree:
@@ -252,8 +277,14 @@ def parse_step_tree(step_file: str):
     return root_nodes
 
 
-def flatten_assembly_tree(node, parent_folder: Path, project: Project, config: dict, parent_name: str = ""):
-    """Converts a hierarchical assembly tree into a flat structure with STEP files."""
+def flatten_assembly_tree(
+    node, parent_folder: Path, project: Project, config: dict, parent_name: str = "", parts_to_import: list = None
+):
+    """Converts a hierarchical assembly tree into a flat structure with STEP files.
+
+    If 'parts_to_import' is given, the new parts are appended to it as (shape, STEP file, part name)
+    instead of being imported right away.
+    """
     node_type = node["type"]
     node_name = node["name"]
     global_trsf = node["trsf"]
@@ -265,14 +296,16 @@ def flatten_assembly_tree(node, parent_folder: Path, project: Project, config: d
             "type": "assembly",
             "name": full_node_name,
             "links": [
-                flatten_assembly_tree(ch, parent_folder, project, config, full_node_name)
+                flatten_assembly_tree(ch, parent_folder, project, config, full_node_name, parts_to_import)
                 for ch in node.get("children", [])
             ],
         }
 
-    shape = node["shape"]
-    zeroed_shape = BRepBuilderAPI_Transform(shape, invert_transformation(global_trsf), True).Shape()
-    signature = shape_signature(zeroed_shape)
+    if "signature" in node:
+        # Computed ahead of time
+        zeroed_shape, signature = node["zeroed_shape"], node["signature"]
+    else:
+        zeroed_shape, signature = zero_shape(node["shape"], global_trsf)
 
     if signature in shape_cache:
         location = ruamel.yaml.comments.CommentedSeq(convert_location(global_trsf))
@@ -284,7 +317,11 @@ def flatten_assembly_tree(node, parent_folder: Path, project: Project, config: d
             "location": location,
         }
 
-    part_path = import_part(project, zeroed_shape, node_name, parent_folder, config)
+    if parts_to_import is None:
+        part_path = import_part(project, zeroed_shape, node_name, parent_folder, config)
+    else:
+        step_file, part_path = get_part_step_file(project, node_name, parent_folder)
+        parts_to_import.append((zeroed_shape, step_file, part_path))
     shape_cache[signature] = part_path
 
     location = ruamel.yaml.comments.CommentedSeq(convert_location(global_trsf))
@@ -363,8 +400,21 @@ def import_assy_action(
     else:
         final_structure = root_nodes[0]
 
+    # Move the parts to the origin in worker processes, as this is the bulk of the work
+    parts = collect_parts(final_structure, [])
+    results = process_pool_manager.map(zero_shape, [(node["shape"], node["trsf"]) for node in parts])
+    for node, (zeroed_shape, signature) in zip(parts, results):
+        node["zeroed_shape"] = zeroed_shape
+        node["signature"] = signature
+
     # Flatten the hierarchical structure into a single .assy file
-    top_data = flatten_assembly_tree(final_structure, output_folder, project, config)
+    parts_to_import = []
+    top_data = flatten_assembly_tree(final_structure, output_folder, project, config, parts_to_import=parts_to_import)
+
+    # Write the STEP files in worker processes, but add the parts to the project one by one
+    process_pool_manager.map(save_shape_to_step, [(shape, step_file) for shape, step_file, _ in parts_to_import])
+    for _, step_file, part_path in parts_to_import:
+        import_part_action(project, "step", part_path, step_file.resolve().as_posix(), config)
     assy_name = Path(top_data["name"]).name
     assy_file_path = output_folder / f"{assy_name}.assy"
 
@@ -7,11 +7,12 @@
 # Licensed under Apache License, Version 2.0.
 
 import asyncio
-import copy
+import threading
 import typing
 
 import build123d as b3d
 
+from .cache_hash import CacheHash
 from . import telemetry
 from .shape import Shape
 from .shape_ai import ShapeWithAi
@@ -19,6 +20,22 @@ from .sync_threads import threadpool_manager
 from . import logging as pc_logging
 
 
+def to_toploc(location):
+    """Converts build123d locations to OCP ones"""
+    if isinstance(location, b3d.Location):
+        return location.wrapped
+    return location
+
+
+def location_key(location) -> list | None:
+    """Returns the transformation matrix of the location, for hashing"""
+    if location is None:
+        return None
+    trsf = to_toploc(location).Transformation()
+    # Adding 0.0 turns -0.0 into 0.0
+    return [round(trsf.Value(row, col), 9) + 0.0 for row in range(1, 4) for col in range(1, 5)]
+
+
 class AssemblyChild:
     def __init__(self, item, name=None, location=None):
         self.item = item
@@ -38,13 +55,23 @@ class Assembly(ShapeWithAi):
 
         # self.children contains all child parts and assemblies before they turn into 'self.shape'
         self.children = []
+        self.instantiate_lock = threading.Lock()
+        # The key of the compound in the cache, derived from the children
+        self.node_hash = None
 
     async def do_instantiate(self):
         if len(self.children) == 0:
-            self._wrapped = None  # Invalidate if any
-            await threadpool_manager.run(self.instantiate, self)
+            await threadpool_manager.run(self._instantiate_once)
+
+    def _instantiate_once(self):
+        # The same assembly may be used by several parents at the same time
+        with self.instantiate_lock:
             if len(self.children) == 0:
-                pc_logging.warning(f"The assembly {self.project_name}:{self.name} is empty")
+                self._wrapped = None  # Invalidate if any
+                self.node_hash = None
+                self.instantiate(self)
+                if len(self.children) == 0:
+                    pc_logging.warning(f"The assembly {self.project_name}:{self.name} is empty")
 
     # add is a non-thread-safe method for end users to create custom Assemblies
     def add(
@@ -55,6 +82,67 @@ class Assembly(ShapeWithAi):
     ):
         self.children.append(AssemblyChild(child_item, name, loc))
         self._wrapped = None  # Invalidate if any
+        self.node_hash = None
+
+    async def get_cache_hash(self, ctx) -> CacheHash:
+        """Returns the key of the compound in the cache.
+
+        The compound only depends on the children and on where they are placed.
+        So the key is derived from the children's keys and locations,
+        and only the assemblies containing a modified child are rebuilt.
+        """
+        await self.do_instantiate()
+        if self.node_hash is None:
+            self.node_hash = await self._get_node_hash(ctx)
+        return self.node_hash
+
+    async def _get_node_hash(self, ctx) -> CacheHash:
+        name = f"{self.project_name}:{self.name}"
+
+        items = {}
+        for child in self.children:
+            items.setdefault(id(child.item), child.item)
+
+        async def get_item_key(item):
+            if not item.get_cacheable():
+                return None
+            item_hash = await item.get_cache_hash(ctx)
+            return item_hash.get()
+
+        keys = await asyncio.gather(*[get_item_key(item) for item in items.values()])
+        keys = dict(zip(items.keys(), keys))
+
+        children = []
+        for child in self.children:
+            key = keys[id(child.item)]
+            if key is None:
+                # There is no way to tell whether this child has changed
+                return CacheHash(name, cache=False, user_config=ctx.user_config)
+            children.append([key, child.name, location_key(child.location)])
+
+        node_hash = CacheHash(name, cache=self.cacheable, user_config=ctx.user_config)
+        node_config = {"children": children, "location": location_key(self.location)}
+        for key in ["offset", "scale"]:
+            if key in self.config:
+                node_config[key] = self.config[key]
+        node_hash.add_dict(node_config)
+        return node_hash
+
+    async def get_dependencies(self, ctx) -> list[Shape]:
+        await self.do_instantiate()
+        items = {}
+        for child in self.children:
+            items.setdefault(id(child.item), child.item)
+        return list(items.values())
+
+    def explain_rebuild(self, depth: int = 0) -> list[tuple[int, str, str]]:
+        result = super().explain_rebuild(depth)
+        for child in self.children:
+            for child_depth, name, status in child.item.explain_rebuild(depth + 1):
+                if child_depth == depth + 1 and child.name:
+                    name = child.name
+                result.append((child_depth, name, status))
+        return result
 
     async def get_shape(self, ctx):
         await self.do_instantiate()
@@ -66,39 +154,41 @@ class Assembly(ShapeWithAi):
             return await self._get_shape_real(ctx)
 
     async def _get_shape_real(self, ctx):
-        child_shapes = []
-
-        @telemetry.start_as_current_span_async("Assembly._get_shape_real.per_child")
-        async def per_child(child):
-            # TODO(clairbee): use topods objects here
-            item = await child.item.get_build123d(ctx)
-            if child.name is not None or child.location is not None:
-                item = copy.copy(item)
-                if child.name is not None:
-                    item.label = child.name
-                if child.location is not None:
-                    item.locate(child.location)
-            return item
+        from OCP.BRep import BRep_Builder
+        from OCP.TopoDS import TopoDS_Compound
 
         if len(self.children) == 0:
             pc_logging.warning("The assembly %s:%s is empty" % (self.project_name, self.name))
 
-        tasks = [asyncio.create_task(per_child(child)) for child in self.children]
+        # Repeated children (e.g. fasteners) are only loaded once
+        items = {}
+        for child in self.children:
+            items.setdefault(id(child.item), child.item)
+
+        @telemetry.start_as_current_span_async("Assembly._get_shape_real.per_item")
+        async def per_item(item):
+            return await item.get_wrapped(ctx)
 
-        # TODO(clairbee): revisit whether non-determinism here is acceptable
-        for f in asyncio.as_completed(tasks):
-            item = await f
-            child_shapes.append(item)
+        shapes = await asyncio.gather(*[per_item(item) for item in items.values()])
+        shapes = dict(zip(items.keys(), shapes))
+
+        # The children are added in the order they are declared, so that the result is deterministic.
+        # The instances share the geometry of the item and only differ by their location.
+        builder = BRep_Builder()
+        compound = TopoDS_Compound()
+        builder.MakeCompound(compound)
+        for child in self.children:
+            shape = shapes[id(child.item)]
+            if shape is None:
+                pc_logging.error(f"Failed to add {child.name or child.item.name} to {self.project_name}:{self.name}")
+                continue
+            if child.location is not None:
+                shape = shape.Located(to_toploc(child.location))
+            builder.Add(compound, shape)
 
-        compound = b3d.Compound(children=child_shapes)
-        if not self.name is None:
-            compound.label = self.name
         if not self.location is None:
-            compound.locate(self.location)
-        return compound.wrapped
-        # return copy.copy(
-        #     shape
-        # )  # TODO(clairbee): fix this for the case when the parts are made with cadquery
+            return compound.Located(to_toploc(self.location))
+        return compound
 
     async def get_bom(self):
         with self.lock:
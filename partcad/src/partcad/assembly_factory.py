@@ -34,7 +34,9 @@ class AssemblyFactory(ShapeFactory):
 
         self.post_create()
 
-        self.ctx.stats_assemblies += 1
+        if not self.project.lazy:
+            # Otherwise, accounted for by the project
+            self.ctx.stats_assemblies += 1
 
     def post_create(self) -> None:
         # This is a base class catch-all method
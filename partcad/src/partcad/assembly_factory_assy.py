@@ -187,7 +187,7 @@ class AssemblyFactoryAssy(AssemblyFactoryFile):
                     "cache_dependencies_ignore": self.ctx.user_config.cache_dependencies_ignore,
                 }
             )  # TODO(clairbee): revisit why node["links"]) was used there
-            item.cacheable = False  # Keep it uncacheable before parts info is in the hashing context
+            # Cached by the keys of its children, so that it is only rebuilt when one of them changes
             item.instantiate = lambda x: True
             await self.handle_node_list(item, node["links"])
         else:
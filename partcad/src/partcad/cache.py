@@ -8,9 +8,11 @@
 #
 
 import asyncio
+import os
 from pathlib import Path
 
 from .cache_hash import CacheHash
+from .cache_index import get_cache_index
 import aiofiles
 
 
@@ -21,6 +23,8 @@ class Cache:
         self.user_config = user_config
         self.cache_dir = Path(user_config.internal_state_dir) / "cache" / data_type
         self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # Tracks the usage of the entries to keep the cache size within the budget
+        self.index = get_cache_index(user_config) if user_config.cache else None
 
     def get_cache_path(self, hash: CacheHash) -> Path:
         """Get the file path for a cached object."""
@@ -29,6 +33,22 @@ class Cache:
             return None
         return self.cache_dir / hash_str
 
+    def get_entry_size(self, hash: CacheHash, key: str) -> int | None:
+        """Returns the size of the cached object without reading it, None if it is not cached."""
+        if not self.user_config.cache:
+            # Caching is disabled
+            return None
+
+        cache_path = self.get_cache_path(hash)
+        if not cache_path:
+            # Hash is not produced
+            return None
+
+        try:
+            return os.stat(f"{cache_path}.{key}").st_size
+        except OSError:
+            return None
+
     def _needs_write_data(self, data_len: int) -> bool:
         """Check if object needs to be written to cache."""
         # Make an exception for 1 byte objects to cache test results
@@ -63,6 +83,8 @@ class Cache:
             async with aiofiles.open(f"{cache_path}.{key}", "wb") as f:
                 await f.write(value)
             saved[key] = True
+            if self.index:
+                self.index.record_write(self.data_type, f"{cache_path.name}.{key}", len(value))
 
         tasks = [
             asyncio.create_task(task_item(key, value))
@@ -90,9 +112,14 @@ class Cache:
         async def task_item(key: str) -> tuple[str, bytes]:
             try:
                 async with aiofiles.open(f"{cache_path}.{key}", "rb") as f:
-                    return [key, await f.read()]
+                    data = await f.read()
             except FileNotFoundError:
+                if self.index:
+                    self.index.record_miss(self.data_type)
                 return [key, None]
+            if self.index:
+                self.index.record_hit(self.data_type, f"{cache_path.name}.{key}")
+            return [key, data]
 
         tasks = [asyncio.create_task(task_item(key)) for key in keys]
 
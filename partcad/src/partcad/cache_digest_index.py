@@ -0,0 +1,210 @@
+#
+# PartCAD, 2025
+#
+# Licensed under Apache License, Version 2.0.
+#
+
+# Digests of the files that shapes depend on (source code, STEP and STL files...).
+#
+# Reading all dependencies in full on each process start is expensive, so the
+# digest of each file is remembered together with its size, modification time
+# and inode. Files that have not changed since are not read again, unless the
+# paranoid mode is enabled.
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import mmap
+import os
+from pathlib import Path
+import sqlite3
+import threading
+import time
+
+from .cache_hash_algorithms import new_hasher
+from . import logging as pc_logging
+
+INDEX_DIR = ".index"
+INDEX_FILE = "digests.sqlite"
+
+CHUNK_SIZE = 1024 * 1024
+# Larger files are mapped in memory instead of being copied chunk by chunk
+MMAP_MIN_SIZE = 64 * 1024 * 1024
+MMAP_CHUNK_SIZE = 16 * 1024 * 1024
+
+# Files modified less than that many seconds before they were hashed may be
+# modified again without any change to their modification time
+RACY_INTERVAL = 2.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS digests (
+    path TEXT NOT NULL,
+    algo TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    digest BLOB NOT NULL,
+    PRIMARY KEY (path, algo)
+);
+"""
+
+
+def hash_file(filename: str, algo: str) -> bytes:
+    """Hashes the file content without loading it in memory at once"""
+    hasher = new_hasher(algo)
+    with open(filename, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size >= MMAP_MIN_SIZE:
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    if hasattr(mm, "madvise"):
+                        mm.madvise(mmap.MADV_SEQUENTIAL)
+                    with memoryview(mm) as view:
+                        for offset in range(0, len(view), MMAP_CHUNK_SIZE):
+                            hasher.update(view[offset : offset + MMAP_CHUNK_SIZE])
+                return hasher.digest()
+            except (OSError, ValueError):
+                # Not mappable (e.g. special filesystems), read it instead
+                hasher = new_hasher(algo)
+                f.seek(0)
+        while chunk := f.read(CHUNK_SIZE):
+            hasher.update(chunk)
+    return hasher.digest()
+
+
+def _hash_file_if_exists(filename: str, algo: str) -> bytes | None:
+    try:
+        return hash_file(filename, algo)
+    except FileNotFoundError:
+        return None
+
+
+class DigestIndex:
+    def __init__(self, cache_dir: str) -> None:
+        index_dir = Path(cache_dir) / INDEX_DIR
+        index_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = index_dir / INDEX_FILE
+        with self._connect() as db:
+            db.executescript(SCHEMA)
+
+        self.lock = threading.Lock()
+        # Loaded on first use
+        self.digests: dict[tuple[str, str], tuple[int, int, int, bytes]] = None
+
+    @contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.db_path, timeout=30.0, isolation_level=None)
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def _load(self) -> None:
+        # Called with the lock held
+        if self.digests is None:
+            with self._connect() as db:
+                self.digests = {
+                    (path, algo): (size, mtime_ns, inode, digest)
+                    for path, algo, size, mtime_ns, inode, digest in db.execute(
+                        "SELECT path, algo, size, mtime_ns, inode, digest FROM digests"
+                    )
+                }
+
+    def lookup(self, path: str, algo: str, stat: os.stat_result) -> bytes | None:
+        with self.lock:
+            self._load()
+            entry = self.digests.get((path, algo), None)
+        if entry is None or entry[:3] != (stat.st_size, stat.st_mtime_ns, stat.st_ino):
+            return None
+        return entry[3]
+
+    def store(self, entries: list[tuple[str, str, os.stat_result, bytes]]) -> None:
+        rows = []
+        now = time.time_ns()
+        for path, algo, stat, digest in entries:
+            if now - stat.st_mtime_ns < RACY_INTERVAL * 1e9:
+                # The file may still be changing within the same timestamp
+                continue
+            rows.append((path, algo, stat.st_size, stat.st_mtime_ns, stat.st_ino, digest))
+        if not rows:
+            return
+
+        with self.lock:
+            self._load()
+            for path, algo, size, mtime_ns, inode, digest in rows:
+                self.digests[(path, algo)] = (size, mtime_ns, inode, digest)
+        try:
+            with self._connect() as db:
+                db.execute("BEGIN")
+                db.executemany("INSERT OR REPLACE INTO digests VALUES (?, ?, ?, ?, ?, ?)", rows)
+                db.execute("COMMIT")
+        except sqlite3.Error as e:
+            pc_logging.debug(f"Failed to update the file digests index: {e}")
+
+
+_indexes: dict[str, DigestIndex] = {}
+_index_lock = threading.Lock()
+_executor = None
+
+
+def get_digest_index(user_config) -> DigestIndex | None:
+    """Returns the index shared by all hashes in the given internal state folder"""
+    cache_dir = os.path.join(user_config.internal_state_dir, "cache")
+    with _index_lock:
+        index = _indexes.get(cache_dir, None)
+        if index is None:
+            try:
+                index = DigestIndex(cache_dir)
+            except (OSError, sqlite3.Error) as e:
+                pc_logging.debug(f"Failed to open the file digests index: {e}")
+                return None
+            _indexes[cache_dir] = index
+        return index
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _index_lock:
+        if _executor is None:
+            # Dedicated threads, as the callers may be running in the shared thread pools already
+            _executor = ThreadPoolExecutor(min(8, os.cpu_count() or 1), "partcad-hash-")
+        return _executor
+
+
+def get_file_digests(filenames: list[str], algo: str, user_config) -> list[bytes | None]:
+    """Returns the content digests of the files in the same order.
+
+    None is returned for missing files.
+    """
+    index = None if user_config.cache_dependencies_paranoid else get_digest_index(user_config)
+
+    results = [None] * len(filenames)
+    to_hash = []
+    for i, filename in enumerate(filenames):
+        try:
+            stat = os.stat(filename)
+        except FileNotFoundError:
+            # This happens for all files that are not yet downloaded
+            continue
+        path = os.path.abspath(filename)
+        digest = index.lookup(path, algo, stat) if index else None
+        if digest is None:
+            to_hash.append((i, path, stat))
+        else:
+            results[i] = digest
+
+    if not to_hash:
+        return results
+
+    if len(to_hash) == 1:
+        digests = [_hash_file_if_exists(to_hash[0][1], algo)]
+    else:
+        # The results are collected in the order of submission
+        digests = list(_get_executor().map(lambda item: _hash_file_if_exists(item[1], algo), to_hash))
+    for (i, _, _), digest in zip(to_hash, digests):
+        results[i] = digest
+
+    if index:
+        index.store(
+            [(path, algo, stat, digest) for (_, path, stat), digest in zip(to_hash, digests) if digest is not None]
+        )
+    return results
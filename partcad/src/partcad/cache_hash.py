@@ -7,18 +7,78 @@
 # Licensed under Apache License, Version 2.0.
 #
 
-import hashlib
-import os
-import struct
+import json
+import threading
 
+from .cache_digest_index import get_file_digests
+from .cache_hash_algorithms import format_key, new_hasher, resolve_algorithm
 from . import logging as pc_logging
+from .user_config import user_config as global_user_config
+
+# Kinds of hash inputs
+INPUT_BYTES = 0
+INPUT_FILE = 1
+
+# The number of hashes computed by this process
+computed_count = 0
+computed_count_lock = threading.Lock()
+
+
+def get_computed_count() -> int:
+    return computed_count
+
+
+def _json_default(value):
+    if isinstance(value, (set, frozenset)):
+        try:
+            return sorted(value)
+        except TypeError:
+            return sorted(value, key=repr)
+    return str(value)
+
+
+def _canonical(value):
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    if isinstance(value, (set, frozenset)):
+        return _canonical(_json_default(value))
+    return value
+
+
+def serialize_dict(data: dict) -> bytes:
+    """Serializes the configuration the same way regardless of the order of the keys"""
+    try:
+        return json.dumps(data, sort_keys=True, separators=(",", ":"), default=_json_default).encode()
+    except TypeError:
+        # Keys of different types can't be sorted, turn them all into strings
+        return json.dumps(_canonical(data), sort_keys=True, separators=(",", ":"), default=_json_default).encode()
 
 
 class CacheHash:
-    def __init__(self, name: str, algo="md5", hasher=None, cache=False):
+    """Produces the cache key of an object.
+
+    The inputs are only recorded when added. They are hashed on the first call to get(),
+    so that no time is spent hashing objects that are never looked up in the cache.
+    Dictionaries are serialized when added, as they may be modified afterwards,
+    but the files are only read on the first call to get().
+    """
+
+    def __init__(self, name: str, algo: str = None, hasher=None, cache=False, user_config=None):
         self.name = name
         self.is_empty = True
         self.is_used = False
+        self.inputs = []
+        self.dependencies = []
+        self.key = None
+        self.lock = threading.Lock()
+        self.user_config = user_config if user_config is not None else global_user_config
+        if algo is None and hasher is not None:
+            algo = hasher.name
+        # If not set, the algorithm of the user config is used, see set_user_config()
+        self.algo = algo
+        self.cache = cache
         if not cache:
             # Caching is disabled, no initialization needed
             self.hasher = None
@@ -27,103 +87,105 @@ class CacheHash:
         if hasher != None:
             self.hasher = hasher.copy()
         else:
-            if algo == "md5":
-                self.hasher = hashlib.md5()
-            elif algo == "sha1":
-                self.hasher = hashlib.sha1()
-            elif algo == "sha256":
-                self.hasher = hashlib.sha256()
-            else:
-                raise ValueError(f"Unknown hash algorithm: {algo}")
-
-        self.dependencies = []
-
-    def touch(self):
-        if self.is_used:
-            pc_logging.warning(f"Hash update after being used: {self.name}")
-        self.is_empty = False
+            if algo is not None:
+                self.algo = resolve_algorithm(algo)
+            # Created on first use
+            self.hasher = None
 
-    # TODO(clairbee): do not "add_" anything to the hash immediately.
-    # Instead, add the data to a list and then add it to the hash when needed.
+    def set_user_config(self, user_config) -> None:
+        """Sets the config of the context to produce the key with, until the key is produced"""
+        with self.lock:
+            if not self.is_used:
+                self.user_config = user_config
+
+    def _add(self, kind: int, value) -> None:
+        with self.lock:
+            if self.is_used:
+                pc_logging.warning(f"Hash update after being used: {self.name}")
+                self._digest([(kind, value)])
+                self.key = None
+            else:
+                self.inputs.append((kind, value))
+                if kind != INPUT_FILE:
+                    self.is_empty = False
+
+    def _digest(self, inputs: list) -> None:
+        # Called with the lock held
+        if self.hasher is None:
+            if self.algo is None:
+                self.algo = resolve_algorithm(self.user_config.cache_hash_algorithm)
+            self.hasher = new_hasher(self.algo)
+
+        # Files are hashed in parallel, but added in the order they were added
+        filenames = [value for kind, value in inputs if kind == INPUT_FILE]
+        digests = iter(get_file_digests(filenames, self.algo, self.user_config) if filenames else [])
+        for kind, value in inputs:
+            if kind == INPUT_FILE:
+                value = next(digests)
+                if value is None:
+                    # TODO(clairbee): trigger preload if content hashing is back
+                    # This happens for all files that are not yet downloaded
+                    continue
+            self.hasher.update(value)
+            self.is_empty = False
 
     def add_dict(self, data: dict):
-        if not self.hasher:
+        if not self.cache:
             # Caching is disabled
             return
         if data is None or len(data.keys()) == 0:
             # Do not consider it not being empty
             return
-
-        def recurse(val):
-            if isinstance(val, dict):
-                for k in sorted(val.keys()):
-                    self.hasher.update(str(k).encode())
-                    recurse(val[k])
-            elif isinstance(val, str):
-                self.hasher.update(val.encode())
-            elif isinstance(val, (list, tuple, set)):
-                for item in sorted(val) if not isinstance(val, list) else val:
-                    recurse(item)
-            else:
-                self.hasher.update(str(val).encode())
-
-        recurse(data)
-        self.touch()
+        self._add(INPUT_BYTES, serialize_dict(data))
 
     def add_string(self, string: str):
-        if not self.hasher:
+        if not self.cache:
             # Caching is disabled
             return
         if string is None:
             # Do not consider it not being empty
             return
-
-        self.hasher.update(string.encode())
-        self.touch()
+        self._add(INPUT_BYTES, string.encode())
 
     def add_bytes(self, bytes: bytes):
-        if not self.hasher:
+        if not self.cache:
             # Caching is disabled
             return
         if bytes is None or len(bytes) == 0:
             # Do not consider it not being empty
             return
-
-        self.hasher.update(bytes)
-        self.touch()
+        self._add(INPUT_BYTES, bytes)
 
     def add_filename(self, filename: str):
-        if not self.hasher:
+        if not self.cache:
             # Caching is disabled
             return
         if filename is None:
             # Do not consider it not being empty
             return
-
-        try:
-            # Track changes to the file content
-            with open(filename, "rb") as f:
-                self.hasher.update(f.read())
-
-            # TODO(clairbee): optionally, track changes by file modification time only
-            # self.hasher.update(struct.pack("f", os.path.getmtime(filename)))
-        except FileNotFoundError:
-            # TODO(clairbee): trigger preload if content hashing is back
-            # This happens for all files that are not yet downloaded
-            return
-        self.touch()
+        # Track changes to the file content
+        self._add(INPUT_FILE, filename)
 
     def set_dependencies(self, dependencies: list[str]) -> None:
         self.dependencies = dependencies
 
     def get(self) -> str | None:
-        if not self.is_used:
-            # TODO(clairbee): make I/O asynchronous and parallel, but maintain the order of hashing
-            for filename in self.dependencies:
-                self.add_filename(filename)
-
-        self.is_used = True
-        if self.is_empty:
+        if not self.cache:
             return None
 
-        return self.hasher.hexdigest()
+        global computed_count
+        with self.lock:
+            if not self.is_used:
+                self.is_used = True
+                inputs = self.inputs + [(INPUT_FILE, filename) for filename in self.dependencies]
+                self.inputs = []
+                self._digest(inputs)
+            if self.is_empty:
+                return None
+
+            if self.key is None:
+                # The algorithm is a part of the key
+                self.key = format_key(self.algo, self.hasher.hexdigest())
+                with computed_count_lock:
+                    computed_count += 1
+            return self.key
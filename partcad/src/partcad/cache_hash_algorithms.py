@@ -0,0 +1,76 @@
+#
+# PartCAD, 2025
+#
+# Licensed under Apache License, Version 2.0.
+#
+
+# Hash algorithms used to produce the cache keys.
+#
+# The key of a cache entry depends on the algorithm. Keys produced by
+# algorithms other than md5 (the original one) are prefixed with the name
+# of the algorithm, so the entries produced by different algorithms never
+# collide.
+
+import hashlib
+import threading
+
+from . import logging as pc_logging
+
+ALGORITHM_DEFAULT = "md5"
+# Used when the configured algorithm depends on a missing module
+ALGORITHM_FALLBACK = "blake2b"
+
+
+def _blake3():
+    import blake3
+
+    return blake3.blake3(max_threads=1)
+
+
+def _xxh3_128():
+    import xxhash
+
+    return xxhash.xxh3_128()
+
+
+ALGORITHMS = {
+    "md5": hashlib.md5,
+    "sha1": hashlib.sha1,
+    "sha256": hashlib.sha256,
+    # 256 bits are enough for cache keys and keep the file names short
+    "blake2b": lambda: hashlib.blake2b(digest_size=32),
+    "blake2s": hashlib.blake2s,
+    # Optional, require 'blake3' and 'xxhash' to be installed
+    "blake3": _blake3,
+    "xxh3_128": _xxh3_128,
+}
+
+_available = {}
+_available_lock = threading.Lock()
+
+
+def resolve_algorithm(algo: str) -> str:
+    """Returns the algorithm to use instead of the given one if it is not available"""
+    with _available_lock:
+        if algo not in _available:
+            if algo not in ALGORITHMS:
+                raise ValueError(f"Unknown hash algorithm: {algo}")
+            try:
+                ALGORITHMS[algo]()
+                _available[algo] = algo
+            except ImportError as e:
+                pc_logging.warning(f"Hash algorithm '{algo}' is not available ({e}), using '{ALGORITHM_FALLBACK}'")
+                _available[algo] = ALGORITHM_FALLBACK
+        return _available[algo]
+
+
+def new_hasher(algo: str):
+    if algo not in ALGORITHMS:
+        raise ValueError(f"Unknown hash algorithm: {algo}")
+    return ALGORITHMS[algo]()
+
+
+def format_key(algo: str, hexdigest: str) -> str:
+    if algo == ALGORITHM_DEFAULT:
+        return hexdigest
+    return f"{algo}-{hexdigest}"
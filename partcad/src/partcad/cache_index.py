@@ -0,0 +1,292 @@
+#
+# PartCAD, 2025
+#
+# Licensed under Apache License, Version 2.0.
+#
+
+# Index of the filesystem cache entries, used to keep the total size of the
+# cache within the budget and to collect hit/miss statistics.
+#
+# Lookups and writes are recorded in memory and flushed to an SQLite database
+# by a background thread, which also evicts the least recently (or least
+# frequently) used entries when the cache grows beyond its budget.
+# SQLite takes care of concurrent access by several PartCAD processes.
+
+import atexit
+from contextlib import contextmanager
+import os
+from pathlib import Path
+import sqlite3
+import threading
+import time
+
+from . import logging as pc_logging
+from . import telemetry
+
+INDEX_DIR = ".index"
+INDEX_FILE = "index.sqlite"
+
+# How often the recorded accesses are flushed to the index
+FLUSH_INTERVAL = 5.0
+
+# Eviction stops when the cache shrinks below this fraction of the budget,
+# so that it does not run again on each write
+LOW_WATERMARK = 0.9
+
+EVICTION_POLICY_LRU = "lru"
+EVICTION_POLICY_LFU = "lfu"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    data_type TEXT NOT NULL,
+    name TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    accessed REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (data_type, name)
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+CREATE TABLE IF NOT EXISTS stats (
+    data_type TEXT PRIMARY KEY,
+    hits INTEGER NOT NULL DEFAULT 0,
+    misses INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+class CacheIndex:
+    def __init__(self, cache_dir: str, max_size: int = 0, policy: str = EVICTION_POLICY_LRU) -> None:
+        if policy not in (EVICTION_POLICY_LRU, EVICTION_POLICY_LFU):
+            raise ValueError(f"Unknown cache eviction policy: {policy}")
+        self.cache_dir = Path(cache_dir)
+        self.max_size = max_size
+        self.policy = policy
+
+        index_dir = self.cache_dir / INDEX_DIR
+        index_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = index_dir / INDEX_FILE
+        # The cache may have been populated before the index was introduced
+        self.needs_scan = not self.db_path.exists()
+        with self._connect() as db:
+            db.executescript(SCHEMA)
+
+        self.lock = threading.Lock()
+        self.pending_writes: dict[tuple[str, str], tuple[int, float]] = {}
+        self.pending_hits: dict[tuple[str, str], tuple[int, float]] = {}
+        self.pending_stats: dict[str, list[int]] = {}
+
+        self.thread = None
+        self.stopped = threading.Event()
+
+    @contextmanager
+    def _connect(self):
+        # Transactions are managed explicitly, the ones not committed are rolled back on close
+        db = sqlite3.connect(self.db_path, timeout=30.0, isolation_level=None)
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def _start(self) -> None:
+        # Called with the lock held
+        if self.thread is None and not self.stopped.is_set():
+            self.thread = threading.Thread(target=self._run, name="cache-index", daemon=True)
+            self.thread.start()
+            atexit.register(self.close)
+
+    def _run(self) -> None:
+        if self.needs_scan:
+            self.scan()
+        while not self.stopped.wait(FLUSH_INTERVAL):
+            try:
+                self.flush()
+                if self.max_size > 0:
+                    self.evict()
+            except Exception as e:
+                pc_logging.debug(f"Failed to update the cache index: {e}")
+
+    def record_write(self, data_type: str, name: str, size: int) -> None:
+        with self.lock:
+            self.pending_writes[(data_type, name)] = (size, time.time())
+            self._start()
+
+    def record_hit(self, data_type: str, name: str) -> None:
+        with self.lock:
+            count, _ = self.pending_hits.get((data_type, name), (0, 0.0))
+            self.pending_hits[(data_type, name)] = (count + 1, time.time())
+            self.pending_stats.setdefault(data_type, [0, 0])[0] += 1
+            self._start()
+
+    def record_miss(self, data_type: str) -> None:
+        with self.lock:
+            self.pending_stats.setdefault(data_type, [0, 0])[1] += 1
+            self._start()
+
+    def flush(self) -> None:
+        with self.lock:
+            writes, self.pending_writes = self.pending_writes, {}
+            hits, self.pending_hits = self.pending_hits, {}
+            stats, self.pending_stats = self.pending_stats, {}
+        if not (writes or hits or stats):
+            return
+
+        with self._connect() as db:
+            db.execute("BEGIN")
+            db.executemany(
+                "INSERT INTO entries (data_type, name, size, accessed) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (data_type, name) DO UPDATE SET size = excluded.size, accessed = excluded.accessed",
+                [(data_type, name, size, accessed) for (data_type, name), (size, accessed) in writes.items()],
+            )
+            for (data_type, name), (count, accessed) in hits.items():
+                cursor = db.execute(
+                    "UPDATE entries SET hits = hits + ?, accessed = max(accessed, ?) WHERE data_type = ? AND name = ?",
+                    (count, accessed, data_type, name),
+                )
+                if cursor.rowcount == 0:
+                    # The entry predates the index
+                    try:
+                        size = os.path.getsize(self.cache_dir / data_type / name)
+                    except OSError:
+                        continue
+                    db.execute(
+                        "INSERT OR IGNORE INTO entries (data_type, name, size, accessed, hits) VALUES (?, ?, ?, ?, ?)",
+                        (data_type, name, size, accessed, count),
+                    )
+            db.executemany(
+                "INSERT INTO stats (data_type, hits, misses) VALUES (?, ?, ?) "
+                "ON CONFLICT (data_type) DO UPDATE SET hits = hits + excluded.hits, misses = misses + excluded.misses",
+                [(data_type, counts[0], counts[1]) for data_type, counts in stats.items()],
+            )
+            db.execute("COMMIT")
+
+    def get_total_size(self) -> int:
+        with self._connect() as db:
+            return db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def evict(self, max_size: int = None) -> tuple[int, int]:
+        """Removes the least valuable entries if the cache is over the budget.
+
+        Returns the number of removed entries and bytes.
+        """
+        if max_size is None:
+            max_size = self.max_size
+        if self.policy == EVICTION_POLICY_LFU:
+            order = "hits ASC, accessed ASC"
+        else:
+            order = "accessed ASC"
+
+        removed_count = 0
+        removed_bytes = 0
+        with self._connect() as db:
+            # Prevent other processes from evicting the same entries at the same time
+            db.execute("BEGIN IMMEDIATE")
+            total = db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total <= max_size:
+                db.execute("COMMIT")
+                return 0, 0
+
+            target = int(max_size * LOW_WATERMARK)
+            evicted = []
+            for data_type, name, size in db.execute(f"SELECT data_type, name, size FROM entries ORDER BY {order}"):
+                if total <= target:
+                    break
+                try:
+                    os.remove(self.cache_dir / data_type / name)
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    pc_logging.debug(f"Failed to remove the cache entry {data_type}/{name}: {e}")
+                    continue
+                evicted.append((data_type, name))
+                total -= size
+                removed_count += 1
+                removed_bytes += size
+            db.executemany("DELETE FROM entries WHERE data_type = ? AND name = ?", evicted)
+            db.execute("COMMIT")
+
+        if removed_count:
+            pc_logging.debug(f"Evicted {removed_count} cache entries ({removed_bytes} bytes)")
+        return removed_count, removed_bytes
+
+    def scan(self) -> None:
+        """Reconciles the index with the files present in the cache folder"""
+        with telemetry.start_as_current_span("CacheIndex.scan"):
+            found = {}
+            for data_type_dir in self.cache_dir.iterdir():
+                if not data_type_dir.is_dir() or data_type_dir.name == INDEX_DIR:
+                    continue
+                with os.scandir(data_type_dir) as it:
+                    for entry in it:
+                        if entry.is_file():
+                            stat = entry.stat()
+                            found[(data_type_dir.name, entry.name)] = (stat.st_size, stat.st_mtime)
+
+            with self._connect() as db:
+                db.execute("BEGIN IMMEDIATE")
+                indexed = set(db.execute("SELECT data_type, name FROM entries"))
+                db.executemany(
+                    "DELETE FROM entries WHERE data_type = ? AND name = ?",
+                    [key for key in indexed if key not in found],
+                )
+                db.executemany(
+                    "INSERT INTO entries (data_type, name, size, accessed) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (data_type, name) DO UPDATE SET size = excluded.size",
+                    [(data_type, name, size, mtime) for (data_type, name), (size, mtime) in found.items()],
+                )
+                db.execute("COMMIT")
+        self.needs_scan = False
+
+    def gc(self, max_size: int = None) -> tuple[int, int]:
+        """Synchronizes the index with the filesystem and enforces the budget"""
+        self.flush()
+        self.scan()
+        if max_size is None:
+            if self.max_size <= 0:
+                # The cache size is not limited
+                return 0, 0
+            max_size = self.max_size
+        # An explicit size of 0 removes all entries
+        return self.evict(max_size)
+
+    def get_stats(self) -> dict[str, dict[str, int]]:
+        self.flush()
+        stats = {}
+        with self._connect() as db:
+            for data_type, entries, size in db.execute(
+                "SELECT data_type, COUNT(*), SUM(size) FROM entries GROUP BY data_type"
+            ):
+                stats[data_type] = {"entries": entries, "bytes": size, "hits": 0, "misses": 0}
+            for data_type, hits, misses in db.execute("SELECT data_type, hits, misses FROM stats"):
+                stats.setdefault(data_type, {"entries": 0, "bytes": 0})
+                stats[data_type]["hits"] = hits
+                stats[data_type]["misses"] = misses
+        return stats
+
+    def close(self) -> None:
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        try:
+            self.flush()
+        except Exception as e:
+            pc_logging.debug(f"Failed to update the cache index: {e}")
+
+
+indexes: dict[str, CacheIndex] = {}
+indexes_lock = threading.Lock()
+
+
+def get_cache_index(user_config) -> CacheIndex:
+    """Returns the index shared by all caches in the given internal state folder"""
+    cache_dir = os.path.join(user_config.internal_state_dir, "cache")
+    with indexes_lock:
+        index = indexes.get(cache_dir, None)
+        if index is None:
+            index = CacheIndex(
+                cache_dir,
+                max_size=user_config.cache_max_size,
+                policy=user_config.cache_eviction_policy,
+            )
+            indexes[cache_dir] = index
+        return index
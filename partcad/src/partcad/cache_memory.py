@@ -0,0 +1,147 @@
+#
+# PartCAD, 2025
+#
+# Licensed under Apache License, Version 2.0.
+#
+
+# Memory cache of the shapes instantiated in a context.
+#
+# Shapes keep their geometry in memory to avoid reloading it on each access.
+# This cache only keeps track of the memory they use and makes the least
+# recently used shapes drop their geometry when the total goes above the
+# budget, so that long running processes (e.g. the VS Code extension's
+# language server) do not grow without bound.
+# The shapes are referenced weakly and can still be garbage collected.
+
+from collections import OrderedDict
+import sys
+import threading
+import weakref
+
+from . import logging as pc_logging
+
+# Rough memory footprint of the geometry of a single face (surface, wires, edges, vertices)
+FACE_SIZE = 2048
+# Memory footprint of a triangulation node (point, normal and UV) and of a triangle
+NODE_SIZE = 56
+TRIANGLE_SIZE = 12
+
+
+def _estimate_shape_size(shape) -> int:
+    from OCP.BRep import BRep_Tool
+    from OCP.TopAbs import TopAbs_FACE
+    from OCP.TopExp import TopExp
+    from OCP.TopLoc import TopLoc_Location
+    from OCP.TopoDS import TopoDS
+    from OCP.TopTools import TopTools_IndexedMapOfShape
+
+    # Faces shared by several instances are only counted once
+    faces = TopTools_IndexedMapOfShape()
+    TopExp.MapShapes_s(shape, TopAbs_FACE, faces)
+    size = faces.Extent() * FACE_SIZE
+    location = TopLoc_Location()
+    for i in range(1, faces.Extent() + 1):
+        triangulation = BRep_Tool.Triangulation_s(TopoDS.Face_s(faces.FindKey(i)), location)
+        if triangulation is not None:
+            size += triangulation.NbNodes() * NODE_SIZE + triangulation.NbTriangles() * TRIANGLE_SIZE
+    return size
+
+
+def estimate_size(value) -> int:
+    """Returns a cheap estimate of the memory used by the given object.
+
+    Shapes are estimated based on the number of faces and triangles,
+    not by walking the object graph.
+    """
+    if value is None:
+        return 0
+    if isinstance(value, (bytes, bytearray, memoryview, str)):
+        return len(value)
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_size(item) for item in value)
+    if hasattr(value, "wrapped"):
+        # cadquery and build123d objects
+        value = value.wrapped
+    if type(value).__module__.startswith("OCP.TopoDS"):
+        if value.IsNull():
+            return 0
+        return _estimate_shape_size(value)
+    return sys.getsizeof(value)
+
+
+class MemoryCache:
+    def __init__(self, max_size: int = 0) -> None:
+        self.max_size = max_size
+        self.size = 0
+        self.hits = 0
+        self.evictions = 0
+        # Reentrant as the weak reference callbacks may be invoked by the garbage
+        # collector while the lock is held by the same thread
+        self.lock = threading.RLock()
+        self.entries: OrderedDict[int, tuple[weakref.ref, int]] = OrderedDict()
+
+    def put(self, owner, size: int) -> bool:
+        """Accounts for the memory used by the given owner.
+
+        Returns False if the owner should not keep its object in memory.
+        Other owners may be asked to drop their objects to stay within the budget.
+        """
+        if self.max_size > 0 and size > self.max_size:
+            return False
+
+        key = id(owner)
+        with self.lock:
+            self._remove(key)
+            self.entries[key] = (weakref.ref(owner, lambda _: self.discard_key(key)), size)
+            self.size += size
+            evicted = self._evict()
+
+        for victim in evicted:
+            victim.drop_wrapped()
+        return True
+
+    def touch(self, owner) -> None:
+        """Marks the owner as the most recently used"""
+        key = id(owner)
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+
+    def discard(self, owner) -> None:
+        self.discard_key(id(owner))
+
+    def discard_key(self, key: int) -> None:
+        with self.lock:
+            self._remove(key)
+
+    def _remove(self, key: int) -> None:
+        # Called with the lock held
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry[1]
+
+    def _evict(self) -> list:
+        # Called with the lock held
+        evicted = []
+        if self.max_size <= 0:
+            return evicted
+        while self.size > self.max_size and len(self.entries) > 1:
+            _, (ref, size) = self.entries.popitem(last=False)
+            self.size -= size
+            self.evictions += 1
+            owner = ref()
+            if owner is not None:
+                evicted.append(owner)
+        if evicted:
+            pc_logging.debug(f"Evicted {len(evicted)} shapes from memory, {self.size} bytes in use")
+        return evicted
+
+    def get_stats(self) -> dict[str, int]:
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "bytes": self.size,
+                "hits": self.hits,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,219 @@
+#
+# PartCAD, 2025
+#
+# Licensed under Apache License, Version 2.0.
+#
+
+# Snapshot of the parsed package configurations ('partcad.yaml').
+#
+# Rendering the Jinja templates and parsing the YAML of every package is the
+# most expensive part of loading a context. The parsed configuration of each
+# package is remembered together with the size, modification time, inode and
+# digest of the configuration file and of every file included by its templates,
+# as well as the files that would shadow the included ones if they were created.
+# Only the packages whose configuration files have changed since are parsed
+# again, unless the paranoid mode is enabled. Files touched without any change
+# to their content (e.g. by a checkout) are detected using their digests.
+
+from contextlib import contextmanager
+import json
+import os
+from pathlib import Path
+import pickle
+import sqlite3
+import threading
+import time
+
+from . import logging as pc_logging
+from .cache_digest_index import hash_file
+
+INDEX_DIR = ".index"
+INDEX_FILE = "packages.sqlite"
+
+# Configuration files modified less than that many seconds before they were
+# parsed may be modified again without any change to their modification time
+RACY_INTERVAL = 2.0
+
+# Bumped whenever the way the configuration is parsed or stored changes
+FORMAT_VERSION = 2
+
+DIGEST_ALGORITHM = "blake2b"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS packages (
+    path TEXT NOT NULL,
+    name TEXT NOT NULL,
+    include_paths TEXT NOT NULL,
+    variables TEXT NOT NULL,
+    files TEXT NOT NULL,
+    config BLOB NOT NULL,
+    PRIMARY KEY (path, name, include_paths, variables)
+);
+"""
+
+
+def stat_files(filenames: list[str]) -> list[list]:
+    """Returns the state of the files to compare with, None for the missing ones"""
+    files = []
+    for filename in filenames:
+        try:
+            stat = os.stat(filename)
+            files.append([filename, stat.st_size, stat.st_mtime_ns, stat.st_ino])
+        except OSError:
+            files.append([filename, None, None, None])
+    return files
+
+
+def digest_files(files: list[list]) -> list[str | None] | None:
+    """Returns the digests of the files, or None if any of them can't be read"""
+    digests = []
+    for filename, size, _mtime, _ino in files:
+        if size is None:
+            digests.append(None)
+            continue
+        try:
+            digests.append(hash_file(filename, DIGEST_ALGORITHM).hex())
+        except OSError:
+            return None
+    return digests
+
+
+def get_key(path: str, name: str, include_paths: list[str], variables: dict) -> tuple[str, str, str, str]:
+    return (path, name, json.dumps(include_paths), json.dumps(variables, sort_keys=True))
+
+
+class PackageIndex:
+    def __init__(self, cache_dir: str) -> None:
+        index_dir = Path(cache_dir) / INDEX_DIR
+        index_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = index_dir / INDEX_FILE
+        with self._connect() as db:
+            if db.execute("PRAGMA user_version").fetchone()[0] != FORMAT_VERSION:
+                db.executescript("DROP TABLE IF EXISTS packages; PRAGMA user_version = %d;" % FORMAT_VERSION)
+            db.executescript(SCHEMA)
+
+        self.lock = threading.Lock()
+        # Loaded on first use
+        self.packages: dict[tuple[str, str, str, str], tuple[list, list, bytes]] = None
+        self.hits = 0
+        self.misses = 0
+
+    @contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.db_path, timeout=30.0, isolation_level=None)
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def _load(self) -> None:
+        # Called with the lock held
+        if self.packages is None:
+            with self._connect() as db:
+                self.packages = {}
+                try:
+                    rows = db.execute(
+                        "SELECT path, name, include_paths, variables, files, config FROM packages"
+                    ).fetchall()
+                except sqlite3.Error as e:
+                    pc_logging.debug(f"Failed to read the package index: {e}")
+                    rows = []
+                for path, name, include_paths, variables, files, config in rows:
+                    files = json.loads(files)
+                    # The digests are stored alongside the state of each file
+                    self.packages[(path, name, include_paths, variables)] = (
+                        [file[:4] for file in files],
+                        [file[4] for file in files],
+                        config,
+                    )
+
+    def lookup(self, path: str, name: str, include_paths: list[str], variables: dict) -> dict | None:
+        """Returns a fresh copy of the parsed configuration if none of its files changed"""
+        key = get_key(path, name, include_paths, variables)
+        with self.lock:
+            self._load()
+            entry = self.packages.get(key, None)
+        if entry is not None:
+            files, digests, config = entry
+            current = stat_files([file[0] for file in files])
+            if current == files:
+                hit = True
+            elif [file[1] for file in current] != [file[1] for file in files]:
+                # Any file created, deleted or resized has certainly changed
+                hit = False
+            else:
+                # Touched files may still have the same content
+                hit = digest_files(current) == digests
+                if hit:
+                    self._save(key, current, digests, config)
+            if hit:
+                with self.lock:
+                    self.hits += 1
+                return pickle.loads(config)
+        with self.lock:
+            self.misses += 1
+        return None
+
+    def store(
+        self,
+        path: str,
+        name: str,
+        include_paths: list[str],
+        variables: dict,
+        filenames: list[str],
+        config_obj,
+    ) -> None:
+        files = stat_files(list(dict.fromkeys(filenames)))
+        digests = digest_files(files)
+        if digests is None:
+            return
+        try:
+            config = pickle.dumps(config_obj, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError) as e:
+            pc_logging.debug(f"Failed to snapshot the package configuration '{path}': {e}")
+            return
+        self._save(get_key(path, name, include_paths, variables), files, digests, config)
+
+    def _save(self, key: tuple[str, str, str, str], files: list[list], digests: list, config: bytes) -> None:
+        now = time.time_ns()
+        if any(file[2] is not None and now - file[2] < RACY_INTERVAL * 1e9 for file in files):
+            # The files may still be changing within the same timestamp
+            return
+
+        with self.lock:
+            self._load()
+            self.packages[key] = (files, digests, config)
+        try:
+            with self._connect() as db:
+                db.execute(
+                    "INSERT OR REPLACE INTO packages VALUES (?, ?, ?, ?, ?, ?)",
+                    (*key, json.dumps([file + [digest] for file, digest in zip(files, digests)]), config),
+                )
+        except sqlite3.Error as e:
+            pc_logging.debug(f"Failed to update the package index: {e}")
+
+    def get_stats(self) -> dict:
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+
+_indexes: dict[str, PackageIndex] = {}
+_index_lock = threading.Lock()
+
+
+def get_package_index(user_config) -> PackageIndex | None:
+    """Returns the index shared by all packages in the given internal state folder"""
+    if user_config.cache_dependencies_paranoid:
+        return None
+
+    cache_dir = os.path.join(user_config.internal_state_dir, "cache")
+    with _index_lock:
+        index = _indexes.get(cache_dir, None)
+        if index is None:
+            try:
+                index = PackageIndex(cache_dir)
+            except (OSError, sqlite3.Error) as e:
+                pc_logging.debug(f"Failed to open the package index: {e}")
+                return None
+            _indexes[cache_dir] = index
+        return index
@@ -0,0 +1,158 @@
+#
+# PartCAD, 2025
+#
+# Licensed under Apache License, Version 2.0.
+#
+
+import os
+import shutil
+import threading
+
+from .cache import Cache
+from .cache_hash import CacheHash
+from . import logging as pc_logging
+from .render import MESH_FORMATS
+from . import telemetry
+from . import wrapper
+
+
+def normalize_options(options: dict) -> dict:
+    """Makes the options hash the same way regardless of the types of numbers and sequences"""
+
+    def normalize(value):
+        if isinstance(value, bool) or value is None or isinstance(value, str):
+            return value
+        if isinstance(value, (int, float)):
+            return float(value)
+        if isinstance(value, (list, tuple)):
+            return [normalize(item) for item in value]
+        if isinstance(value, dict):
+            return {str(key): normalize(item) for key, item in value.items()}
+        return str(value)
+
+    return normalize(options)
+
+
+def get_wrapper_files(format_name: str) -> list[str]:
+    """Returns the files of the wrappers that may produce the given format"""
+    filenames = [wrapper.get(f"render_{format_name}.py")]
+    if format_name in MESH_FORMATS:
+        # Mesh formats are also rendered together out of one triangulation
+        filenames.append(wrapper.get("render_mesh.py"))
+        filenames.append(os.path.join(os.path.dirname(__file__), "utils_ocp.py"))
+    elif format_name == "png":
+        # PNG images are made of the projection of the SVG wrapper
+        filenames.append(wrapper.get("render_svg.py"))
+    return filenames
+
+
+@telemetry.instrument()
+class RenderCache(Cache):
+    """Caches the rendered files, keyed by the shape, the format and the render options.
+
+    The cached files are hardlinked (or copied if not possible) to and from the output paths.
+    """
+
+    def __init__(self, user_config=None) -> None:
+        super().__init__("renders", user_config)
+        self.stats: dict[str, list[int]] = {}
+        self.stats_lock = threading.Lock()
+
+    def get_hash(self, name: str, shape_key: str, format_name: str, options: dict) -> CacheHash:
+        from . import __version__
+
+        hash = CacheHash(f"{name}.{format_name}", cache=self.user_config.cache, user_config=self.user_config)
+        hash.add_string(__version__)
+        hash.add_string(shape_key)
+        hash.add_string(format_name)
+        hash.add_dict(normalize_options(options))
+        # Changes to the wrappers invalidate the files they rendered
+        for filename in get_wrapper_files(format_name):
+            hash.add_filename(filename)
+        return hash
+
+    def _record(self, format_name: str, hit: bool) -> None:
+        with self.stats_lock:
+            self.stats.setdefault(format_name, [0, 0])[0 if hit else 1] += 1
+
+    def restore(self, hash: CacheHash, format_name: str, path: str) -> bool:
+        """Puts the cached file at the given path, returns False if it is not cached"""
+        if not self.user_config.cache:
+            # Caching is disabled
+            return False
+
+        cache_path = self.get_cache_path(hash)
+        if not cache_path:
+            # Hash is not produced
+            return False
+
+        entry_path = f"{cache_path}.{format_name}"
+        if not os.path.exists(entry_path):
+            self._record(format_name, False)
+            if self.index:
+                self.index.record_miss(self.data_type)
+            return False
+
+        try:
+            if not os.path.exists(path) or not os.path.samefile(entry_path, path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                if os.path.exists(path):
+                    os.remove(path)
+                try:
+                    os.link(entry_path, path)
+                except OSError:
+                    shutil.copyfile(entry_path, path)
+        except OSError as e:
+            pc_logging.debug(f"Failed to restore {path} from the render cache: {e}")
+            self._record(format_name, False)
+            return False
+
+        self._record(format_name, True)
+        if self.index:
+            self.index.record_hit(self.data_type, f"{cache_path.name}.{format_name}")
+        return True
+
+    def detach(self, path: str) -> None:
+        """Unlinks the output from the cached file before it is rendered again, so that the cached file is kept"""
+        try:
+            if os.path.exists(path) and os.stat(path).st_nlink > 1:
+                os.remove(path)
+        except OSError as e:
+            pc_logging.debug(f"Failed to unlink {path} from the render cache: {e}")
+
+    def store(self, hash: CacheHash, format_name: str, path: str) -> None:
+        """Adds the rendered file to the cache"""
+        if not self.user_config.cache:
+            # Caching is disabled
+            return
+
+        cache_path = self.get_cache_path(hash)
+        if not cache_path or not os.path.exists(path):
+            return
+
+        entry_path = f"{cache_path}.{format_name}"
+        try:
+            if os.path.exists(entry_path):
+                os.remove(entry_path)
+            try:
+                os.link(path, entry_path)
+            except OSError:
+                shutil.copyfile(path, entry_path)
+            with open(f"{cache_path}.name", "wb") as f:
+                f.write(hash.name.encode())
+        except OSError as e:
+            pc_logging.debug(f"Failed to add {path} to the render cache: {e}")
+            return
+
+        if self.index:
+            self.index.record_write(self.data_type, f"{cache_path.name}.{format_name}", os.path.getsize(entry_path))
+            self.index.record_write(self.data_type, f"{cache_path.name}.name", len(hash.name.encode()))
+
+    def get_stats(self) -> dict[str, tuple[int, int]]:
+        """Returns the number of (hits, misses) per format"""
+        with self.stats_lock:
+            return {format_name: tuple(counts) for format_name, counts in self.stats.items()}
+
+    def log_stats(self) -> None:
+        for format_name, (hits, misses) in sorted(self.get_stats().items()):
+            pc_logging.info(f"Render cache {format_name}: {hits} hits, {misses} misses")
@@ -0,0 +1,225 @@
+#
+# PartCAD, 2025
+#
+# Licensed under Apache License, Version 2.0.
+#
+
+# Serialization of objects stored in the filesystem cache.
+#
+# Each cache entry starts with a header identifying the serializer and the
+# compression used to produce it:
+#   <"PCC"><header version><serializer id><compression id><payload>
+# Entries written before the header was introduced are plain pickles.
+# They are recognized by the absence of the header and remain readable.
+
+from io import BytesIO
+import os
+import pickle
+import struct
+import sys
+import threading
+
+from . import logging as pc_logging
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "wrappers"))
+
+ENTRY_MAGIC = b"PCC"
+ENTRY_VERSION = 1
+ENTRY_HEADER = struct.Struct("!3sBBB")
+
+
+class CacheSerializer:
+    """Converts cached objects to bytes and back"""
+
+    id: int = 0
+    name: str = ""
+
+    def can_serialize(self, value) -> bool:
+        return True
+
+    def dumps(self, value) -> bytes:
+        raise NotImplementedError()
+
+    def loads(self, data: bytes):
+        raise NotImplementedError()
+
+
+class PickleSerializer(CacheSerializer):
+    """Any picklable object, shapes are embedded as binary BREP"""
+
+    id = 1
+    name = "pickle"
+
+    def __init__(self):
+        # Lazy import as OCP is slow to load
+        from ocp_serialize import out_of_band_dispatch_table, register as register_ocp_helper
+
+        register_ocp_helper()
+        self.dispatch_table = out_of_band_dispatch_table()
+
+    def dumps(self, value) -> bytes:
+        with BytesIO() as bio:
+            # No buffer callback, so the shapes are stored in-band
+            pickler = pickle.Pickler(bio, protocol=5)
+            pickler.dispatch_table = self.dispatch_table
+            pickler.dump(value)
+            return bio.getvalue()
+
+    def loads(self, data: bytes):
+        return pickle.loads(data)
+
+
+class BrepSerializer(CacheSerializer):
+    """A single shape as a binary BREP blob (readable by any OCCT based tool)"""
+
+    id = 2
+    name = "brep"
+
+    def can_serialize(self, value) -> bool:
+        from OCP.TopoDS import TopoDS_Shape
+
+        return isinstance(value, TopoDS_Shape) and not value.IsNull()
+
+    def dumps(self, value) -> bytes:
+        from OCP.BinTools import BinTools, BinTools_FormatVersion
+
+        with BytesIO() as bio:
+            # Format version 4 relies on stream positioning which is not reliable
+            # with python streams, hence version 3 is used
+            BinTools.Write_s(value, bio, True, False, BinTools_FormatVersion.BinTools_FormatVersion_VERSION_3)
+            return bio.getvalue()
+
+    def loads(self, data: bytes):
+        from OCP.BinTools import BinTools
+        from OCP.TopoDS import TopoDS_Shape
+        from ocp_serialize import downcast
+
+        shape = TopoDS_Shape()
+        with BytesIO(data) as bio:
+            BinTools.Read_s(shape, bio)
+        return downcast(shape)
+
+
+class CacheCompressor:
+    id: int = 0
+    name: str = "none"
+
+    def compress(self, data: bytes) -> bytes:
+        return data
+
+    def decompress(self, data: bytes) -> bytes:
+        return data
+
+
+class ZstdCompressor(CacheCompressor):
+    id = 1
+    name = "zstd"
+
+    def __init__(self):
+        import zstandard
+
+        self.zstandard = zstandard
+
+    def compress(self, data: bytes) -> bytes:
+        return self.zstandard.ZstdCompressor(level=3).compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return self.zstandard.ZstdDecompressor().decompress(data)
+
+
+class Lz4Compressor(CacheCompressor):
+    id = 2
+    name = "lz4"
+
+    def __init__(self):
+        import lz4.frame
+
+        self.lz4 = lz4.frame
+
+    def compress(self, data: bytes) -> bytes:
+        return self.lz4.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return self.lz4.decompress(data)
+
+
+# Serializers and compressors are instantiated on first use,
+# as some of them depend on heavy or optional modules
+SERIALIZERS = {cls.name: cls for cls in (PickleSerializer, BrepSerializer)}
+COMPRESSORS = {cls.name: cls for cls in (CacheCompressor, ZstdCompressor, Lz4Compressor)}
+
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+def register_serializer(cls: type) -> None:
+    if any(other.id == cls.id and other is not cls for other in SERIALIZERS.values()):
+        raise ValueError(f"Duplicate cache serializer id: {cls.id}")
+    SERIALIZERS[cls.name] = cls
+
+
+def register_compressor(cls: type) -> None:
+    if any(other.id == cls.id and other is not cls for other in COMPRESSORS.values()):
+        raise ValueError(f"Duplicate cache compressor id: {cls.id}")
+    COMPRESSORS[cls.name] = cls
+
+
+def _get_instance(registry: dict, name: str):
+    with _instances_lock:
+        key = (id(registry), name)
+        if key not in _instances:
+            cls = registry.get(name, None)
+            if cls is None:
+                raise ValueError(f"Unknown cache serialization: {name}")
+            try:
+                _instances[key] = cls()
+            except ImportError as e:
+                # Optional dependencies
+                pc_logging.warning(f"Cache compression '{name}' is not available ({e}), not compressing")
+                _instances[key] = None
+        return _instances[key]
+
+
+def get_serializer(name: str) -> CacheSerializer:
+    return _get_instance(SERIALIZERS, name)
+
+
+def get_compressor(name: str) -> CacheCompressor:
+    """Returns the compressor or None if its module is not installed"""
+    return _get_instance(COMPRESSORS, name)
+
+
+def _find_by_id(registry: dict, entry_id: int) -> str:
+    for name, cls in registry.items():
+        if cls.id == entry_id:
+            return name
+    raise ValueError(f"Unknown cache entry format: {entry_id}")
+
+
+def dumps(value, serializers: list[str], compression: str = "none") -> bytes:
+    """Serializes the value using the first of the given serializers that supports it"""
+    for name in serializers:
+        serializer = get_serializer(name)
+        if serializer.can_serialize(value):
+            break
+    else:
+        serializer = get_serializer(PickleSerializer.name)
+
+    compressor = get_compressor(compression) or get_compressor(CacheCompressor.name)
+    data = compressor.compress(serializer.dumps(value))
+    return ENTRY_HEADER.pack(ENTRY_MAGIC, ENTRY_VERSION, serializer.id, compressor.id) + data
+
+
+def loads(data: bytes):
+    if len(data) < ENTRY_HEADER.size or data[: len(ENTRY_MAGIC)] != ENTRY_MAGIC:
+        # Legacy entry
+        return get_serializer(PickleSerializer.name).loads(data)
+
+    _, version, serializer_id, compressor_id = ENTRY_HEADER.unpack_from(data)
+    if version != ENTRY_VERSION:
+        raise ValueError(f"Unsupported cache entry version: {version}")
+    serializer = get_serializer(_find_by_id(SERIALIZERS, serializer_id))
+    compressor = get_compressor(_find_by_id(COMPRESSORS, compressor_id))
+    if compressor is None:
+        raise ValueError(f"Cache entry is compressed with a missing module: {compressor_id}")
+    return serializer.loads(compressor.decompress(memoryview(data)[ENTRY_HEADER.size :]))
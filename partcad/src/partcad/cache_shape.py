@@ -7,70 +7,81 @@
 # Licensed under Apache License, Version 2.0.
 #
 
-import pickle
-
+from . import cache_serializer
 from .cache import Cache
 from .cache_hash import CacheHash
-from .shape import Shape
-from .utils import total_size
+from . import logging as pc_logging
+from .cache_memory import estimate_size
 from . import telemetry
 
-SERIALIZATION_PICKLE = 1
-SERIALIZATION_BREP = 2
+SERIALIZATION_PICKLE = cache_serializer.PickleSerializer.name
+SERIALIZATION_BREP = cache_serializer.BrepSerializer.name
+
+# Keys holding a single shape, they can be stored using any serialization
+SHAPE_KEYS = ("part", "assembly", "sketch")
 
 
 @telemetry.instrument()
 class ShapeCache(Cache):
-    def __init__(self, serialization: int = SERIALIZATION_PICKLE, user_config=None) -> None:
+    def __init__(self, serialization: str = None, user_config=None) -> None:
         super().__init__("shapes", user_config)
+        if serialization is None:
+            serialization = user_config.cache_serialization
         self.serialization = serialization
+        self.compression = user_config.cache_compression
+
+    def get_serializers(self, key: str) -> list[str]:
+        """Returns the serializers to try for the given key in the order of preference"""
+        if key in SHAPE_KEYS:
+            return [self.serialization, SERIALIZATION_PICKLE]
+        # Lists of components, test results and other objects
+        return [SERIALIZATION_PICKLE]
+
+    async def write_async(self, hash: CacheHash, items: dict[str, object]) -> dict[str, int]:
+        """Writes the items to the filesystem cache.
 
-    async def write_async(self, hash: CacheHash, items: dict[str, object]) -> dict[str, bool]:
+        Returns the estimated memory size of each item that is advised to be kept in memory, 0 otherwise.
+        """
         results = {}
-        if self.user_config.cache:
-            serialized_items = {}
+        serialized_items = {}
+        if self.user_config.cache and hash.get() is not None:
             for key, value in items.items():
-                # TODO(clairbee): if we know this is a valid solid, then we should use faster BREP
-                # if key.startswith(["part", "assembly"]):
-                #     # serialization = SERIALIZATION_BREP
-                # else:
-                serialization = self.serialization
-                if serialization == SERIALIZATION_PICKLE:
-                    data = pickle.dumps(value)
-                elif serialization == SERIALIZATION_BREP:
-                    data = Shape.to_brep(value)
-                else:
-                    raise ValueError(f"Unknown serialization type: {serialization}")
-                serialized_items[key] = data
+                serialized_items[key] = cache_serializer.dumps(value, self.get_serializers(key), self.compression)
 
             cached_in_files = await self.write_data_async(hash, serialized_items)
+        else:
+            # Nothing to write to the filesystem
+            cached_in_files = {}
 
         for key, value in items.items():
-            if self.user_config.cache:
+            if key in serialized_items:
                 key_is_cached_in_files = cached_in_files.get(key, False)
-                data_len = total_size(value)
+                # The serialized size is a good enough estimate of the memory footprint
+                data_len = len(serialized_items[key])
             else:
                 key_is_cached_in_files = False
-                if self.user_config.cache_memory_max_entry_size > 0:
-                    # Need to know the object size to check the max limit
-                    data_len = total_size(value)
+                data_len = estimate_size(value)
 
             if self.user_config.cache_memory_max_entry_size > 0 and data_len > self.user_config.cache_memory_max_entry_size:
                 # If the object is too big, we can free the memory
-                results[key] = False
+                results[key] = 0
             elif (
                 key_is_cached_in_files
                 and self.user_config.cache_memory_double_cache_max_entry_size > 0
                 and data_len > self.user_config.cache_memory_double_cache_max_entry_size
             ):
                 # The object is bigger than what we want to store in both caches
-                results[key] = False
+                results[key] = 0
             else:
-                results[key] = True
+                results[key] = max(data_len, 1)
 
         return results
 
-    async def read_async(self, hash: CacheHash, keys: list[str]) -> tuple[dict[str, object], dict[str, bool]]:
+    async def read_async(self, hash: CacheHash, keys: list[str]) -> tuple[dict[str, object], dict[str, int]]:
+        """Reads the items from the filesystem cache.
+
+        Also returns the estimated memory size of each item that is advised to be kept in memory, 0 otherwise.
+        """
         if not self.user_config.cache:
             # Caching is disabled
             return {}, {}
@@ -86,46 +97,38 @@ class ShapeCache(Cache):
         for key in keys:
             if key not in values:
                 results[key] = None
-                in_memory[key] = False
+                in_memory[key] = 0
                 continue
 
             data = values[key]
             if data is None or len(data) == 0:
                 results[key] = None
-                in_memory[key] = False
+                in_memory[key] = 0
                 continue
 
-            # TODO(clairbee): if we know this is a valid solid, then we should use faster BREP
-            # if key.startswith(["part", "assembly"]):
-            #     # serialization = SERIALIZATION_BREP
-            # else:
-            serialization = self.serialization
-            if serialization == SERIALIZATION_PICKLE:
-                try:
-                    obj = pickle.loads(data)
-                except:
-                    results[key] = None
-                    in_memory[key] = False
-                    continue
-            elif serialization == SERIALIZATION_BREP:
-                obj = Shape.from_brep(data)
-            else:
-                raise ValueError(f"Unknown serialization type: {serialization}")
+            # The entry header tells how it was serialized
+            try:
+                obj = cache_serializer.loads(data)
+            except Exception as e:
+                pc_logging.debug(f"Failed to load the cached '{key}' of {hash.name}: {e}")
+                results[key] = None
+                in_memory[key] = 0
+                continue
             results[key] = obj
 
             data_len = len(data)
 
             if self.user_config.cache_memory_max_entry_size > 0 and data_len > self.user_config.cache_memory_max_entry_size:
                 # If the object is too big, we can free the memory
-                in_memory[key] = False
+                in_memory[key] = 0
             elif (
                 self.user_config.cache_memory_double_cache_max_entry_size > 0
                 and data_len > self.user_config.cache_memory_double_cache_max_entry_size
             ):
                 # The object is bigger than what we want to store in both caches
-                in_memory[key] = False
+                in_memory[key] = 0
             else:
                 # Return the object and advise to keep it in memory
-                in_memory[key] = True
+                in_memory[key] = data_len
 
         return results, in_memory
@@ -14,7 +14,10 @@ import threading
 from typing import Optional, Any
 
 from .cache import Cache
+from . import cache_hash
+from .cache_memory import MemoryCache
 from .cache_shape import ShapeCache
+from .cache_render import RenderCache
 from . import consts
 from . import logging as pc_logging
 from .mating import Mating
@@ -44,6 +47,13 @@ def param_getters(attr_name: str):
     return lambda *_args, **_kwargs: {}
 
 
+def _get_mtime_ns(path: str):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
 # Context
 @telemetry.instrument(attr_getters=param_getters)
 class Context(project_config.Configuration):
@@ -138,7 +148,7 @@ class Context(project_config.Configuration):
         if self.root_path == initial_root_path and root_file != "":
             self.root_path = os.path.join(self.root_path, root_file)
 
-        super().__init__(consts.ROOT, self.root_path)
+        super().__init__(consts.ROOT, self.root_path, user_config=user_config)
         self.current_project_path = self.name
         if not self.current_project_path.endswith("/"):
             self.current_project_path += "/"
@@ -179,9 +189,17 @@ class Context(project_config.Configuration):
         self.project_locks = {}
         self.project_locks_lock = threading.Lock()
         self._projects_being_loaded = {}
+        # The modification time of each package folder and its subfolders containing packages
+        self.package_subdirs = {}
+        self.package_subdirs_lock = threading.Lock()
+        # The time it took to fetch and parse each package, in seconds
+        self.package_timings = {}
         self.user_config = user_config
 
         self.cache_shapes = ShapeCache(user_config=self.user_config)
+        self.cache_renders = RenderCache(user_config=self.user_config)
+        # Shared by all shapes of this context to keep the memory usage within the budget
+        self.cache_memory = MemoryCache(self.user_config.cache_memory_max)
         self.cache_tests = Cache("tests", user_config=self.user_config)
 
         self.connection_status = {}
@@ -198,6 +216,11 @@ class Context(project_config.Configuration):
                 },
             )
 
+    @property
+    def stats_hashes_computed(self) -> int:
+        """The number of cache keys computed so far"""
+        return cache_hash.get_computed_count()
+
     def stats_recalc(self, verbose=False):
         self.stats_memory = total_size(self, verbose)
 
@@ -222,6 +245,7 @@ class Context(project_config.Configuration):
                     pc_logging.error("Recursive project loading detected (%s), aborting." % name)
                     return None
                 self._projects_being_loaded[name] = True
+                start = time.perf_counter()
 
                 # Depending on the project type, use different factories
                 if "type" not in project_import_config or project_import_config["type"] == "local":
@@ -255,6 +279,7 @@ class Context(project_config.Configuration):
 
                 self.stats_packages += 1
                 self.stats_packages_instantiated += 1
+                self.package_timings[name] = time.perf_counter() - start
 
                 del self._projects_being_loaded[name]
                 return imported_project
@@ -359,25 +384,17 @@ class Context(project_config.Configuration):
             return self._get_project_recursive(self.projects[next_project_path], import_list)
 
         # Check if there is a matching subfolder
-        subfolders = [f.name for f in os.scandir(project.config_dir) if f.is_dir()]
-        if next_import in list(subfolders):
-            if os.path.exists(
-                os.path.join(
-                    project.config_dir,
-                    next_import,
-                    consts.DEFAULT_PACKAGE_CONFIG,
-                )
-            ):
-                pc_logging.debug("Importing a subfolder (get): %s..." % next_project_path)
-                prj_conf = {
-                    "name": next_project_path,
-                    "type": "local",
-                    "path": next_import,
-                }
-                next_project = self.import_project(project, prj_conf)
-                if not next_project is None:
-                    result = self._get_project_recursive(next_project, import_list)
-                    return result
+        if next_import in self.get_package_subdirs(project.config_dir):
+            pc_logging.debug("Importing a subfolder (get): %s..." % next_project_path)
+            prj_conf = {
+                "name": next_project_path,
+                "type": "local",
+                "path": next_import,
+            }
+            next_project = self.import_project(project, prj_conf)
+            if not next_project is None:
+                result = self._get_project_recursive(next_project, import_list)
+                return result
         else:
             # Otherwise, iterate all subfolders and check if any of them are packages
             if "dependencies" in project.config_obj and project.config_obj["dependencies"] is not None:
@@ -410,38 +427,79 @@ class Context(project_config.Configuration):
 
         return next_project
 
+    def get_package_subdirs(self, config_dir: str) -> list[str]:
+        """Returns the subfolders of the package folder that contain packages.
+
+        The folder is scanned again only if it or any of its subfolders was modified since,
+        e.g. when subfolders are added or when packages are created in the existing ones.
+        """
+        config_dir = os.path.abspath(config_dir)
+        with self.package_subdirs_lock:
+            cached = self.package_subdirs.get(config_dir, None)
+        if cached is not None:
+            mtime_ns, subdir_mtimes, subdirs = cached
+            if _get_mtime_ns(config_dir) == mtime_ns and all(
+                _get_mtime_ns(os.path.join(config_dir, name)) == subdir_mtime
+                for name, subdir_mtime in subdir_mtimes.items()
+            ):
+                return subdirs
+
+        mtime_ns = _get_mtime_ns(config_dir)
+        subdir_mtimes = {}
+        subdirs = []
+        try:
+            with os.scandir(config_dir) as entries:
+                for entry in entries:
+                    if not entry.is_dir():
+                        continue
+                    # Recorded before looking for the package, to scan again if one is created meanwhile
+                    subdir_mtimes[entry.name] = entry.stat().st_mtime_ns
+                    if os.path.isfile(os.path.join(entry.path, consts.DEFAULT_PACKAGE_CONFIG)):
+                        subdirs.append(entry.name)
+        except OSError as e:
+            pc_logging.debug(f"Failed to scan the package folder '{config_dir}': {e}")
+        subdirs.sort()
+
+        with self.package_subdirs_lock:
+            self.package_subdirs[config_dir] = (mtime_ns, subdir_mtimes, subdirs)
+        return subdirs
+
     def import_all(self, parent_name=None):
         if parent_name is None:
             parent_name = self.name
         asyncio.run(self._import_all_wrapper(self.projects[parent_name]))
 
     async def _import_all_wrapper(self, project):
-        iterate_tasks = []
-        import_tasks = []
-
-        iterate_tasks.append(asyncio.create_task(self._import_all_recursive(project)))
-
-        while iterate_tasks or import_tasks:
-            if iterate_tasks:
-                iterate_done, iterate_tasks_set = await asyncio.tasks.wait(iterate_tasks)
-                iterate_tasks = list(iterate_tasks_set)
-                for iterate_task in iterate_done:
-                    new_import_tasks = iterate_task.result()
-                    import_tasks.extend(new_import_tasks)
-
-            if import_tasks:
-                import_done, import_tasks_set = await asyncio.tasks.wait(import_tasks)
-                import_tasks = list(import_tasks_set)
-                for import_task in import_done:
-                    next_project = import_task.result()
-                    iterate_tasks.append(asyncio.create_task(self._import_all_recursive(next_project)))
-
-    async def _import_all_recursive(self, project):
-        tasks = []
+        # Packages are imported as soon as they are discovered, and their
+        # dependencies and subfolders are scheduled as soon as they are imported
+        pending = set()
+        visited = set()
+
+        def discover(next_project):
+            if next_project is None or next_project.name in visited:
+                return
+            visited.add(next_project.name)
+            for parent, prj_conf in self._get_imports(next_project):
+                if prj_conf.get("type", "local") == "local":
+                    task = threadpool_manager.run(self.import_project, parent, prj_conf)
+                else:
+                    # Fetching is mostly waiting for the network, let it overlap with parsing the local packages
+                    task = threadpool_manager.run_detached(self.import_project, parent, prj_conf)
+                pending.add(asyncio.create_task(task))
+
+        discover(project)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                discover(task.result())
+
+    def _get_imports(self, project) -> list[tuple[Project, dict]]:
+        """Returns the import configurations of the dependencies and subfolders of the package"""
+        imports = []
 
         if project.broken:
             pc_logging.warn("Ignoring the broken package: %s" % project.name)
-            return []
+            return imports
 
         # First, iterate all explicitly mentioned "dependencies"s.
         # Do it before iterating subdirectories, as it may kick off a long
@@ -472,35 +530,26 @@ class Context(project_config.Configuration):
                     prj_conf["orig_name"] = prj_conf["name"]
                 prj_conf["name"] = next_project_path
 
-                tasks.append(asyncio.create_task(threadpool_manager.run(self.import_project, project, prj_conf)))
+                imports.append((project, prj_conf))
 
         # Second, iterate over all subfolder and check for packages
-        subfolders = [f.name for f in os.scandir(project.config_dir) if f.is_dir()]
-        for subdir in list(subfolders):
-            if os.path.exists(
-                os.path.join(
-                    project.config_dir,
-                    subdir,
-                    consts.DEFAULT_PACKAGE_CONFIG,
-                )
-            ):
-                # TODO(clairbee): check if this subdir is already imported
-                next_project_path = get_child_project_path(project.name, subdir)
+        for subdir in self.get_package_subdirs(project.config_dir):
+            next_project_path = get_child_project_path(project.name, subdir)
 
-                # Here, we do not jump over the projects that are already imported,
-                # because we want to import all sub-folders, even if their parent
-                # is already imported.
+            # Here, we do not jump over the projects that are already imported,
+            # because we want to import all sub-folders, even if their parent
+            # is already imported.
 
-                pc_logging.debug("Importing a subfolder (import all): %s..." % next_project_path)
-                prj_conf = {
-                    "name": next_project_path,
-                    "type": "local",
-                    "path": subdir,
-                }
+            pc_logging.debug("Importing a subfolder (import all): %s..." % next_project_path)
+            prj_conf = {
+                "name": next_project_path,
+                "type": "local",
+                "path": subdir,
+            }
 
-                tasks.append(asyncio.create_task(threadpool_manager.run(self.import_project, project, prj_conf)))
+            imports.append((project, prj_conf))
 
-        return tasks
+        return imports
 
     def get_all_packages(self, parent_name=None, has_stuff: bool = True):
         # TODO(clairbee): leverage root_project.get_child_project_names()
@@ -516,7 +565,7 @@ class Context(project_config.Configuration):
             # Filter out projects that don't contain anything the user might be interested in.
             # TODO(clairbee): Add interfaces and providers to this list when the UIs are ready to display them
             projects = filter(
-                lambda x: len(x.sketches) + len(x.parts) + len(x.assemblies) > 0,
+                lambda x: len(x.sketch_configs) + len(x.part_configs) + len(x.assembly_configs) > 0,
                 projects,
             )
         return list(
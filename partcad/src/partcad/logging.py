@@ -8,12 +8,11 @@
 # Licensed under Apache License, Version 2.0.
 
 import logging
+import sys
 from logging import DEBUG, INFO, WARN, WARNING, ERROR, CRITICAL
 import threading
 import time
 
-import sentry_sdk
-
 from opentelemetry import trace
 from . import telemetry
 
@@ -58,10 +57,17 @@ def _track_error(args):
     had_errors = True
 
 
+def _get_sentry():
+    # Only loaded by the telemetry backend when enabled, there is nothing to report to otherwise
+    return sys.modules.get("sentry_sdk", None)
+
+
 def error(*args, **kwargs):
     _track_error(args)
     logging.getLogger("partcad").error(*args, **kwargs)
-    sentry_sdk.capture_message(str(args) + str(kwargs), level="error")
+    sentry = _get_sentry()
+    if sentry:
+        sentry.capture_message(str(args) + str(kwargs), level="error")
     current_span = trace.get_current_span()
     if current_span:
         current_span.set_status(trace.Status(trace.StatusCode.ERROR, str(args)))
@@ -69,7 +75,9 @@ def error(*args, **kwargs):
 
 def critical(*args, **kwargs):
     logging.getLogger("partcad").critical(*args, **kwargs)
-    sentry_sdk.capture_message(str(args) + str(kwargs), level="debug")
+    sentry = _get_sentry()
+    if sentry:
+        sentry.capture_message(str(args) + str(kwargs), level="debug")
 
 
 # Some pytest versions/configurations/plugins mess with the exception method
@@ -79,7 +87,9 @@ def exception(
 ):
     _track_error(args)
     logging.getLogger("partcad").exception(*args)
-    sentry_sdk.capture_exception(args[0])
+    sentry = _get_sentry()
+    if sentry:
+        sentry.capture_exception(args[0])
 
 
 # Create 'ops' that are used for dependency injection of the logic to control
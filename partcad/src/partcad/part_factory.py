@@ -47,7 +47,9 @@ class PartFactory(ShapeFactory):
 
         self.post_create()
 
-        self.ctx.stats_parts += 1
+        if not self.target_project.lazy:
+            # Otherwise, accounted for by the project
+            self.ctx.stats_parts += 1
 
     def post_create(self) -> None:
         # This is a base class catch-all method
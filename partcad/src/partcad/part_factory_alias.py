@@ -58,6 +58,7 @@ class PartFactoryAlias(pf.PartFactory):
                     self.source_project_name = source_project.name
             self.source = self.source_project_name + ":" + self.source_part_name
             config["source_resolved"] = self.source
+            self.part.build_dependencies.append(("part", self.source))
 
             if self.source_project_name == target_project.name:
                 self.part.desc = "Alias to %s" % self.source_part_name
@@ -1,8 +1,6 @@
 import os
 import threading
 import time
-import pickle
-import base64
 import sys
 from OCP.BRep import BRep_Builder
 from OCP.BRepTools import BRepTools
@@ -112,7 +110,7 @@ class PartFactoryBrep(PartFactoryFile):
         request = {"build_parameters": {}}
 
         # Serialize the request
-        request_serialized = base64.b64encode(pickle.dumps(request)).decode()
+        request_serialized = wrapper.serialize_request(request)
 
         # Run the subprocess and handle the response
         try:
@@ -127,7 +125,7 @@ class PartFactoryBrep(PartFactoryFile):
             if errors:
                 sys.stderr.write(errors)
 
-            response = pickle.loads(base64.b64decode(response_serialized))
+            response = wrapper.deserialize_response(response_serialized)
             if not response.get("success", False):
                 pc_logging.error(response["exception"])
                 raise PartFactoryError(response["exception"])
@@ -7,10 +7,7 @@
 # Licensed under Apache License, Version 2.0.
 #
 
-import base64
 import os
-import pickle
-import sys
 
 from OCP.TopoDS import (
     TopoDS_Builder,
@@ -21,9 +18,6 @@ from .part_factory_python import PartFactoryPython
 from . import wrapper
 from . import logging as pc_logging
 
-sys.path.append(os.path.join(os.path.dirname(__file__), "wrappers"))
-from ocp_serialize import register as register_ocp_helper
-
 from . import telemetry
 
 
@@ -80,10 +74,8 @@ class PartFactoryCadquery(PartFactoryPython):
             request["patch"] = patch
 
             # Serialize the request
-            register_ocp_helper()
-            with telemetry.start_as_current_span("*PartFactoryCadquery.instantiate.{pickle.dumps}"):
-                picklestring = pickle.dumps(request)
-                request_serialized = base64.b64encode(picklestring).decode()
+            with telemetry.start_as_current_span("*PartFactoryCadquery.instantiate.{wrapper.serialize_request}"):
+                request_serialized = wrapper.serialize_request(request)
 
             await self.runtime.ensure_async(
                 "ocp-tessellate==3.0.9",
@@ -129,9 +121,7 @@ class PartFactoryCadquery(PartFactoryPython):
 
             try:
                 # pc_logging.error("Response: %s" % response_serialized)
-                response = base64.b64decode(response_serialized)
-                register_ocp_helper()
-                result = pickle.loads(response)
+                result = wrapper.deserialize_response(response_serialized)
             except Exception as e:
                 part.error("Exception while deserializing %s: %s" % (part.name, e))
                 return None
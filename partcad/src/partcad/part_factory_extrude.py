@@ -14,16 +14,27 @@ from OCP.BRepPrimAPI import (
     BRepPrimAPI_MakePrism,
 )
 
+from .cache_memory import estimate_size
 from .part_factory import PartFactory
 from .sketch import Sketch
 from . import logging as pc_logging
+from .sync_processes import process_pool_manager
 from .utils import resolve_resource_path
 
 from . import telemetry
 
 
+def extrude(faces, depth: float):
+    maker = BRepPrimAPI_MakePrism(faces, gp_Vec(0.0, 0.0, depth))
+    maker.Build()
+    return maker.Shape()
+
+
 @telemetry.instrument()
 class PartFactoryExtrude(PartFactory):
+    # Smaller sketches are extruded faster than they are sent to a worker process
+    MIN_PROCESS_SIZE = 64 * 1024
+
     depth: float
     source_project_name: str
     source_sketch_name: str
@@ -58,6 +69,7 @@ class PartFactoryExtrude(PartFactory):
 
             self._create(config)
             self.part.hash.add_string(str(self.depth))
+            self.part.build_dependencies.append(("sketch", self.source_sketch_spec))
             # TODO(clairbee): add dependency tracking for Extrude (PC-313)
             self.part.cache_dependencies_broken = True
 
@@ -67,12 +79,11 @@ class PartFactoryExtrude(PartFactory):
             try:
                 self.sketch = self.ctx.get_sketch(self.source_sketch_spec)
 
-                maker = BRepPrimAPI_MakePrism(
-                    await self.sketch.get_wrapped(self.ctx),
-                    gp_Vec(0.0, 0.0, self.depth),
-                )
-                maker.Build()
-                shape = maker.Shape()
+                faces = await self.sketch.get_wrapped(self.ctx)
+                if process_pool_manager.is_enabled() and estimate_size(faces) >= self.MIN_PROCESS_SIZE:
+                    shape = await process_pool_manager.run(extrude, faces, self.depth)
+                else:
+                    shape = extrude(faces, self.depth)
             except Exception as e:
                 pc_logging.exception("Failed to create an extruded part: %s" % e)
 
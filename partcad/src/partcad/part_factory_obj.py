@@ -1,9 +1,10 @@
 import os
+import re
 import threading
 import time
-import pickle
-import base64
 import sys
+
+import numpy as np
 from OCP.BRepBuilderAPI import BRepBuilderAPI_MakeFace, BRepBuilderAPI_MakePolygon
 from OCP.gp import gp_Pnt
 from OCP.TopoDS import TopoDS_Compound
@@ -12,12 +13,107 @@ from .part_factory_file import PartFactoryFile
 from . import logging as pc_logging
 from . import wrapper
 from .exception import PartFactoryError
+from .sync_processes import process_pool_manager
+from .utils_ocp import make_triangulated_face
 
 sys.path.append(os.path.join(os.path.dirname(__file__), "wrappers"))
 
+
+def create_compound(faces):
+    """
+    Convert a list of TopoDS_Face objects into a TopoDS_Compound.
+    """
+    builder = BRep_Builder()
+    compound = TopoDS_Compound()
+    builder.MakeCompound(compound)
+    for face in faces:
+        builder.Add(compound, face)
+    return compound
+
+
+def parse_obj(path):
+    """
+    Parse the vertices and the faces of an OBJ file.
+
+    Returns the vertices as an (N, 3) array, the 0-based vertex indices of all faces
+    as one flat array, and the number of vertices of each face.
+    """
+    with open(path, "rb") as file:
+        lines = file.read().splitlines()
+    vertex_lines = [line[2:] for line in lines if line.startswith(b"v ")]
+    face_lines = [line[2:] for line in lines if line.startswith(b"f ")]
+
+    vertices = np.array(b" ".join(vertex_lines).split(), dtype=np.float64)
+    if len(vertices) != 3 * len(vertex_lines):
+        # Optional weights or colors
+        vertices = np.array([line.split()[:3] for line in vertex_lines], dtype=np.float64)
+    vertices = vertices.reshape(-1, 3)
+
+    # Only the vertex indices are used, not the texture coordinates or the normals
+    faces = re.sub(rb"/\S*", b"", b" ".join(face_lines))
+    counts = np.array([len(line.split()) for line in face_lines], dtype=np.int64)
+    indices = np.fromstring(faces, dtype=np.int64, sep=" ") if faces.strip() else np.zeros(0, dtype=np.int64)
+    if len(indices) != counts.sum():
+        raise ValueError(f"Invalid face definitions in {path}")
+
+    # Negative indices are relative to the end of the vertex list
+    indices = np.where(indices < 0, indices + len(vertices), indices - 1)
+    if len(indices) and (indices.min() < 0 or indices.max() >= len(vertices)):
+        raise ValueError(f"Invalid vertex index in {path}")
+
+    return vertices, indices, counts
+
+
+def triangulate(indices, counts):
+    """
+    Split the faces into triangles fanning out of their first vertex.
+    """
+    triangle_counts = np.maximum(counts - 2, 0)
+    face_starts = np.cumsum(counts) - counts
+    triangle_faces = np.repeat(np.arange(len(counts)), triangle_counts)
+    # The position of each triangle within its face
+    triangle_offsets = np.arange(triangle_counts.sum()) - np.repeat(
+        np.cumsum(triangle_counts) - triangle_counts, triangle_counts
+    )
+    first = face_starts[triangle_faces]
+    return np.stack(
+        [indices[first], indices[first + triangle_offsets + 1], indices[first + triangle_offsets + 2]],
+        axis=1,
+    )
+
+
+def load_obj(path, min_mesh_faces: int = None):
+    """
+    Load an OBJ file as a compound of faces.
+
+    Large meshes are loaded as a single face holding the triangulation only,
+    as creating a planar face per polygon takes much longer than the rest of the loading.
+    """
+    if min_mesh_faces is None:
+        min_mesh_faces = PartFactoryObj.MIN_MESH_FACES
+
+    vertices, indices, counts = parse_obj(path)
+    if len(counts) and len(counts) >= min_mesh_faces:
+        return create_compound([make_triangulated_face(vertices, triangulate(indices, counts))])
+
+    shape_faces = []
+    start = 0
+    for count in counts.tolist():
+        polygon = BRepBuilderAPI_MakePolygon()
+        for x, y, z in vertices[indices[start : start + count]].tolist():
+            polygon.Add(gp_Pnt(x, y, z))
+        polygon.Close()
+        shape_faces.append(BRepBuilderAPI_MakeFace(polygon.Wire()).Face())
+        start += count
+
+    return create_compound(shape_faces)
+
+
 class PartFactoryObj(PartFactoryFile):
     MIN_SIMPLE_INFLIGHT = 1
     MIN_SUBPROCESS_FILE_SIZE = 64 * 1024  # 64 KB
+    # Meshes with more faces are loaded as a single triangulated face (see load_obj)
+    MIN_MESH_FACES = 10000
     PYTHON_RUNTIME_VERSION = "3.10"
 
     lock = threading.Lock()
@@ -41,23 +137,31 @@ class PartFactoryObj(PartFactoryFile):
 
         with pc_logging.Action("OBJ", part.project_name, part.name):
             file_size = os.path.getsize(self.path)
-            do_subprocess = self._should_use_subprocess(file_size)
-
-            # Load shape via subprocess or direct method
-            if do_subprocess:
-                shape = await self._process_obj_subprocess()
+            if process_pool_manager.is_enabled() and file_size >= PartFactoryObj.MIN_SUBPROCESS_FILE_SIZE:
+                # Parsed in a worker process, without the overhead of starting a sandbox
+                try:
+                    shape = await process_pool_manager.run(load_obj, self.path, self.MIN_MESH_FACES)
+                except Exception as e:
+                    pc_logging.error(f"Error loading OBJ file: {e}")
+                    raise
             else:
-                shape = self._load_obj_directly()
-
-            if not isinstance(shape, TopoDS_Compound):
-                shape = self._create_compound(shape)
+                do_subprocess = self._should_use_subprocess(file_size)
 
-            # Update counters
-            with PartFactoryObj.lock:
+                # Load shape via subprocess or direct method
                 if do_subprocess:
-                    PartFactoryObj.count_inflight_subprocess -= 1
+                    shape = await self._process_obj_subprocess()
                 else:
-                    PartFactoryObj.count_inflight_simple -= 1
+                    shape = self._load_obj_directly()
+
+                # Update counters
+                with PartFactoryObj.lock:
+                    if do_subprocess:
+                        PartFactoryObj.count_inflight_subprocess -= 1
+                    else:
+                        PartFactoryObj.count_inflight_simple -= 1
+
+            if not isinstance(shape, TopoDS_Compound):
+                shape = self._create_compound(shape)
 
             self.ctx.stats_parts_instantiated += 1
             return shape
@@ -83,32 +187,7 @@ class PartFactoryObj(PartFactoryFile):
         """
         time.sleep(0.0001)  # Brief pause for thread synchronization
         try:
-            vertices = []
-            faces = []
-
-            with open(self.path, 'r') as file:
-                for line in file:
-                    if line.startswith('#'):
-                        continue
-                    if line.startswith('v '):
-                        parts = line.strip().split()
-                        vertex = tuple(map(float, parts[1:]))
-                        vertices.append(vertex)
-                    elif line.startswith('f '):
-                        parts = line.strip().split()
-                        face = [int(part.split('/')[0]) for part in parts[1:]]
-                        faces.append(face)
-
-            shape_faces = []
-            for face in faces:
-                polygon = BRepBuilderAPI_MakePolygon()
-                for vertex_idx in face:
-                    x, y, z = vertices[vertex_idx - 1]
-                    polygon.Add(gp_Pnt(x, y, z))
-                polygon.Close()
-                shape_faces.append(BRepBuilderAPI_MakeFace(polygon.Wire()).Face())
-
-            return self._create_compound(shape_faces)
+            return load_obj(self.path, self.MIN_MESH_FACES)
         except Exception as e:
             pc_logging.error(f"Error loading OBJ file: {e}")
             raise
@@ -129,7 +208,7 @@ class PartFactoryObj(PartFactoryFile):
         request = {"build_parameters": {}}
 
         # Serialize the request
-        request_serialized = base64.b64encode(pickle.dumps(request)).decode()
+        request_serialized = wrapper.serialize_request(request)
 
         # Run the subprocess and handle the response
         try:
@@ -144,7 +223,7 @@ class PartFactoryObj(PartFactoryFile):
             if errors:
                 sys.stderr.write(errors)
 
-            response = pickle.loads(base64.b64decode(response_serialized))
+            response = wrapper.deserialize_response(response_serialized)
             if not response.get("success", False):
                 pc_logging.error(response["exception"])
                 raise PartFactoryError(response["exception"])
@@ -161,9 +240,4 @@ class PartFactoryObj(PartFactoryFile):
         """
         Convert a list of TopoDS_Face objects into a TopoDS_Compound.
         """
-        builder = BRep_Builder()
-        compound = TopoDS_Compound()
-        builder.MakeCompound(compound)
-        for face in faces:
-            builder.Add(compound, face)
-        return compound
+        return create_compound(faces)
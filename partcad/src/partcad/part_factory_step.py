@@ -7,9 +7,7 @@
 # Licensed under Apache License, Version 2.0.
 #
 
-import base64
 import os
-import pickle
 import sys
 import threading
 
@@ -18,9 +16,6 @@ from . import wrapper
 from .part_factory_file import PartFactoryFile
 from . import telemetry
 
-sys.path.append(os.path.join(os.path.dirname(__file__), "wrappers"))
-from ocp_serialize import register as register_ocp_helper
-
 
 @telemetry.instrument()
 class PartFactoryStep(PartFactoryFile):
@@ -38,10 +33,8 @@ class PartFactoryStep(PartFactoryFile):
         with pc_logging.Action("STEP", part.project_name, part.name):
             wrapper_path = wrapper.get("step.py")
             request = {"build_parameters": {}}
-            register_ocp_helper()
-            with telemetry.start_as_current_span("*PartFactoryStep.instantiate.{pickle.dumps}"):
-                picklestring = pickle.dumps(request)
-                request_serialized = base64.b64encode(picklestring).decode()
+            with telemetry.start_as_current_span("*PartFactoryStep.instantiate.{wrapper.serialize_request}"):
+                request_serialized = wrapper.serialize_request(request)
 
             with telemetry.start_as_current_span("*PartFactoryStep.instantiate.{runtime.run_async}"):
                 response_serialized, errors = await self.runtime.run_async(
@@ -50,10 +43,8 @@ class PartFactoryStep(PartFactoryFile):
                 )
                 sys.stderr.write(errors)
 
-            with telemetry.start_as_current_span("*PartFactoryStep.instantiate.{pickle.loads}"):
-                response = base64.b64decode(response_serialized)
-                register_ocp_helper()
-                result = pickle.loads(response)
+            with telemetry.start_as_current_span("*PartFactoryStep.instantiate.{wrapper.deserialize_response}"):
+                result = wrapper.deserialize_response(response_serialized)
             if not result["success"]:
                 pc_logging.error(result["exception"])
                 raise Exception(result["exception"])
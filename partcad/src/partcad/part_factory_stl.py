@@ -8,8 +8,6 @@
 #
 
 import os
-import base64
-import pickle
 import sys
 
 from .part_factory_file import PartFactoryFile
@@ -32,8 +30,7 @@ class PartFactoryStl(PartFactoryFile):
             wrapper_path = wrapper.get("stl.py")
             request = {}
 
-            picklestring = pickle.dumps(request)
-            request_serialized = base64.b64encode(picklestring).decode()
+            request_serialized = wrapper.serialize_request(request)
 
             runtime = self.ctx.get_python_runtime("3.11")
             with telemetry.start_as_current_span("*PartFactoryStl.instantiate.{runtime.run_async}"):
@@ -44,8 +41,7 @@ class PartFactoryStl(PartFactoryFile):
                 sys.stderr.write(errors)
 
             try:
-                response = base64.b64decode(response_serialized)
-                result = pickle.loads(response)
+                result = wrapper.deserialize_response(response_serialized)
             except Exception as e:
                 pc_logging.error(f"Failed to deserialize STL wrapper response: {e}")
                 raise
@@ -22,7 +22,6 @@ import typing
 
 from typing import Optional, List
 
-from . import consts
 from . import factory
 from . import logging as pc_logging
 from . import project_config
@@ -59,7 +58,9 @@ from . import assembly
 from . import assembly_config
 from . import provider
 from . import provider_config
-from .render import render_cfg_merge
+from .render import MESH_FORMATS, render_cfg_merge
+from .render_server import render_batch_async
+from .scheduler import BuildScheduler
 from .utils import resolve_resource_path, normalize_resource_path
 from . import telemetry
 
@@ -68,6 +69,30 @@ if TYPE_CHECKING:
     from partcad.shape import Shape
 
 
+def get_declared_aliases(configs: dict) -> dict[str, str]:
+    """Maps the aliases declared by the objects to the object names"""
+    aliases = {}
+    for name, config in configs.items():
+        if isinstance(config, dict) and config.get("aliases", None) is not None:
+            for alias in config["aliases"]:
+                aliases[alias] = name
+    return aliases
+
+
+def get_config_desc(config) -> Optional[str]:
+    if isinstance(config, str):
+        # This is a short form alias
+        return "Alias to %s" % config
+    if not isinstance(config, dict):
+        return None
+    desc = config.get("desc", None)
+    if isinstance(desc, str):
+        return desc.strip()
+    if config.get("type", None) == "alias" and "source" in config:
+        return "Alias to %s" % config["source"]
+    return None
+
+
 @telemetry.instrument()
 class Project(project_config.Configuration):
 
@@ -154,8 +179,11 @@ class Project(project_config.Configuration):
             path,
             include_paths=include_paths,
             inherited_config=inherited_config,
+            user_config=ctx.user_config,
         )
         self.ctx = ctx
+        # In the lazy mode, sketches, parts and assemblies are only instantiated on first access
+        self.lazy = ctx.user_config.lazy_loading
 
         # Protect the critical sections from access in different threads
         self.lock = threading.Lock()
@@ -186,6 +214,8 @@ class Project(project_config.Configuration):
             self.sketch_configs = self.config_obj["sketches"]
         else:
             self.sketch_configs = {}
+        # self.sketch_aliases maps the aliases declared by the sketches to the sketch names
+        self.sketch_aliases = {}
         # self.sketches contains all the initialized sketches in this project
         self.sketches = {}
         self.sketch_locks = {}
@@ -196,6 +226,8 @@ class Project(project_config.Configuration):
             self.part_configs = self.config_obj["parts"]
         else:
             self.part_configs = {}
+        # self.part_aliases maps the aliases declared by the parts to the part names
+        self.part_aliases = {}
         # self.parts contains all the initialized parts in this project
         self.parts = {}
         self.part_locks = {}
@@ -255,16 +287,8 @@ class Project(project_config.Configuration):
             return
 
         children = list()
-        sub_folders = [f.name for f in os.scandir(self.config_dir) if f.is_dir()]
-        for subdir in list(sub_folders):
-            if os.path.exists(
-                os.path.join(
-                    self.config_dir,
-                    subdir,
-                    consts.DEFAULT_PACKAGE_CONFIG,
-                )
-            ):
-                children.append(self.name + "/" + subdir if absolute else subdir)
+        for subdir in self.ctx.get_package_subdirs(self.config_dir):
+            children.append(self.name + "/" + subdir if absolute else subdir)
 
         if "dependencies" in self.config_obj and not self.config_obj["dependencies"] is None:
             dependencies = self.config_obj["dependencies"]
@@ -299,6 +323,40 @@ class Project(project_config.Configuration):
                 raise Exception("Failed to find the source interface to mate: %s" % source_interface_name)
             source_interface.add_mates(self, mate_config)
 
+    def _get_descs(self, configs: dict, aliases: dict, objects: dict) -> dict[str, Optional[str]]:
+        # The objects are only instantiated in the eager mode, or when requested
+        declared_aliases = {}
+        for alias, name in aliases.items():
+            declared_aliases.setdefault(name, []).append(alias)
+
+        descs = {}
+        for name, config in configs.items():
+            descs[name] = objects[name].desc if name in objects else get_config_desc(config)
+            for alias in declared_aliases.get(name, []):
+                descs[alias] = objects[alias].desc if alias in objects else "Alias to %s" % name
+        return descs
+
+    def get_sketch_descs(self) -> dict[str, Optional[str]]:
+        """Returns the descriptions of all sketches without instantiating them"""
+        return self._get_descs(self.sketch_configs, self.sketch_aliases, self.sketches)
+
+    def get_part_descs(self) -> dict[str, Optional[str]]:
+        """Returns the descriptions of all parts without instantiating them"""
+        return self._get_descs(self.part_configs, self.part_aliases, self.parts)
+
+    def get_assembly_descs(self) -> dict[str, Optional[str]]:
+        """Returns the descriptions of all assemblies without instantiating them"""
+        return self._get_descs(self.assembly_configs, {}, self.assemblies)
+
+    def init_all(self):
+        """Instantiates all sketches, parts and assemblies that are not instantiated yet"""
+        for sketch_name in self.get_sketch_descs():
+            self.get_sketch(sketch_name)
+        for part_name in self.get_part_descs():
+            self.get_part(part_name)
+        for assembly_name in self.get_assembly_descs():
+            self.get_assembly(assembly_name)
+
     def get_interface_config(self, interface_name):
         if not interface_name in self.interface_configs:
             return None
@@ -357,11 +415,16 @@ class Project(project_config.Configuration):
         if self.sketch_configs is None:
             return
 
+        self.sketch_aliases = get_declared_aliases(self.sketch_configs)
         for sketch_name in self.sketch_configs:
             object_name = f"{self.name}:{sketch_name}"
             config = self.get_sketch_config(sketch_name)
             config = sketch_config.SketchConfiguration.normalize(sketch_name, config, object_name)
-            self.init_sketch_by_config(config)
+            if not self.lazy:
+                self.init_sketch_by_config(config)
+        if self.lazy:
+            # Instantiated on first access, but accounted for now
+            self.ctx.stats_sketches += len(self.sketch_configs) + len(self.sketch_aliases)
 
     def init_sketch_by_config(self, config, source_project=None):
         if source_project is None:
@@ -392,19 +455,23 @@ class Project(project_config.Configuration):
         # Initialize aliases if they are declared implicitly
         if "aliases" in config and not config["aliases"] is None:
             for alias in config["aliases"]:
-                if ";" in sketch_name:
-                    # Copy parameters
-                    alias += sketch_name[sketch_name.index(";") :]
-                alias_sketch_config = {
-                    "type": "alias",
-                    "name": alias,
-                    "source": ":" + sketch_name,
-                }
-                object_name = f"{self.name}:{alias}"
-                alias_sketch_config = sketch_config.SketchConfiguration.normalize(
-                    alias, alias_sketch_config, object_name
-                )
-                pfa.SketchFactoryAlias(self.ctx, source_project, self, alias_sketch_config)
+                self.init_sketch_alias(alias, sketch_name, source_project)
+
+    def init_sketch_alias(self, alias: str, sketch_name: str, source_project=None):
+        if source_project is None:
+            source_project = self
+
+        if ";" in sketch_name:
+            # Copy parameters
+            alias += sketch_name[sketch_name.index(";") :]
+        alias_sketch_config = {
+            "type": "alias",
+            "name": alias,
+            "source": ":" + sketch_name,
+        }
+        object_name = f"{self.name}:{alias}"
+        alias_sketch_config = sketch_config.SketchConfiguration.normalize(alias, alias_sketch_config, object_name)
+        SketchFactoryAlias(self.ctx, source_project, self, alias_sketch_config)
 
     def get_sketch(self, sketch_name, func_params=None) -> sketch.Sketch:
         if func_params is None or not func_params:
@@ -450,6 +517,10 @@ class Project(project_config.Configuration):
 
             if not has_name_params:
                 # This is just a regular sketch name, no params (sketch_name == result_name)
+                if sketch_name in self.sketch_aliases and not sketch_name in self.sketch_configs:
+                    # An alias declared by a sketch that is not instantiated yet
+                    self.init_sketch_alias(sketch_name, self.sketch_aliases[sketch_name])
+                    return self.sketches.get(sketch_name, None)
                 if not sketch_name in self.sketch_configs:
                     # We don't know anything about such a sketch
                     pc_logging.error("Sketch '%s' not found in '%s'", sketch_name, self.name)
@@ -465,7 +536,7 @@ class Project(project_config.Configuration):
                 return self.sketches[sketch_name]
 
             # This sketch has params (sketch_name != result_name)
-            if not base_sketch_name in self.sketches:
+            if not base_sketch_name in self.sketch_configs:
                 pc_logging.error(
                     "Base sketch '%s' not found in '%s'",
                     base_sketch_name,
@@ -554,11 +625,16 @@ class Project(project_config.Configuration):
         if self.part_configs is None:
             return
 
+        self.part_aliases = get_declared_aliases(self.part_configs)
         for part_name in self.part_configs:
             object_name = f"{self.name}:{part_name}"
             config = self.get_part_config(part_name)
             config = part_config.PartConfiguration.normalize(part_name, config, object_name)
-            self.init_part_by_config(config)
+            if not self.lazy:
+                self.init_part_by_config(config)
+        if self.lazy:
+            # Instantiated on first access, but accounted for now
+            self.ctx.stats_parts += len(self.part_configs) + len(self.part_aliases)
 
     def init_part_by_config(self, config: dict, source_project: "Project" = None):
         if source_project is None:
@@ -607,17 +683,23 @@ class Project(project_config.Configuration):
         # Initialize aliases if they are declared implicitly
         if "aliases" in config and not config["aliases"] is None:
             for alias in config["aliases"]:
-                if ";" in part_name:
-                    # Copy parameters
-                    alias += part_name[part_name.index(";") :]
-                alias_part_config = {
-                    "type": "alias",
-                    "name": alias,
-                    "source": ":" + part_name,
-                }
-                object_name = f"{self.name}:{alias}"
-                alias_part_config = part_config.PartConfiguration.normalize(alias, alias_part_config, object_name)
-                pfa.PartFactoryAlias(self.ctx, source_project, self, alias_part_config)
+                self.init_part_alias(alias, part_name, source_project)
+
+    def init_part_alias(self, alias: str, part_name: str, source_project: "Project" = None):
+        if source_project is None:
+            source_project = self
+
+        if ";" in part_name:
+            # Copy parameters
+            alias += part_name[part_name.index(";") :]
+        alias_part_config = {
+            "type": "alias",
+            "name": alias,
+            "source": ":" + part_name,
+        }
+        object_name = f"{self.name}:{alias}"
+        alias_part_config = part_config.PartConfiguration.normalize(alias, alias_part_config, object_name)
+        pfa.PartFactoryAlias(self.ctx, source_project, self, alias_part_config)
 
     def get_part(self, part_name, func_params=None, quiet=False) -> Optional[Part]:
         if func_params is None or not func_params:
@@ -663,6 +745,10 @@ class Project(project_config.Configuration):
 
             if not has_name_params:
                 # This is just a regular part name, no params (part_name == result_name)
+                if part_name in self.part_aliases and not part_name in self.part_configs:
+                    # An alias declared by a part that is not instantiated yet
+                    self.init_part_alias(part_name, self.part_aliases[part_name])
+                    return self.parts.get(part_name, None)
                 if not part_name in self.part_configs:
                     # We don't know anything about such a part
                     if not quiet:
@@ -679,7 +765,7 @@ class Project(project_config.Configuration):
                 return self.parts[part_name]
 
             # This part has params (part_name != result_name)
-            if not base_part_name in self.parts:
+            if not base_part_name in self.part_configs:
                 pc_logging.error(
                     "Base part '%s' not found in '%s'",
                     base_part_name,
@@ -772,7 +858,11 @@ class Project(project_config.Configuration):
         for assembly_name in self.assembly_configs:
             config = self.get_assembly_config(assembly_name)
             config = assembly_config.AssemblyConfiguration.normalize(assembly_name, config)
-            factory.instantiate("assembly", config["type"], self.ctx, self, self, config)
+            if not self.lazy:
+                factory.instantiate("assembly", config["type"], self.ctx, self, self, config)
+        if self.lazy:
+            # Instantiated on first access, but accounted for now
+            self.ctx.stats_assemblies += len(self.assembly_configs)
 
     def get_assembly(self, assembly_name, func_params=None) -> assembly.Assembly:
         if func_params is None or not func_params:
@@ -836,7 +926,7 @@ class Project(project_config.Configuration):
                 return self.assemblies[assembly_name]
 
             # This assembly has params (part_name != result_name)
-            if not base_assembly_name in self.assemblies:
+            if not base_assembly_name in self.assembly_configs:
                 pc_logging.error(
                     "Base assembly '%s' not found in '%s'",
                     base_assembly_name,
@@ -1299,12 +1389,12 @@ class Project(project_config.Configuration):
                     yaml.dump(config, fp)
                     fp.close()
 
-    async def _run_test_async(self, ctx, tests: list, use_wrapper: bool = False) -> bool:
+    async def schedule_tests(self, scheduler: BuildScheduler, ctx, tests: list, use_wrapper: bool = False) -> list:
+        """Adds the jobs testing all the objects of this package to the scheduler, returns them"""
         if tests is None:
             tests = ctx.get_all_tests()
 
-        tasks = []
-        test_method = "test_log_wrapper" if use_wrapper else "test_cached"
+        jobs = []
 
         def get_objects(config_dict, getter):
             for name in config_dict:
@@ -1313,22 +1403,25 @@ class Project(project_config.Configuration):
                 if obj and (not hasattr(obj, "finalized") or obj.finalized):
                     yield obj
 
-        tasks.extend(
-            asyncio.create_task(obj.test_async()) for obj in get_objects(self.interface_configs, self.get_interface)
-        )
+        for obj in get_objects(self.interface_configs, self.get_interface):
+            jobs.append(scheduler.add_task("test", f"{self.name}:{obj.name}", obj.test_async))
 
         for config_dict, getter in [
             (self.sketch_configs, self.get_sketch),
             (self.part_configs, self.get_part),
             (self.assembly_configs, self.get_assembly),
         ]:
-            tasks.extend(
-                asyncio.create_task(getattr(t, test_method)(tests, ctx, obj))
-                for obj in get_objects(config_dict, getter)
-                for t in tests
-            )
+            for obj in get_objects(config_dict, getter):
+                for t in tests:
+                    jobs.append(await scheduler.add_test(obj, t, tests, use_wrapper))
 
-        return all(await asyncio.gather(*tasks))
+        return jobs
+
+    async def _run_test_async(self, ctx, tests: list, use_wrapper: bool = False) -> bool:
+        scheduler = BuildScheduler(ctx)
+        jobs = await self.schedule_tests(scheduler, ctx, tests, use_wrapper)
+        await scheduler.run()
+        return all(job.error is None and job.result for job in jobs)
 
     async def test_async(self, ctx, tests=None) -> bool:
         return await self._run_test_async(ctx, tests, use_wrapper=False)
@@ -1365,25 +1458,34 @@ class Project(project_config.Configuration):
             if None in shapes:
                 raise EmptyShapesError
 
-            tasks = []
+            scheduler = BuildScheduler(self.ctx)
             render_formats = ["svg", "png", "step", "stl", "3mf", "threejs", "obj", "gltf", "brep", "iges"]
+            batch_jobs = []
 
             for shape in shapes:
                 shape_render = render_cfg_merge(copy.copy(render), shape.config.get("render", {}))
 
-                for format_name in render_formats:
-                    if self._should_render_format(format_name, shape_render, format, shape.kind):
-                        if not hasattr(shape, "finalized") or shape.finalized:
-                            tasks.append(
-                                shape.render_async(
-                                    ctx=self.ctx,
-                                    format_name=format_name,
-                                    project=self,
-                                    filepath=None,
-                                )
-                            )
-
-            await asyncio.gather(*tasks)
+                if hasattr(shape, "finalized") and not shape.finalized:
+                    continue
+                formats = [
+                    format_name
+                    for format_name in render_formats
+                    if self._should_render_format(format_name, shape_render, format, shape.kind)
+                ]
+                if self.ctx.user_config.render_batch:
+                    batch_jobs.extend((shape, format_name, None, {}) for format_name in formats)
+                    continue
+                # The mesh formats are rendered together, out of one tessellation
+                mesh_formats = [format_name for format_name in formats if format_name in MESH_FORMATS]
+                if mesh_formats:
+                    await scheduler.add_render_mesh(shape, mesh_formats, self)
+                for format_name in formats:
+                    if format_name not in MESH_FORMATS:
+                        await scheduler.add_render(shape, format_name, self)
+
+            if batch_jobs:
+                await render_batch_async(self.ctx, batch_jobs, self)
+            await scheduler.run()
 
             if format == "readme" or (format is None and "readme" in render):
                 self.render_readme_async(render, output_dir)
@@ -1448,6 +1550,8 @@ class Project(project_config.Configuration):
 
         if render_cfg is None:
             render_cfg = {}
+        # The README lists all objects, including the ones not requested yet in the lazy mode
+        self.init_all()
         cfg = render_cfg.get("readme", {})
         if isinstance(cfg, str):
             cfg = {"path": cfg}
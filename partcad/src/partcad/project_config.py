@@ -6,11 +6,13 @@
 #
 # Licensed under Apache License, Version 2.0.
 
-from jinja2 import Environment, FileSystemLoader, ChoiceLoader
+from jinja2 import BaseLoader, ChoiceLoader, Environment, FileSystemLoader
+from jinja2.loaders import split_template_path
 import json
 import os
 from packaging.specifiers import SpecifierSet
 import sys
+import threading
 import yaml
 import math
 
@@ -18,10 +20,94 @@ from . import consts
 from . import logging as pc_logging
 from . import exception as pc_exception
 from . import telemetry
+from .cache_package_index import get_package_index, stat_files
+from .user_config import user_config as global_user_config
 
 DEFAULT_CONFIG_FILENAME = "partcad.yaml"
 
 
+# Passed to the templates in addition to "package_name" and "get_from_config"
+TEMPLATE_CONSTANTS = {
+    "M_PI": math.pi,
+    "PI": math.pi,
+    "SQRT_2": math.sqrt(2),
+    "SQRT_3": math.sqrt(3),
+    "SQRT_5": math.sqrt(5),
+    "INCH": 25.4,
+    "INCHES": 25.4,
+    "FOOT": 304.8,
+    "FEET": 304.8,
+}
+
+# libyaml is an order of magnitude faster than the pure-Python parser
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+class _RecordingLoader(BaseLoader):
+    """Keeps track of the files the templates depend on.
+
+    Both the included files and the files that would shadow them if they were
+    created in the preceding search paths are recorded, in the list set for
+    the current thread by the caller.
+    """
+
+    def __init__(self, searchpaths: list[str]):
+        self.searchpaths = searchpaths
+        self.loader = ChoiceLoader([FileSystemLoader(searchpath) for searchpath in searchpaths])
+        self.recording = threading.local()
+
+    def _get_candidates(self, template: str, filename: str | None) -> list[str]:
+        """Returns the files the template is looked up in, up to the one it is loaded from"""
+        pieces = split_template_path(template)
+        candidates = []
+        for searchpath in self.searchpaths:
+            candidate = os.path.abspath(os.path.join(searchpath, *pieces))
+            candidates.append(candidate)
+            if candidate == filename:
+                break
+        return candidates
+
+    def _record(self, candidates: list[str]) -> None:
+        filenames = getattr(self.recording, "filenames", None)
+        if filenames is not None:
+            filenames.extend(candidates)
+
+    def get_source(self, environment, template):
+        source, filename, _uptodate = self.loader.get_source(environment, template)
+        filename = os.path.abspath(filename) if filename is not None else None
+        candidates = self._get_candidates(template, filename)
+        state = stat_files(candidates)
+        self._record(candidates)
+
+        # Templates cached by the environment are only checked for updates.
+        # Unlike the Jinja check, it is not fooled by the modification time
+        # resolution and by the templates created in the preceding search paths.
+        def uptodate():
+            self._record(candidates)
+            return stat_files(candidates) == state
+
+        return source, filename, uptodate
+
+
+_environments: dict[tuple[str, ...], Environment] = {}
+_environments_lock = threading.Lock()
+
+
+def _get_environment(searchpaths: list[str]) -> Environment:
+    """Returns the Jinja environment shared by the packages with the same search paths"""
+    key = tuple(searchpaths)
+    with _environments_lock:
+        environment = _environments.get(key, None)
+        if environment is None:
+            environment = Environment(loader=_RecordingLoader(searchpaths))
+            _environments[key] = environment
+        return environment
+
+
+def _is_template(config: str) -> bool:
+    return "{{" in config or "{%" in config or "{#" in config
+
+
 @telemetry.instrument()
 class Configuration:
     name: str
@@ -32,7 +118,10 @@ class Configuration:
         config_path: str = DEFAULT_CONFIG_FILENAME,
         include_paths: list[str] = [],
         inherited_config: dict = {},
+        user_config=None,
     ):
+        if user_config is None:
+            user_config = global_user_config
         self.name = name
         self.config_obj = {}
         self.config_dir = config_path
@@ -49,40 +138,21 @@ class Configuration:
             self.broken = True
             return
 
-        # Read the body of the configuration file
-        fp = open(self.config_path, "r", encoding="utf-8")
-        config = fp.read()
-        fp.close()
-
-        # Resolve Jinja templates
-        loaders = [FileSystemLoader(self.config_dir + os.path.sep)]
-        # TODO(clairbee): mark the build as non-hermetic if includePaths is used
-        for include_path in include_paths:
-            include_path = os.path.join(self.config_dir, include_path) + os.path.sep
-            loaders.append(FileSystemLoader(include_path))
-        loader = ChoiceLoader(loaders)
-        template = Environment(loader=loader).from_string(config)
-        config = template.render(
-            {
-                "package_name": name,
-                "M_PI": math.pi,
-                "PI": math.pi,
-                "SQRT_2": math.sqrt(2),
-                "SQRT_3": math.sqrt(3),
-                "SQRT_5": math.sqrt(5),
-                "INCH": 25.4,
-                "INCHES": 25.4,
-                "FOOT": 304.8,
-                "FEET": 304.8,
-                "get_from_config": lambda: None
-            }
-        )
-
-        # Parse the config
-        if self.config_path.endswith(".yaml"):
-            self.config_obj = yaml.safe_load(config)
-        if self.config_path.endswith(".json"):
-            self.config_obj = json.load(config)
+        # Reuse the configuration parsed by a previous run if none of its files changed
+        index = get_package_index(user_config)
+        config_abspath = os.path.abspath(self.config_path)
+        self.config_obj = index.lookup(config_abspath, name, include_paths, TEMPLATE_CONSTANTS) if index else None
+        if self.config_obj is None:
+            self.config_obj, filenames = self._parse(name, include_paths)
+            if index:
+                index.store(
+                    config_abspath,
+                    name,
+                    include_paths,
+                    TEMPLATE_CONSTANTS,
+                    [config_abspath] + filenames,
+                    self.config_obj,
+                )
 
         # Recover from a broken or missing configuration
         # TODO(clairbee): add better error and exception handling (consider if it is needed)
@@ -145,3 +215,44 @@ class Configuration:
             self.is_manufacturable = bool(self.config_obj["manufacturable"])
         else:
             self.is_manufacturable = True
+
+    def _parse(self, name: str, include_paths: list[str]) -> tuple[dict, list[str]]:
+        """Renders the templates and parses the configuration file.
+
+        Returns the configuration and the files included by the templates.
+        """
+        # Read the body of the configuration file
+        fp = open(self.config_path, "r", encoding="utf-8")
+        config = fp.read()
+        fp.close()
+
+        # Resolve Jinja templates, unless there are none
+        filenames = []
+        if _is_template(config):
+            searchpaths = [self.config_dir + os.path.sep]
+            # TODO(clairbee): mark the build as non-hermetic if includePaths is used
+            for include_path in include_paths:
+                include_path = os.path.join(self.config_dir, include_path) + os.path.sep
+                searchpaths.append(include_path)
+            environment = _get_environment(searchpaths)
+            environment.loader.recording.filenames = filenames
+            try:
+                template = environment.from_string(config)
+                config = template.render(
+                    {
+                        "package_name": name,
+                        **TEMPLATE_CONSTANTS,
+                        "get_from_config": lambda: None,
+                    }
+                )
+            finally:
+                environment.loader.recording.filenames = None
+
+        # Parse the config
+        config_obj = None
+        if self.config_path.endswith(".yaml"):
+            config_obj = yaml.load(config, Loader=YamlLoader)
+        if self.config_path.endswith(".json"):
+            config_obj = json.load(config)
+
+        return config_obj, filenames
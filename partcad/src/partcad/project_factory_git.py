@@ -11,6 +11,7 @@ from git import Repo, exc
 import hashlib
 import re
 import os
+import shutil
 import time
 import threading
 
@@ -19,6 +20,11 @@ from . import logging as pc_logging
 from shlex import quote
 from . import telemetry
 
+# The bare mirrors shared by all revisions of the same repository
+MIRRORS_DIR = ".mirrors"
+# Written in the mirror once it is cloned
+MIRROR_GUARD_FILE = "partcad-cloned"
+
 global_cache_lock = threading.Lock()
 cache_locks = {}
 
@@ -104,7 +110,12 @@ class ProjectFactoryGit(pf.ProjectFactory, GitImportConfiguration):
 
     def _clone_or_update_repo(self, repo_url, cache_dir=None):
         """
-        Clones a Git repository to a local directory and keeps it up-to-date.
+        Checks out a Git repository to a local directory and keeps it up-to-date.
+
+        All revisions of the same repository share a single bare mirror. Each
+        revision is checked out in its own worktree of the mirror. Only the
+        objects needed to check out the revisions in use are fetched, unless
+        shallow clones are disabled.
 
         Args:
           repo_url: URL of the Git repository to clone.
@@ -119,6 +130,7 @@ class ProjectFactoryGit(pf.ProjectFactory, GitImportConfiguration):
 
         # Generate a unique identifier for the repository based on its URL.
         repo_hash = hashlib.sha256(repo_url.encode()).hexdigest()[:16]
+        mirror_path = os.path.join(cache_dir, MIRRORS_DIR, repo_hash + ".git")
         if self.import_revision is not None:
             # Append the revision to the hash instead of using it as an input
             # to the hash function. This way we can navigate in the cache
@@ -139,71 +151,50 @@ class ProjectFactoryGit(pf.ProjectFactory, GitImportConfiguration):
             max_retries = self.ctx.user_config.get_int("git.clone.retry.max")
             patience = self.ctx.user_config.get_float("git.clone.retry.patience")
             while attempt <= max_retries and self.ctx.is_connected():
-                # Check if the repository is already cached.
-                if os.path.exists(cache_path):
+                # Check if the repository is already checked out.
+                # Full clones made by the previous versions are replaced by worktrees.
+                if os.path.exists(guard_path) and os.path.isfile(os.path.join(cache_path, ".git")):
                     # Update the repository if it is already cached.
                     try:
-                        before = None
                         now = time.time()
-
-                        # Try to open the existing repository and update it.
                         if self.import_revision is None:
                             # Import the default branch
-                            if self.ctx.user_config.force_update or (now - os.path.getmtime(guard_path) > 24 * 3600):
-                                repo = Repo(cache_path)
-                                origin = repo.remote("origin")
-                                before = repo.active_branch.commit
-
-                                # If there is more than 1 remote branch, we have to
-                                # explicitly specify the branch to pull.
-                                remote_head = origin.refs.HEAD
-                                branch_name = remote_head.reference.name
-                                short_branch_name = branch_name[branch_name.find("/") + 1 :]
-                                pc_logging.debug("Refreshing the GIT branch: %s" % short_branch_name)
-                                with telemetry.start_as_current_span(
-                                    "*ProjectFactoryGit._clone_or_update_repo.{Repo.pull}"
-                                ):
-                                    origin.pull(short_branch_name)
-                                self.ctx.stats_git_ops += 1
-                                os.utime(guard_path, (now, now))
+                            refresh = self.ctx.user_config.force_update or (
+                                now - os.path.getmtime(guard_path) > 24 * 3600
+                            )
                         else:
                             # Import a specific revision
-                            if self.ctx.user_config.force_update:
-                                # Ensure "before" doesn't match the desired revision
-                                before = ""
-                            else:
-                                # Read the revision name from the guard file
-                                with open(guard_path, "r") as f:
-                                    before = f.read()
-
-                            if before != self.import_revision or (now - os.path.getmtime(guard_path) > 24 * 3600):
+                            with open(guard_path, "r") as f:
+                                before = f.read()
+                            refresh = (
+                                self.ctx.user_config.force_update
+                                or before != self.import_revision
+                                or (now - os.path.getmtime(guard_path) > 24 * 3600)
+                            )
+
+                        if refresh:
+                            try:
                                 repo = Repo(cache_path)
-                                before = repo.active_branch.commit
-                                origin = repo.remote("origin")
-                                # Need to check for updates
-                                with telemetry.start_as_current_span(
-                                    "*ProjectFactoryGit._clone_or_update_repo.{Repo.pull}-{Repo.fetch}"
-                                ):
-                                    origin.fetch()
-                                    repo.git.checkout(self.import_revision, force=True)
-                                    origin.pull(force=True, rebase=True)
-                                self.ctx.stats_git_ops += 1
-                                os.utime(guard_path, (now, now))
-                            else:
-                                # No update was performed
+                                before = repo.head.commit.hexsha
+                            except (exc.InvalidGitRepositoryError, exc.NoSuchPathError):
+                                # The mirror of the worktree was removed, check it out again
+                                repo = None
                                 before = None
-
-                        if not before is None:
-                            # Update was performed
-                            after = repo.active_branch.commit
+                            pc_logging.debug("Refreshing the GIT repo: %s" % self.import_config_url)
+                            with telemetry.start_as_current_span(
+                                "*ProjectFactoryGit._clone_or_update_repo.{Repo.fetch}"
+                            ):
+                                mirror, after = self._fetch(mirror_path, repo_url)
+                                if repo is None:
+                                    self._add_worktree(mirror, mirror_path, cache_path, after)
+                                else:
+                                    repo.git.checkout(after, force=True, detach=True)
+                            self.ctx.stats_git_ops += 1
                             if before != after:
                                 pc_logging.info("Updated the GIT repo: %s" % self.import_config_url)
-                            if before != after or self.ctx.user_config.force_update:
-                                with open(guard_path, "w") as f:
-                                    if self.import_revision is None:
-                                        f.write(str(after))
-                                    else:
-                                        f.write(self.import_revision)
+                            with open(guard_path, "w") as f:
+                                f.write(after if self.import_revision is None else self.import_revision)
+                            os.utime(guard_path, (now, now))
                         break
                     except exc.GitCommandError as e:
                         # Check if the error message matches any of the patterns
@@ -224,24 +215,18 @@ class ProjectFactoryGit(pf.ProjectFactory, GitImportConfiguration):
                             )
                             # Fall back to using the previous copy
                 else:
-                    # Clone the repository if it's not cached yet.
+                    # Check out the repository if it's not cached yet.
                     try:
                         pc_logging.info("Cloning the GIT repo: %s" % self.import_config_url)
                         with telemetry.start_as_current_span(
                             "*ProjectFactoryGit._clone_or_update_repo.{Repo.clone_from}"
                         ):
-                            repo = Repo.clone_from(
-                                repo_url, cache_path, multi_options=self.git_config_options, allow_unsafe_options=True
-                            )
+                            mirror, after = self._fetch(mirror_path, repo_url)
+                            self._add_worktree(mirror, mirror_path, cache_path, after)
                         self.ctx.stats_git_ops += 1
-                        if not self.import_revision is None:
-                            repo.git.checkout(self.import_revision, force=True)
-                            after = self.import_revision
-                        else:
-                            after = repo.active_branch.commit
 
                         with open(guard_path, "w") as f:
-                            f.write(str(after))
+                            f.write(after if self.import_revision is None else self.import_revision)
                         break
                     except exc.GitCommandError as e:
                         # Check if the error message matches any of the patterns
@@ -263,3 +248,67 @@ class ProjectFactoryGit(pf.ProjectFactory, GitImportConfiguration):
             cache_path = os.path.join(cache_path, self.import_rel_path)
 
         return cache_path
+
+    def _fetch_options(self) -> dict:
+        options = {}
+        if self.ctx.user_config.get_bool("git.clone.shallow"):
+            options["depth"] = 1
+        clone_filter = self.ctx.user_config.get_string("git.clone.filter")
+        if clone_filter:
+            options["filter"] = clone_filter
+        return options
+
+    def _fetch(self, mirror_path: str, repo_url: str) -> tuple[Repo, str]:
+        """Fetches the imported revision into the mirror of the repository.
+
+        Returns the mirror and the commit of the revision.
+        """
+        mirror_guard_path = os.path.join(mirror_path, MIRROR_GUARD_FILE)
+        with get_cache_lock(mirror_path):
+            if not os.path.exists(mirror_guard_path):
+                if os.path.exists(mirror_path):
+                    # The previous clone was interrupted
+                    shutil.rmtree(mirror_path)
+                options = ["--bare", "--no-tags"] + self.git_config_options
+                options += ["--%s=%s" % item for item in self._fetch_options().items()]
+                repo = Repo.clone_from(repo_url, mirror_path, multi_options=options, allow_unsafe_options=True)
+                with open(mirror_guard_path, "w") as f:
+                    f.write(repo_url)
+                if self.import_revision is None:
+                    return repo, repo.head.commit.hexsha
+            else:
+                repo = Repo(mirror_path)
+
+            if self.import_revision is None:
+                repo.git.fetch("origin", "HEAD", force=True, no_tags=True, **self._fetch_options())
+                return repo, repo.commit("FETCH_HEAD").hexsha
+
+            try:
+                repo.git.fetch("origin", self.import_revision, force=True, no_tags=True, **self._fetch_options())
+                return repo, repo.commit("FETCH_HEAD").hexsha
+            except exc.GitCommandError as e:
+                if any(re.search(pattern, str(e)) for pattern in git_error_patterns):
+                    raise
+                # Abbreviated commit hashes can't be fetched directly, fetch all branches and tags instead
+                pc_logging.debug("Fetching the whole GIT repo: %s" % self.import_config_url)
+                options = self._fetch_options()
+                options.pop("depth", None)
+                if os.path.exists(os.path.join(mirror_path, "shallow")):
+                    options["unshallow"] = True
+                repo.git.fetch(
+                    "origin",
+                    "+refs/heads/*:refs/heads/*",
+                    "+refs/tags/*:refs/tags/*",
+                    force=True,
+                    **options,
+                )
+                return repo, repo.commit(self.import_revision).hexsha
+
+    def _add_worktree(self, mirror: Repo, mirror_path: str, cache_path: str, commit: str) -> None:
+        if os.path.exists(cache_path):
+            # A full clone made by a previous version or a broken checkout
+            shutil.rmtree(cache_path)
+        with get_cache_lock(mirror_path):
+            # Forget the worktrees removed by 'pc system reset' or manually
+            mirror.git.worktree("prune")
+            mirror.git.worktree("add", "--detach", "--force", cache_path, commit)
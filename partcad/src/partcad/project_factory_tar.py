@@ -10,18 +10,86 @@
 
 import hashlib
 import inspect
+import io
 import os
 import requests
+import shutil
 import tarfile
+import threading
+import time
+from filelock import FileLock
 
+from . import logging as pc_logging
 from . import project_factory as pf
 from . import telemetry
 
+# Written in the extracted folder once the extraction is complete
+GUARD_FILE = ".partcad.tar.extracted"
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+DOWNLOAD_TIMEOUT = 60.0
+
+global_cache_lock = threading.Lock()
+cache_locks = {}
+
+
+def get_cache_lock(hash):
+    with global_cache_lock:
+        if hash not in cache_locks:
+            cache_locks[hash] = threading.Lock()
+        return cache_locks[hash]
+
+
+class _Download:
+    """The state of a download shared with the thread extracting it"""
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.done = False
+        self.error = None
+
+    def notify(self, done: bool = False, error: Exception = None):
+        with self.condition:
+            self.done = self.done or done
+            self.error = self.error or error
+            self.condition.notify_all()
+
+
+class _GrowingFileReader(io.RawIOBase):
+    """Reads a file that is being written to, until the download is complete"""
+
+    def __init__(self, path: str, download: _Download):
+        self.file = open(path, "rb")
+        self.download = download
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while True:
+            count = self.file.readinto(buffer)
+            if count:
+                return count
+            with self.download.condition:
+                if self.download.error is not None:
+                    raise RuntimeError(f"Download failed: {self.download.error}")
+                if self.download.done:
+                    # Read whatever was written since the last attempt
+                    return self.file.readinto(buffer)
+                self.download.condition.wait(1.0)
+
+    def close(self):
+        self.file.close()
+        super().close()
+
 
 class TarImportConfiguration:
     def __init__(self):
         self.import_config_url = self.config_obj.get("url")
         self.import_rel_path = self.config_obj.get("relPath")
+        self.import_sha256 = self.config_obj.get("sha256")
+        if self.import_sha256 is not None:
+            self.import_sha256 = str(self.import_sha256).lower()
         if "username" in self.config_obj and "password" in self.config_obj:
             self.auth_user = self.config_obj.get("username")
             self.auth_pass = self.config_obj.get("password")
@@ -48,7 +116,12 @@ class ProjectFactoryTar(pf.ProjectFactory, TarImportConfiguration):
 
     def _extract(self, tarball_url, cache_dir=None):
         """
-        Extracts a tarball to a local directory.
+        Downloads a tarball and extracts it to a local directory.
+
+        The tarball is extracted by a background thread while it is being
+        downloaded. The extracted files are moved in place only once the whole
+        tarball is extracted and its checksum is verified (if "sha256" is
+        set). Interrupted downloads are resumed where they stopped.
 
         Args:
           tarball_url: URL of the '.tar.gz' file to download.
@@ -64,19 +137,55 @@ class ProjectFactoryTar(pf.ProjectFactory, TarImportConfiguration):
         # Generate a unique identifier for the file based on its URL.
         url_hash = hashlib.sha256(tarball_url.encode()).hexdigest()[:16]
         cache_path = os.path.join(cache_dir, url_hash)
+        guard_path = os.path.join(cache_path, GUARD_FILE)
 
-        # Check if the tarball is already cached.
-        if not os.path.exists(cache_path):
-            # Download and extract
-            try:
-                os.makedirs(cache_path)
+        with get_cache_lock(url_hash):
+            # Check if the tarball is already cached.
+            if not self._is_extracted(guard_path):
+                # Download and extract
+                try:
+                    os.makedirs(cache_dir, exist_ok=True)
+                    # Only one process at a time can append to the same download
+                    with FileLock(os.path.join(cache_dir, url_hash + ".lock")):
+                        if not self._is_extracted(guard_path):
+                            if os.path.exists(cache_path):
+                                # Extracted partially or by a version that didn't verify the checksum
+                                shutil.rmtree(cache_path)
+                            self._download_and_extract(tarball_url, cache_dir, url_hash)
+                except Exception as e:
+                    raise RuntimeError(f"Failed to download the tarball: {e}")
 
-                auth = None
-                if not (self.auth_user is None or self.auth_pass is None):
-                    auth = (self.auth_user, self.auth_pass)
+        if not self.import_rel_path is None:
+            cache_path = os.path.join(cache_path, self.import_rel_path)
+
+        return cache_path
+
+    def _is_extracted(self, guard_path: str) -> bool:
+        if not os.path.exists(guard_path):
+            return False
+        if self.import_sha256 is None:
+            return True
+        with open(guard_path, "r") as f:
+            return f.read().strip() == self.import_sha256
+
+    def _download_and_extract(self, tarball_url: str, cache_dir: str, url_hash: str) -> None:
+        cache_path = os.path.join(cache_dir, url_hash)
+        # Kept between runs to resume the download
+        download_path = os.path.join(cache_dir, url_hash + ".download")
+        tmp_path = cache_path + ".tmp"
+        if os.path.exists(tmp_path):
+            shutil.rmtree(tmp_path)
+        os.makedirs(tmp_path)
+
+        download = _Download()
+        extract_errors = []
+
+        def extract():
+            try:
                 with (
-                    requests.get(tarball_url, stream=True, auth=auth) as rx,
-                    tarfile.open(fileobj=rx.raw, mode="r:gz") as tarobj,
+                    _GrowingFileReader(download_path, download) as reader,
+                    io.BufferedReader(reader, DOWNLOAD_CHUNK_SIZE) as stream,
+                    tarfile.open(fileobj=stream, mode="r|*") as tarobj,
                 ):
                     args = inspect.getfullargspec(tarobj.extractall)
 
@@ -88,13 +197,95 @@ class ProjectFactoryTar(pf.ProjectFactory, TarImportConfiguration):
                         else:
                             filter = lambda member, _: member
 
-                        tarobj.extractall(cache_path, filter=filter)
+                        tarobj.extractall(tmp_path, filter=filter)
                     else:
-                        tarobj.extractall(cache_path)
+                        tarobj.extractall(tmp_path)
             except Exception as e:
-                raise RuntimeError(f"Failed to download the tarball: {e}")
+                extract_errors.append(e)
 
-        if not self.import_rel_path is None:
-            cache_path = os.path.join(cache_path, self.import_rel_path)
+        try:
+            with open(download_path, "ab"):
+                # Make sure the file exists before it is read
+                pass
+            extractor = threading.Thread(target=extract, name="partcad-tar-extract", daemon=True)
+            extractor.start()
+            try:
+                sha256 = self._download(tarball_url, download_path, download)
+            except Exception as e:
+                download.notify(error=e)
+                raise
+            finally:
+                extractor.join()
+            if extract_errors:
+                # The downloaded file is broken, start over next time
+                os.unlink(download_path)
+                raise extract_errors[0]
 
-        return cache_path
+            if self.import_sha256 is not None and sha256 != self.import_sha256:
+                # Start over next time
+                os.unlink(download_path)
+                raise RuntimeError(f"Checksum mismatch: expected sha256 {self.import_sha256}, got {sha256}")
+
+            with open(os.path.join(tmp_path, GUARD_FILE), "w") as f:
+                f.write(sha256)
+            os.rename(tmp_path, cache_path)
+            os.unlink(download_path)
+        finally:
+            if os.path.exists(tmp_path):
+                shutil.rmtree(tmp_path)
+
+    def _download(self, tarball_url: str, download_path: str, download: _Download) -> str:
+        """Downloads the tarball, resuming the previous download if any, and returns its sha256"""
+        auth = None
+        if not (self.auth_user is None or self.auth_pass is None):
+            auth = (self.auth_user, self.auth_pass)
+        max_retries = self.ctx.user_config.get_int("tar.download.retry.max")
+        patience = self.ctx.user_config.get_float("tar.download.retry.patience")
+
+        # Hash what is already downloaded
+        hasher = hashlib.sha256()
+        with open(download_path, "rb") as f:
+            while chunk := f.read(DOWNLOAD_CHUNK_SIZE):
+                hasher.update(chunk)
+        offset = os.path.getsize(download_path)
+
+        attempt = 0
+        while True:
+            try:
+                headers = {"Range": f"bytes={offset}-"} if offset else {}
+                with requests.get(tarball_url, stream=True, auth=auth, headers=headers, timeout=DOWNLOAD_TIMEOUT) as rx:
+                    if rx.status_code == 416:
+                        # The previous download was complete
+                        break
+                    rx.raise_for_status()
+                    # Servers not supporting ranges send the whole file again
+                    skip = offset if rx.status_code != 206 else 0
+                    with open(download_path, "ab") as f:
+                        for chunk in rx.iter_content(DOWNLOAD_CHUNK_SIZE):
+                            if skip:
+                                dropped = min(skip, len(chunk))
+                                chunk = chunk[dropped:]
+                                skip -= dropped
+                                if not chunk:
+                                    continue
+                            f.write(chunk)
+                            f.flush()
+                            hasher.update(chunk)
+                            offset += len(chunk)
+                            download.notify()
+                break
+            except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError):
+                if attempt >= max_retries:
+                    raise
+                attempt += 1
+                pc_logging.warning(
+                    "Failed to download %s. Resuming (%d/%d) in %d secs...",
+                    tarball_url,
+                    attempt,
+                    max_retries,
+                    patience,
+                )
+                time.sleep(patience)
+
+        download.notify(done=True)
+        return hasher.hexdigest()
@@ -7,14 +7,9 @@
 # Licensed under Apache License, Version 2.0.
 #
 
-import base64
 import os
-import pickle
 import sys
 
-sys.path.append(os.path.join(os.path.dirname(__file__), "wrappers"))
-from ocp_serialize import register as register_ocp_helper
-
 from .user_config import user_config
 from .provider_factory_file import ProviderFactoryFile
 from .runtime_python import PythonRuntime
@@ -131,9 +126,7 @@ class ProviderFactoryPython(ProviderFactoryFile):
             # request["patch"] = patch
 
             # Serialize the request
-            register_ocp_helper()
-            picklestring = pickle.dumps(request)
-            request_serialized = base64.b64encode(picklestring).decode()
+            request_serialized = wrapper.serialize_request(request)
 
             # TODO-199: Use a requirements.txt or pyproject.toml for version specifications
             # TODO-200: Create a version resolution mechanism that can handle dependency conflicts
@@ -180,9 +173,7 @@ class ProviderFactoryPython(ProviderFactoryFile):
                     provider.error("%s: %s" % (provider.name, error_line))
 
             try:
-                response = base64.b64decode(response_serialized)
-                register_ocp_helper()
-                result = pickle.loads(response)
+                result = wrapper.deserialize_response(response_serialized)
             except Exception as e:
                 provider.error("Exception while deserializing %s: %s" % (provider.name, e))
                 return None
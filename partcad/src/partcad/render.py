@@ -38,3 +38,6 @@ DEFAULT_RENDER_SVG_OPTS = {
     # "marginLeft": 0,
     # "marginTop": 0,
 }
+
+# The formats made of the triangulation of the shape, which can be rendered together
+MESH_FORMATS = ["stl", "obj", "threejs", "3mf", "gltf"]
@@ -0,0 +1,281 @@
+#
+# PartCAD, 2025
+#
+# Licensed under Apache License, Version 2.0.
+#
+
+# Batch rendering of shapes in a long-lived render server
+# (see "wrappers/wrapper_render_server.py").
+#
+# The packages needed by all the requested formats are installed once, and the
+# rendering libraries are imported once, instead of once per shape and format.
+# The shapes are built by the scheduler and sent to the server as soon as they
+# are built, and the result of each job is reported as soon as it is rendered.
+
+from __future__ import annotations
+from typing import TYPE_CHECKING
+
+import asyncio
+import itertools
+import os
+import pickle
+import subprocess
+import sys
+import time
+from typing import Callable, Optional
+
+from . import logging as pc_logging
+from . import telemetry
+from . import wrapper
+from .runtime_python_pool import WorkerError
+from .scheduler import BuildScheduler
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "wrappers"))
+import ipc_framing
+
+if TYPE_CHECKING:
+    from partcad.context import Context
+    from partcad.project import Project
+    from partcad.shape import Shape
+
+
+@telemetry.instrument()
+class RenderServer:
+    """A long-lived sandboxed interpreter rendering several jobs at a time.
+
+    Raises WorkerError if the server can't be started, or if it stops before
+    the job is rendered.
+    """
+
+    def __init__(self, ctx: Context, formats: list[str], threads: int = None) -> None:
+        self.ctx = ctx
+        self.formats = sorted(set(formats))
+        if threads is None:
+            threads = ctx.user_config.threads_max or os.cpu_count() or 1
+        self.threads = max(threads, 1)
+
+        self.process = None
+        self.error = None
+        self.ids = itertools.count()
+        self.pending: dict[int, asyncio.Future] = {}
+        self.send_lock = asyncio.Lock()
+        self.tasks: list[asyncio.Task] = []
+
+    async def start(self) -> None:
+        from .shape import WRAPPER_FORMATS
+
+        runtime = self.ctx.get_python_runtime(version="3.11")
+        await runtime.once_async()
+        dependencies = set(dep for format_name in self.formats for dep in WRAPPER_FORMATS[format_name])
+        await asyncio.gather(*(runtime.ensure_async(dep) for dep in sorted(dependencies)))
+
+        cmd = [
+            runtime.get_venv_python_path(),
+            *runtime.python_flags,
+            wrapper.get("render_server.py"),
+            str(self.threads),
+            *self.formats,
+        ]
+        pc_logging.debug("Starting a render server: %s" % cmd)
+        self.process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            shell=False,
+            # TODO(clairbee): creationflags=subprocess.CREATE_NO_WINDOW,
+        )
+        self.tasks.append(asyncio.create_task(self._drain_stderr()))
+
+        response = await self._receive()
+        if response.get("op", None) != "ready":
+            self._fail(WorkerError("Unexpected handshake from render server: %s" % response))
+            raise self.error
+        self.tasks.append(asyncio.create_task(self._read_results()))
+
+    async def _drain_stderr(self) -> None:
+        # The errors of the jobs are reported with their results
+        while line := await self.process.stderr.readline():
+            pc_logging.debug("Render server %s: %s" % (self.process.pid, line.decode(errors="replace").rstrip()))
+
+    async def _receive(self) -> dict:
+        try:
+            header = await self.process.stdout.readexactly(ipc_framing.FRAME_HEADER.size)
+            (size,) = ipc_framing.FRAME_HEADER.unpack(header)
+            return pickle.loads(await self.process.stdout.readexactly(size))
+        except (asyncio.IncompleteReadError, OSError, pickle.UnpicklingError) as e:
+            self._fail(WorkerError("Render server %s stopped responding: %s" % (self.process.pid, e)))
+            raise self.error from e
+
+    async def _read_results(self) -> None:
+        while True:
+            try:
+                response = await self._receive()
+            except WorkerError:
+                return
+            if response.get("op", None) != "result":
+                pc_logging.error("Unexpected response from render server: %s" % response)
+                continue
+            future = self.pending.pop(response["id"], None)
+            if future is not None and not future.done():
+                future.set_result(response)
+
+    def _fail(self, error: WorkerError) -> None:
+        if self.error is None:
+            self.error = error
+        if self.process is not None and self.process.returncode is None:
+            try:
+                self.process.kill()
+            except ProcessLookupError:
+                pass
+        for future in self.pending.values():
+            if not future.done():
+                future.set_exception(self.error)
+        self.pending = {}
+
+    async def render(self, format_name: str, path: str, request: dict) -> dict:
+        """Renders the request with "wrapper_render_<format_name>.py", or "wrapper_render_mesh.py" if "mesh" """
+        if self.error is not None:
+            raise self.error
+
+        job_id = next(self.ids)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[job_id] = future
+        payload = wrapper.serialize_request(
+            {"op": "render", "id": job_id, "format": format_name, "path": path, "request": request}
+        )
+        try:
+            async with self.send_lock:
+                self.process.stdin.write(ipc_framing.FRAME_HEADER.pack(len(payload)))
+                self.process.stdin.write(payload)
+                await self.process.stdin.drain()
+        except (OSError, RuntimeError) as e:
+            self._fail(WorkerError("Render server %s is not accepting jobs: %s" % (self.process.pid, e)))
+
+        return await future
+
+    async def close(self) -> None:
+        """Waits for the submitted jobs to complete and stops the server"""
+        if self.process is None:
+            return
+        if self.process.returncode is None and self.error is None:
+            try:
+                payload = wrapper.serialize_request({"op": "exit"})
+                async with self.send_lock:
+                    self.process.stdin.write(ipc_framing.FRAME_HEADER.pack(len(payload)))
+                    self.process.stdin.write(payload)
+                    self.process.stdin.close()
+                await self.process.wait()
+            except (OSError, RuntimeError) as e:
+                pc_logging.debug("Failed to stop the render server: %s" % e)
+                self.process.kill()
+        await self.process.wait()
+        # Let the results still in the pipe reach their jobs
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self._fail(WorkerError("The render server is stopped"))
+
+    async def __aenter__(self) -> RenderServer:
+        try:
+            await self.start()
+        except BaseException:
+            await self.close()
+            raise
+        return self
+
+    async def __aexit__(self, *_args) -> None:
+        await self.close()
+
+
+async def render_batch_async(
+    ctx: Context,
+    jobs: list[tuple[Shape, str, Optional[str], dict]],
+    project: Optional[Project] = None,
+    on_result: Callable[[Shape, str, str, dict], None] = None,
+) -> list[Optional[dict]]:
+    """
+    Render the shapes in one long-lived render server.
+    Args:
+        ctx: Execution context.
+        jobs: (shape, format, path, options) tuples, the render config of the project is used if path is None.
+        project: Optional project object.
+        on_result: Called with (shape, format, path, result) as soon as each job is rendered.
+    Returns the results of the jobs in the same order, None for the jobs rendered one by one
+    if the render server could not be started. The files found in the render cache are reused,
+    and their results are marked "cached".
+    """
+    start = time.perf_counter()
+    results: list[Optional[dict]] = [None] * len(jobs)
+
+    # The jobs of the same shape are sent together, once it is built
+    shapes: dict[int, tuple[Shape, list[int]]] = {}
+    for index, (shape, _format_name, _path, _options) in enumerate(jobs):
+        shapes.setdefault(id(shape), (shape, []))[1].append(index)
+
+    # The number of rendered and failed jobs
+    stats = [0, 0]
+
+    # The files rendered earlier are reused without building the shapes
+    for shape_id, (shape, indices) in list(shapes.items()):
+        restored = await shape.restore_renders_async(ctx, [jobs[index][1:] for index in indices], project)
+        for index, path in zip(indices, restored):
+            if path is None:
+                continue
+            results[index] = {"success": True, "exception": None, "cached": True}
+            stats[0] += 1
+            if on_result is not None:
+                on_result(shape, jobs[index][1], path, results[index])
+        indices = [index for index, path in zip(indices, restored) if path is None]
+        if indices:
+            shapes[shape_id] = (shape, indices)
+        else:
+            del shapes[shape_id]
+    if not shapes:
+        pc_logging.debug("Reused %d rendered files in %.2fs" % (stats[0], time.perf_counter() - start))
+        return results
+
+    scheduler = BuildScheduler(ctx)
+    server = RenderServer(ctx, [jobs[index][1] for _shape, indices in shapes.values() for index in indices])
+    try:
+        await server.start()
+    except WorkerError as e:
+        pc_logging.warning("Failed to start the render server, rendering one shape at a time: %s" % e)
+        await server.close()
+        for index in (index for _shape, indices in shapes.values() for index in indices):
+            shape, format_name, path, options = jobs[index]
+            build_job = await scheduler.add_shape(shape)
+            job = scheduler.add_task(
+                "render",
+                f"{build_job.name}:{format_name}",
+                lambda shape=shape, format_name=format_name, path=path, options=options: shape.render_async(
+                    ctx, format_name, project, path, **options
+                ),
+            )
+            job.add_dependency(build_job)
+        await scheduler.run()
+        return results
+
+    try:
+        for shape, indices in shapes.values():
+
+            def report(index: int, path: str, result: dict, shape=shape, indices=indices) -> None:
+                results[indices[index]] = result
+                stats[0 if result.get("success", False) else 1] += 1
+                if on_result is not None:
+                    on_result(shape, jobs[indices[index]][1], path, result)
+
+            await scheduler.add_render_batch(
+                shape,
+                server,
+                [jobs[index][1:] for index in indices],
+                project,
+                report,
+            )
+        await scheduler.run()
+    finally:
+        await server.close()
+
+    pc_logging.debug(
+        "Rendered %d files in %.2fs (%d failed, %d threads)"
+        % (stats[0], time.perf_counter() - start, stats[1], server.threads)
+    )
+    return results
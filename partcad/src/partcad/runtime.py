@@ -256,13 +256,16 @@ class Runtime:
                 # TODO(clairbee): creationflags=subprocess.CREATE_NO_WINDOW,
                 cwd=cwd,
             )
+            # Binary requests get binary responses
+            binary = isinstance(stdin, bytes)
             stdout, stderr = await p.communicate(
                 # TODO(clairbee): add timeout
-                input=stdin.encode(),
+                input=stdin if binary else stdin.encode(),
                 # TODO(clairbee): add timeout
             )
 
-            stdout = stdout.decode()
+            if not binary:
+                stdout = stdout.decode()
             stderr = stderr.decode()
 
         # if stdout:
@@ -7,6 +7,7 @@
 # Licensed under Apache License, Version 2.0.
 
 import asyncio
+import atexit
 import contextlib
 import copy
 import hashlib
@@ -19,8 +20,10 @@ import threading
 from filelock import FileLock
 
 from . import runtime
+from . import runtime_python_pool
 from . import logging as pc_logging
 from . import telemetry
+from .sync_threads import threadpool_manager
 
 
 class VenvLock:
@@ -88,6 +91,11 @@ class PythonRuntime(runtime.Runtime):
         if platform.system() == "Windows":
             self.pip_install_flags += ["--no-warn-script-location"]
 
+        # Long-lived pre-warmed interpreters, per venv environment
+        self.worker_pools = {}
+        self.worker_pools_lock = threading.Lock()
+        atexit.register(self.close_worker_pools)
+
     def get_async_lock(self):
         if not hasattr(self.tls, "async_locks"):
             self.tls.async_locks = {}
@@ -271,6 +279,28 @@ class PythonRuntime(runtime.Runtime):
             for dep in session["deps"]:
                 await self.ensure_async_onced(dep, path=session["path"])
 
+        # Binary requests (see "wrapper.serialize_request()") get binary responses
+        binary = isinstance(stdin, bytes)
+        stdin_bytes = stdin if binary else stdin.encode()
+
+        if self.can_use_worker_pool(cmd):
+            pool = self.get_worker_pool(session, path)
+            pc_logging.debug("Running in a sandbox worker: %s", cmd)
+            try:
+                with telemetry.start_as_current_span("PythonRuntime.run_async_onced.*{PythonWorkerPool.run}"):
+                    stdout, stderr = await threadpool_manager.run_detached(
+                        pool.run, cmd, stdin_bytes, os.path.abspath(cwd) if cwd else None
+                    )
+                if not binary:
+                    stdout = stdout.decode()
+                stderr = stderr.decode()
+                if stderr:
+                    pc_logging.error("Error in %s: %s" % (cmd, stderr))
+                return stdout, stderr
+            except runtime_python_pool.WorkerError as e:
+                # Fallback to running the script in a new process
+                pc_logging.debug("Sandbox worker failed, starting a new process instead: %s" % e)
+
         async with self.async_lock(session):
             python_path = self.get_venv_python_path(session, path)
             cmd = [python_path, *self.python_flags, *cmd]
@@ -291,11 +321,12 @@ class PythonRuntime(runtime.Runtime):
                     cwd=cwd,
                 )
                 stdout, stderr = await p.communicate(
-                    input=stdin.encode(),
+                    input=stdin_bytes,
                     # TODO(clairbee): add timeout
                 )
 
-            stdout = stdout.decode()
+            if not binary:
+                stdout = stdout.decode()
             stderr = stderr.decode()
 
             # if stdout:
@@ -522,6 +553,32 @@ class PythonRuntime(runtime.Runtime):
 
         return python_path
 
+    def can_use_worker_pool(self, cmd) -> bool:
+        """Only wrapper scripts can be executed by the long-lived workers"""
+        if not self.ctx.user_config.python_worker_pool:
+            return False
+        return len(cmd) > 0 and not cmd[0].startswith("-") and cmd[0].endswith(".py")
+
+    def get_worker_pool(self, session=None, path=None) -> runtime_python_pool.PythonWorkerPool:
+        python_path = self.get_venv_python_path(session, path)
+        with self.worker_pools_lock:
+            if python_path not in self.worker_pools:
+                user_config = self.ctx.user_config
+                self.worker_pools[python_path] = runtime_python_pool.PythonWorkerPool(
+                    [python_path, *self.python_flags],
+                    size=user_config.python_worker_pool_size,
+                    max_jobs=user_config.python_worker_max_jobs,
+                    max_rss=user_config.python_worker_max_rss,
+                )
+            return self.worker_pools[python_path]
+
+    def close_worker_pools(self):
+        with self.worker_pools_lock:
+            pools = list(self.worker_pools.values())
+            self.worker_pools = {}
+        for pool in pools:
+            pool.close()
+
     def get_session(self, name: str):
         """Create a context to describe the venv environment in case it is needed"""
         name_hash = hashlib.sha256(name.encode()).hexdigest()[:16]
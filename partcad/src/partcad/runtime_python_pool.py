@@ -0,0 +1,225 @@
+#
+# PartCAD, 2025
+#
+# Licensed under Apache License, Version 2.0.
+#
+
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from . import logging as pc_logging
+from . import telemetry
+from . import wrapper
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "wrappers"))
+import ipc_framing
+
+# Modules to import in the workers before they start accepting jobs
+DEFAULT_PRELOAD = ["OCP", "cadquery", "build123d"]
+
+# Workers idle for longer than that are pinged before they are given a new job
+HEALTH_CHECK_INTERVAL = 30.0
+
+
+class WorkerError(Exception):
+    """The worker failed to execute the job (as opposed to the job failing)"""
+
+
+class PythonWorker:
+    """A long-lived sandboxed python interpreter that executes wrapper scripts"""
+
+    def __init__(self, cmd: list[str], env: dict = None):
+        self.jobs = 0
+        self.rss = 0
+        self.pid = None
+        self.ready = False
+        self.last_used = time.time()
+        self.process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            shell=False,
+            env=env,
+            # TODO(clairbee): creationflags=subprocess.CREATE_NO_WINDOW,
+        )
+        # Anything native libraries print outside of the jobs ends up here
+        self.stderr_thread = threading.Thread(target=self._drain_stderr, daemon=True)
+        self.stderr_thread.start()
+
+    def _drain_stderr(self):
+        for line in iter(self.process.stderr.readline, b""):
+            pc_logging.debug("Worker %s: %s" % (self.process.pid, line.decode(errors="replace").rstrip()))
+
+    def is_alive(self) -> bool:
+        return self.process.poll() is None
+
+    def _receive(self) -> dict:
+        try:
+            return ipc_framing.read_message(self.process.stdout)
+        except (EOFError, OSError, ipc_framing.FrameError) as e:
+            self.kill()
+            raise WorkerError("Worker %s stopped responding: %s" % (self.process.pid, e)) from e
+
+    def _send(self, message: dict) -> None:
+        try:
+            ipc_framing.write_message(self.process.stdin, message)
+        except (OSError, ValueError) as e:
+            self.kill()
+            raise WorkerError("Worker %s is not accepting requests: %s" % (self.process.pid, e)) from e
+
+    def wait_ready(self) -> None:
+        if self.ready:
+            return
+        response = self._receive()
+        if response.get("op", None) != "ready":
+            self.kill()
+            raise WorkerError("Unexpected handshake from worker %s: %s" % (self.process.pid, response))
+        self.pid = response["pid"]
+        self.rss = response.get("rss", 0)
+        self.ready = True
+
+    def ping(self) -> bool:
+        try:
+            self.wait_ready()
+            self._send({"op": "ping"})
+            response = self._receive()
+        except WorkerError as e:
+            pc_logging.debug(str(e))
+            return False
+        self.rss = response.get("rss", self.rss)
+        return response.get("op", None) == "pong"
+
+    def run(self, argv: list[str], stdin: bytes = b"", cwd: str = None) -> tuple[bytes, bytes]:
+        self.wait_ready()
+        self._send({"op": "run", "argv": argv, "cwd": cwd, "stdin": stdin})
+        response = self._receive()
+        if response.get("op", None) != "done":
+            self.kill()
+            raise WorkerError("Unexpected response from worker %s: %s" % (self.process.pid, response))
+        self.jobs += 1
+        self.rss = response.get("rss", 0)
+        self.last_used = time.time()
+        return response["stdout"], response["stderr"]
+
+    def close(self, timeout: float = 5.0) -> None:
+        if self.is_alive():
+            try:
+                ipc_framing.write_message(self.process.stdin, {"op": "exit"})
+                self.process.stdin.close()
+                self.process.wait(timeout=timeout)
+            except Exception:
+                self.kill()
+
+    def kill(self) -> None:
+        if self.is_alive():
+            self.process.kill()
+            self.process.wait()
+
+
+@telemetry.instrument()
+class PythonWorkerPool:
+    """A pool of pre-warmed sandboxed interpreters sharing the same environment.
+
+    Workers are recycled after 'max_jobs' jobs or when their memory footprint
+    exceeds 'max_rss' bytes.
+    """
+
+    def __init__(
+        self,
+        python_cmd: list[str],
+        size: int = 2,
+        max_jobs: int = 100,
+        max_rss: int = 0,
+        preload: list[str] = None,
+        env: dict = None,
+    ):
+        self.python_cmd = python_cmd
+        self.size = max(1, size)
+        self.max_jobs = max_jobs
+        self.max_rss = max_rss
+        self.preload = DEFAULT_PRELOAD if preload is None else preload
+        self.env = env
+
+        self.lock = threading.Condition()
+        self.idle: list[PythonWorker] = []
+        self.busy = 0
+        self.closed = False
+
+        self.stats_jobs = 0
+        self.stats_spawned = 0
+        self.stats_recycled = 0
+
+    def _spawn(self) -> PythonWorker:
+        cmd = [*self.python_cmd, wrapper.get("worker.py"), *self.preload]
+        pc_logging.debug("Starting a sandbox worker: %s" % cmd)
+        self.stats_spawned += 1
+        return PythonWorker(cmd, env=self.env)
+
+    def _acquire(self) -> PythonWorker:
+        with self.lock:
+            if self.closed:
+                raise WorkerError("The worker pool is closed")
+            if not self.idle and self.busy == 0:
+                # First use, start all workers at once
+                for _ in range(self.size):
+                    self.idle.append(self._spawn())
+            while not self.idle and self.busy >= self.size:
+                self.lock.wait()
+            self.busy += 1
+            if self.idle:
+                worker = self.idle.pop()
+            else:
+                worker = None
+
+        if worker is None:
+            worker = self._spawn()
+        elif not worker.is_alive() or (
+            worker.ready and time.time() - worker.last_used > HEALTH_CHECK_INTERVAL and not worker.ping()
+        ):
+            pc_logging.debug("Replacing an unhealthy sandbox worker")
+            worker.kill()
+            worker = self._spawn()
+        return worker
+
+    def _release(self, worker: PythonWorker) -> None:
+        recycle = (
+            self.closed
+            or not worker.is_alive()
+            or (self.max_jobs > 0 and worker.jobs >= self.max_jobs)
+            or (self.max_rss > 0 and worker.rss > self.max_rss)
+        )
+        if recycle:
+            if worker.is_alive():
+                self.stats_recycled += 1
+            worker.close()
+        with self.lock:
+            self.busy -= 1
+            if not recycle:
+                self.idle.append(worker)
+            self.lock.notify()
+
+    def run(self, argv: list[str], stdin: bytes = b"", cwd: str = None) -> tuple[bytes, bytes]:
+        """Run the given script in one of the workers.
+
+        Raises WorkerError if the worker crashed or misbehaved. The caller is
+        expected to fallback to running the script in a new process.
+        """
+        worker = self._acquire()
+        try:
+            result = worker.run(argv, stdin=stdin, cwd=cwd)
+            self.stats_jobs += 1
+            return result
+        finally:
+            self._release(worker)
+
+    def close(self) -> None:
+        with self.lock:
+            self.closed = True
+            workers = self.idle
+            self.idle = []
+        for worker in workers:
+            worker.close()
@@ -0,0 +1,330 @@
+#
+# PartCAD, 2025
+#
+# Licensed under Apache License, Version 2.0.
+#
+
+# Scheduler of the work needed to render, export and test shapes.
+#
+# The work is described as a graph of jobs: sketches are built before the parts
+# made out of them, parts before the assemblies containing them, and shapes
+# before they are rendered or tested. Jobs are identified by the cache key of
+# the shape they work on, so that the same shape is built once, however many
+# times it is used. The shapes found in the filesystem cache do not wait for the
+# shapes they are made of, as the latter are not needed to load them.
+#
+# The ready jobs are started in the order of the longest chain of work waiting
+# for them (the critical path) as long as the number of running jobs and their
+# estimated memory usage stay within the limits.
+
+from __future__ import annotations
+from typing import TYPE_CHECKING
+
+import asyncio
+import heapq
+import itertools
+import os
+import time
+from typing import Awaitable, Callable
+
+from . import logging as pc_logging
+from .user_config import user_config
+
+if TYPE_CHECKING:
+    from partcad.context import Context
+    from partcad.project import Project
+    from partcad.render_server import RenderServer
+    from partcad.shape import Shape
+    from partcad.test.test import Test
+
+# Relative duration of each kind of job, used to find the critical path
+JOB_COST = {
+    "sketch": 1.0,
+    "part": 4.0,
+    "assembly": 2.0,
+    "render": 2.0,
+    "test": 1.0,
+}
+# Duration of building a shape that is already loaded or cached
+JOB_COST_LOADED = 0.1
+
+# Memory used by each kind of job while it runs, in bytes
+JOB_MEMORY = {
+    "sketch": 16 * 1024 * 1024,
+    "part": 128 * 1024 * 1024,
+    "assembly": 64 * 1024 * 1024,
+    "render": 256 * 1024 * 1024,
+    "test": 64 * 1024 * 1024,
+}
+
+
+def get_default_max_memory() -> int:
+    """Returns half of the physical memory, 0 (no limit) if it is unknown"""
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // 2
+    except (AttributeError, ValueError, OSError):
+        return 0
+
+
+class Job:
+    def __init__(self, key, kind: str, name: str, action: Callable[[], Awaitable]) -> None:
+        self.key = key
+        self.kind = kind
+        self.name = name
+        self.action = action
+        self.cost = JOB_COST.get(kind, 1.0)
+        self.memory = JOB_MEMORY.get(kind, 0)
+
+        self.dependencies: list[Job] = []
+        self.dependents: list[Job] = []
+        # The length of the longest chain of jobs starting with this one
+        self.priority = None
+
+        self.done = False
+        self.result = None
+        self.error = None
+
+    def add_dependency(self, job: Job) -> None:
+        if job not in self.dependencies:
+            self.dependencies.append(job)
+            job.dependents.append(self)
+
+    def __repr__(self) -> str:
+        return f"{self.kind}:{self.name}"
+
+
+class BuildScheduler:
+    def __init__(self, ctx: Context, jobs: int = None, max_memory: int = None) -> None:
+        self.ctx = ctx
+        config = ctx.user_config if ctx is not None else user_config
+
+        if jobs is None:
+            jobs = config.jobs
+        if not jobs:
+            jobs = config.threads_max or os.cpu_count() or 1
+        self.jobs_max = max(jobs, 1)
+
+        if max_memory is None:
+            max_memory = config.max_memory
+        if max_memory is None:
+            max_memory = get_default_max_memory()
+        self.max_memory = max_memory
+
+        self.jobs: dict[object, Job] = {}
+        # The jobs which dependencies are being added, to detect cycles
+        self.adding: set[Job] = set()
+        self.stats_deduplicated = 0
+        self.stats_peak_memory = 0
+
+    async def _get_shape_key(self, shape: Shape):
+        if shape.get_cacheable() and self.ctx is not None:
+            cache_hash = await shape.get_cache_hash(self.ctx)
+            key = cache_hash.get() if cache_hash else None
+            if key:
+                return key
+        # The shapes which can't be cached are only deduplicated by identity
+        return id(shape)
+
+    async def _is_cached(self, shape: Shape) -> int | None:
+        """Returns the size of the shape in the filesystem cache, None if it is not there"""
+        if not shape.get_cacheable() or self.ctx is None:
+            return None
+        cache_hash = await shape.get_cache_hash(self.ctx)
+        if not cache_hash:
+            return None
+        return self.ctx.cache_shapes.get_entry_size(cache_hash, shape.kind)
+
+    async def add_shape(self, shape: Shape) -> Job:
+        """Adds the job building the shape, after the jobs building the shapes it is made of"""
+        key = ("build", await self._get_shape_key(shape))
+        job = self.jobs.get(key, None)
+        if job is not None:
+            self.stats_deduplicated += 1
+            return job
+
+        job = Job(key, shape.kind, f"{shape.project_name}:{shape.name}", lambda: shape.get_wrapped(self.ctx))
+        self.jobs[key] = job
+
+        if shape._wrapped is not None:
+            # Already in memory
+            job.cost = JOB_COST_LOADED
+            job.memory = 0
+            return job
+
+        cached_size = await self._is_cached(shape)
+        if cached_size is not None:
+            # Loaded from the filesystem cache, the shapes it is made of are not needed
+            job.cost = JOB_COST_LOADED
+            job.memory = cached_size
+            return job
+
+        self.adding.add(job)
+        try:
+            for dependency in await shape.get_dependencies(self.ctx):
+                dependency_job = await self.add_shape(dependency)
+                if dependency_job in self.adding:
+                    pc_logging.error(f"Circular dependency between {job.name} and {dependency_job.name}")
+                    continue
+                job.add_dependency(dependency_job)
+        finally:
+            self.adding.remove(job)
+        return job
+
+    async def add_render(self, shape: Shape, format_name: str, project: Project = None) -> Job:
+        """Adds the job rendering the shape in the given format, once it is built"""
+        build_job = await self.add_shape(shape)
+        key = ("render", build_job.key, format_name, project.name if project is not None else None)
+        job = self.jobs.get(key, None)
+        if job is not None:
+            self.stats_deduplicated += 1
+            return job
+
+        job = Job(
+            key,
+            "render",
+            f"{build_job.name}:{format_name}",
+            lambda: shape.render_async(ctx=self.ctx, format_name=format_name, project=project, filepath=None),
+        )
+        job.add_dependency(build_job)
+        self.jobs[key] = job
+        return job
+
+    async def add_render_mesh(self, shape: Shape, format_names: list[str], project: Project = None) -> Job:
+        """Adds the job rendering the shape in several mesh formats from one tessellation, once it is built"""
+        if len(format_names) == 1:
+            return await self.add_render(shape, format_names[0], project)
+
+        build_job = await self.add_shape(shape)
+        key = ("render", build_job.key, tuple(format_names), project.name if project is not None else None)
+        job = self.jobs.get(key, None)
+        if job is not None:
+            self.stats_deduplicated += 1
+            return job
+
+        job = Job(
+            key,
+            "render",
+            f"{build_job.name}:{','.join(format_names)}",
+            lambda: shape.render_mesh_async(ctx=self.ctx, format_names=format_names, project=project, filepath=None),
+        )
+        job.add_dependency(build_job)
+        self.jobs[key] = job
+        return job
+
+    async def add_render_batch(
+        self,
+        shape: Shape,
+        server: RenderServer,
+        jobs: list[tuple[str, str | None, dict]],
+        project: Project = None,
+        on_result: Callable[[int, str, dict], None] = None,
+    ) -> Job:
+        """Adds the job rendering the shape in the render server, once it is built"""
+        build_job = await self.add_shape(shape)
+        job = self.add_task(
+            "render",
+            f"{build_job.name}:{','.join(format_name for format_name, _path, _options in jobs)}",
+            lambda: shape.render_batch_async(self.ctx, server, jobs, project, on_result),
+        )
+        job.add_dependency(build_job)
+        return job
+
+    async def add_test(self, shape: Shape, test: Test, tests: list[Test], use_wrapper: bool = False) -> Job:
+        """Adds the job running the test on the shape, once it is built"""
+        build_job = await self.add_shape(shape)
+        key = ("test", build_job.key, test.name)
+        job = self.jobs.get(key, None)
+        if job is not None:
+            self.stats_deduplicated += 1
+            return job
+
+        test_method = getattr(test, "test_log_wrapper" if use_wrapper else "test_cached")
+        job = Job(key, "test", f"{build_job.name}:{test.name}", lambda: test_method(tests, self.ctx, shape))
+        job.add_dependency(build_job)
+        self.jobs[key] = job
+        return job
+
+    def add_task(self, kind: str, name: str, action: Callable[[], Awaitable]) -> Job:
+        """Adds a job without dependencies"""
+        job = Job(None, kind, name, action)
+        job.key = ("task", id(job))
+        self.jobs[job.key] = job
+        return job
+
+    def _prioritize(self, jobs: list[Job]) -> None:
+        # Iterative, as the trees of assemblies can be deep
+        for root in jobs:
+            stack = [root]
+            while stack:
+                job = stack[-1]
+                if job.priority is not None:
+                    stack.pop()
+                    continue
+                pending = [dependent for dependent in job.dependents if dependent.priority is None]
+                if pending:
+                    stack.extend(pending)
+                    continue
+                stack.pop()
+                job.priority = job.cost + max((dependent.priority for dependent in job.dependents), default=0.0)
+
+    async def _run_job(self, job: Job) -> None:
+        try:
+            job.result = await job.action()
+        except Exception as e:
+            job.error = e
+            pc_logging.exception(f"Failed to {job.kind} {job.name}: {e}")
+        finally:
+            job.done = True
+
+    async def run(self) -> None:
+        """Runs the jobs added so far"""
+        jobs = [job for job in self.jobs.values() if not job.done]
+        if not jobs:
+            return
+        self._prioritize(jobs)
+
+        start = time.perf_counter()
+        waiting = {job: sum(1 for d in job.dependencies if not d.done) for job in jobs}
+        order = itertools.count()
+        ready = []
+
+        def make_ready(job: Job) -> None:
+            heapq.heappush(ready, (-job.priority, next(order), job))
+
+        for job in jobs:
+            if waiting[job] == 0:
+                make_ready(job)
+
+        running: dict[asyncio.Task, Job] = {}
+        memory = 0
+        while ready or running:
+            while ready and len(running) < self.jobs_max:
+                job = ready[0][2]
+                if running and self.max_memory and memory + job.memory > self.max_memory:
+                    # Wait for some memory to be released
+                    break
+                heapq.heappop(ready)
+                memory += job.memory
+                self.stats_peak_memory = max(self.stats_peak_memory, memory)
+                running[asyncio.create_task(self._run_job(job))] = job
+
+            done, _ = await asyncio.wait(running.keys(), return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                job = running.pop(task)
+                memory -= job.memory
+                for dependent in job.dependents:
+                    if dependent in waiting:
+                        waiting[dependent] -= 1
+                        if waiting[dependent] == 0:
+                            make_ready(dependent)
+
+        pc_logging.debug(
+            "Ran %d jobs in %.2fs (%d deduplicated, up to %d jobs and %d MB at a time)"
+            % (
+                len(jobs),
+                time.perf_counter() - start,
+                self.stats_deduplicated,
+                self.jobs_max,
+                self.stats_peak_memory // (1024 * 1024),
+            )
+        )
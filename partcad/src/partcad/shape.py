@@ -10,17 +10,18 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 import asyncio
-import base64
 import copy
 import os
-import pickle
 import sys
 import tempfile
 import threading
-from typing import Optional
+from typing import Callable, Optional
 
 from .cache_hash import CacheHash
+from .cache_memory import estimate_size
 from .render import *
+from .runtime_python_pool import WorkerError
+from .scheduler import BuildScheduler
 from .shape_config import ShapeConfiguration
 from .utils import total_size
 from . import logging as pc_logging
@@ -30,9 +31,7 @@ from . import wrapper
 if TYPE_CHECKING:
     from partcad.context import Context
     from partcad.project import Project
-
-sys.path.append(os.path.join(os.path.dirname(__file__), "wrappers"))
-from ocp_serialize import register as register_ocp_helper
+    from partcad.render_server import RenderServer
 
 from . import telemetry
 
@@ -50,8 +49,37 @@ EXTENSION_MAPPING = {
     "scad": "scad",
 }
 
+# Packages needed by the wrapper rendering each format
+WRAPPER_FORMATS = {
+    "svg": [
+        "cadquery-ocp==7.7.2",
+        "ocpsvg==0.3.4",
+        "build123d==0.8.0",
+    ],
+    "png": [
+        "cadquery-ocp==7.7.2",
+        "ocpsvg==0.3.4",
+        "build123d==0.8.0",
+        "reportlab",
+        "rlpycairo==0.3.0",
+    ],
+    "brep": ["cadquery-ocp==7.7.2"],
+    "step": ["cadquery-ocp==7.7.2"],
+    "stl": ["cadquery-ocp==7.7.2"],
+    "obj": ["cadquery-ocp==7.7.2", "numpy==2.2.1"],
+    "3mf": ["cadquery-ocp==7.7.2", "cadquery==2.5.2"],
+    "gltf": ["cadquery-ocp==7.7.2", "build123d==0.8.0"],
+    "iges": ["cadquery-ocp==7.7.2"],
+    "threejs": ["cadquery-ocp==7.7.2", "numpy==2.2.1"],
+}
+
 previously_displayed_shape = None
 
+REBUILD_STATUS_REUSED = "reused"
+REBUILD_STATUS_REBUILT = "rebuilt"
+# Not needed as the parent assembly was reused
+REBUILD_STATUS_NOT_LOADED = "not loaded"
+
 
 @telemetry.instrument(exclude=["locked"])
 class Shape(ShapeConfiguration):
@@ -74,6 +102,8 @@ class Shape(ShapeConfiguration):
         self.components = []
         self.compound = None
         self.with_ports = None
+        # The shapes this one is made of, as (kind, spec) pairs, built before it by the scheduler
+        self.build_dependencies: list[tuple[str, str]] = []
 
         # Leave the svg path empty to get it created on demand
         self.svg_lock = asyncio.Lock()
@@ -94,6 +124,8 @@ class Shape(ShapeConfiguration):
 
         # Memory cache
         self._wrapped = None
+        # Whether the shape was loaded from a cache or generated, for troubleshooting
+        self.rebuild_status = None
 
         # Filesystem cache
         self.hash = CacheHash(f"{self.project_name}:{self.name}", cache=self.cacheable)
@@ -138,23 +170,52 @@ class Shape(ShapeConfiguration):
 
         return self.components
 
+    async def get_dependencies(self, ctx) -> list[Shape]:
+        """Returns the shapes that need to be built before this one"""
+        dependencies = []
+        for kind, spec in self.build_dependencies:
+            if kind == "sketch":
+                dependency = ctx._get_sketch(spec)
+            else:
+                dependency = ctx._get_part(spec)
+            if dependency is not None:
+                dependencies.append(dependency)
+        return dependencies
+
+    async def get_cache_hash(self, ctx) -> CacheHash:
+        """Returns the key of the shape in the filesystem cache"""
+        if ctx:
+            self.hash.set_user_config(ctx.user_config)
+        return self.hash
+
+    def explain_rebuild(self, depth: int = 0) -> list[tuple[int, str, str]]:
+        """Returns how the shape was obtained: (depth, name, status)"""
+        return [(depth, self.name, self.rebuild_status or REBUILD_STATUS_NOT_LOADED)]
+
     async def get_wrapped(self, ctx):
         with self.lock:
             async with self.get_async_lock():
-                if self._wrapped is not None:
-                    return self._wrapped
+                # Read once as the memory cache may drop it from another thread
+                wrapped = self._wrapped
+                if wrapped is not None:
+                    if ctx:
+                        ctx.cache_memory.touch(self)
+                    if self.rebuild_status is None:
+                        self.rebuild_status = REBUILD_STATUS_REUSED
+                    return wrapped
 
                 is_cacheable = self.get_cacheable() and ctx
                 if is_cacheable:
-                    cache_hash = self.hash
+                    cache_hash = await self.get_cache_hash(ctx)
                     if cache_hash:
                         keys_to_read = [self.kind, "cmps"]
                         cached, to_cache_in_memory = await ctx.cache_shapes.read_async(cache_hash, keys_to_read)
-                        if to_cache_in_memory.get(self.kind, False):
-                            self._wrapped = cached[self.kind]
+                        if to_cache_in_memory.get(self.kind, 0):
+                            self.keep_wrapped(ctx, cached[self.kind], to_cache_in_memory[self.kind])
                         if to_cache_in_memory.get("cmps", False):
                             self.components = cached["cmps"]
                         if self.kind in cached and cached[self.kind] is not None:
+                            self.rebuild_status = REBUILD_STATUS_REUSED
                             return cached[self.kind]
                     else:
                         if self.cache:
@@ -163,6 +224,7 @@ class Shape(ShapeConfiguration):
                     cache_hash = None
 
                 shape = await self.get_shape(ctx)
+                self.rebuild_status = REBUILD_STATUS_REBUILT
 
                 # TODO(clairbee): apply 'offset' and 'scale' during instantiation and
                 #                 apply to both 'wrapped' and 'components'
@@ -187,16 +249,29 @@ class Shape(ShapeConfiguration):
                         if self.components and len(self.components) > 0:
                             to_cache["cmps"] = self.components
                         to_cache_in_memory = await ctx.cache_shapes.write_async(cache_hash, to_cache)
-                        do_cache_in_memory = to_cache_in_memory.get(self.kind, False)
+                        size = to_cache_in_memory.get(self.kind, 0)
+                        if size:
+                            self.keep_wrapped(ctx, shape, size)
                     else:
-                        do_cache_in_memory = True
-                    if do_cache_in_memory:
-                        self._wrapped = shape
+                        self.keep_wrapped(ctx, shape)
                 else:
                     # Let the file cache tell us if we need to cache this in memory
-                    self._wrapped = shape
+                    self.keep_wrapped(ctx, shape)
                 return shape
 
+    def keep_wrapped(self, ctx, shape, size: int = None) -> None:
+        """Keeps the shape in memory if it fits in the context's memory cache"""
+        if ctx:
+            if size is None:
+                size = estimate_size(shape)
+            if not ctx.cache_memory.put(self, size):
+                return
+        self._wrapped = shape
+
+    def drop_wrapped(self) -> None:
+        """Frees the memory, the shape is reloaded or regenerated on the next access"""
+        self._wrapped = None
+
     async def get_cadquery(self, ctx=None):
         import cadquery as cq
 
@@ -341,10 +416,8 @@ class Shape(ShapeConfiguration):
             "line_weight": line_weight,
             "viewport_origin": viewport_origin,
         }
-        register_ocp_helper()
-        with telemetry.start_as_current_span("*Shape.render_svg_somewhere.{pickle.dumps}"):
-            picklestring = pickle.dumps(request)
-            request_serialized = base64.b64encode(picklestring).decode()
+        with telemetry.start_as_current_span("*Shape.render_svg_somewhere.{wrapper.serialize_request}"):
+            request_serialized = wrapper.serialize_request(request)
 
         # We don't care about customer preferences much here
         # as this is expected to be hermetic.
@@ -362,8 +435,7 @@ class Shape(ShapeConfiguration):
         )
         sys.stderr.write(errors)
 
-        response = base64.b64decode(response_serialized)
-        result = pickle.loads(response)
+        result = wrapper.deserialize_response(response_serialized)
         if not result["success"]:
             pc_logging.error("RenderSVG failed: %s:%s: %s" % (self.project_name, self.name, result["exception"]))
         if "exception" in result and not result["exception"] is None:
@@ -437,6 +509,76 @@ class Shape(ShapeConfiguration):
 
         return opts, filepath
 
+    def _get_mesh_options(self, format_name: str, render_opts: dict, kwargs: dict) -> dict:
+        options = {
+            "tolerance": kwargs.get("tolerance", render_opts.get("tolerance", 0.1)),
+            "angularTolerance": kwargs.get("angularTolerance", render_opts.get("angularTolerance", 0.1)),
+        }
+        if format_name == "stl":
+            options["ascii"] = kwargs.get("ascii", render_opts.get("ascii", False))
+        elif format_name == "gltf":
+            options["binary"] = kwargs.get("binary", render_opts.get("binary", False))
+        elif format_name == "threejs":
+            options["bufferGeometry"] = kwargs.get("bufferGeometry", render_opts.get("bufferGeometry", False))
+        return options
+
+    def _get_render_options(self, format_name: str, render_opts: dict, kwargs: dict) -> dict:
+        options = {}
+        if format_name in ["svg", "png"]:
+            options["viewport_origin"] = kwargs.get("viewport_origin", [100, -100, 100])
+            options["line_weight"] = kwargs.get("line_weight", 1.0)
+            if format_name == "png":
+                options["width"] = kwargs.get("width", 512)
+                options["height"] = kwargs.get("height", 512)
+
+        elif format_name in MESH_FORMATS:
+            options.update(self._get_mesh_options(format_name, render_opts, kwargs))
+
+        elif format_name in ["step", "iges"]:
+            options["write_pcurves"] = kwargs.get("write_pcurves", render_opts.get("write_pcurves", True))
+            options["precision_mode"] = kwargs.get("precision_mode", render_opts.get("precision_mode", 0))
+        return options
+
+    async def _get_render_cache_hash(self, ctx: Context, format_name: str, options: dict) -> Optional[CacheHash]:
+        """Returns the key of the rendered file in the render cache, None if it can't be cached"""
+        if not self.get_cacheable():
+            return None
+        cache_hash = await self.get_cache_hash(ctx)
+        shape_key = cache_hash.get() if cache_hash else None
+        if not shape_key:
+            return None
+        return ctx.cache_renders.get_hash(f"{self.project_name}:{self.name}", shape_key, format_name, options)
+
+    async def _get_render_job(
+        self, ctx: Context, format_name: str, path: Optional[str], options: dict, project: Optional[Project]
+    ) -> tuple[str, dict, Optional[CacheHash]]:
+        """Returns the output path, the wrapper options and the render cache key of the job"""
+        file_extension = EXTENSION_MAPPING.get(format_name, format_name)
+        render_opts, final_filepath = self.render_getopts(format_name, f".{file_extension}", project, path)
+        options = self._get_render_options(format_name, render_opts, options)
+        return os.path.abspath(final_filepath), options, await self._get_render_cache_hash(ctx, format_name, options)
+
+    async def restore_renders_async(
+        self, ctx: Context, jobs: list[tuple[str, Optional[str], dict]], project: Optional[Project] = None
+    ) -> list[Optional[str]]:
+        """
+        Reuse the files rendered earlier for the same shape, format and options.
+        Args:
+            ctx: Execution context.
+            jobs: (format, path, options) tuples, the render config of the project is used if path is None.
+            project: Optional project object.
+        Returns the path of the file restored for each job, None if it has to be rendered.
+        """
+        restored = []
+        for format, path, options in jobs:
+            final_filepath, _options, cache_hash = await self._get_render_job(ctx, format, path, options, project)
+            if cache_hash is not None and ctx.cache_renders.restore(cache_hash, format, final_filepath):
+                pc_logging.debug(f"Reused the render of {self.project_name}:{self.name}: {final_filepath}")
+                restored.append(final_filepath)
+            else:
+                restored.append(None)
+        return restored
+
     async def render_async(
         self, ctx: Context, format_name: str, project: Optional[Project] = None, filepath=None, **kwargs
     ) -> None:
@@ -449,35 +591,26 @@ class Shape(ShapeConfiguration):
             filepath: Target file path for output.
             kwargs: Additional options (width, height, etc.).
         """
-        WRAPPER_FORMATS = {
-            "svg": [
-                "cadquery-ocp==7.7.2",
-                "ocpsvg==0.3.4",
-                "build123d==0.8.0",
-            ],
-            "png": [
-                "cadquery-ocp==7.7.2",
-                "ocpsvg==0.3.4",
-                "build123d==0.8.0",
-                "svglib==1.5.1",
-                "reportlab",
-                "rlpycairo==0.3.0",
-            ],
-            "brep": ["cadquery-ocp==7.7.2"],
-            "step": ["cadquery-ocp==7.7.2"],
-            "stl": ["cadquery-ocp==7.7.2"],
-            "obj": ["cadquery-ocp==7.7.2"],
-            "3mf": ["cadquery-ocp==7.7.2", "cadquery==2.5.2"],
-            "gltf": ["cadquery-ocp==7.7.2"],
-            "iges": ["cadquery-ocp==7.7.2"],
-            "threejs": ["cadquery-ocp==7.7.2"],
-        }
 
         with pc_logging.Action(f"Render{format_name.upper()}", self.project_name, self.name):
 
             if filepath and os.path.isdir(filepath):
                 self.config_obj.setdefault("render", {})["output_dir"] = filepath
 
+            formats_to_render = [format_name] if format_name else list(WRAPPER_FORMATS.keys())
+
+            # The files rendered earlier are reused without building the shape
+            render_jobs = []
+            for format in formats_to_render:
+                final_filepath, options, cache_hash = await self._get_render_job(ctx, format, filepath, kwargs, project)
+                if cache_hash is not None and ctx.cache_renders.restore(cache_hash, format, final_filepath):
+                    pc_logging.debug(f"Reused the render of {self.project_name}:{self.name}: {final_filepath}")
+                    continue
+                ctx.cache_renders.detach(final_filepath)
+                render_jobs.append((format, final_filepath, options, cache_hash))
+            if not render_jobs:
+                return
+
             if format_name == "gltf":
                 obj = await self.get_build123d(ctx)
             else:
@@ -490,43 +623,15 @@ class Shape(ShapeConfiguration):
             if project is not None:
                 project.ctx.ensure_dirs_for_file(filepath)
 
-            formats_to_render = [format_name] if format_name else list(WRAPPER_FORMATS.keys())
-
-            for format in formats_to_render:
-                file_extension = EXTENSION_MAPPING.get(format, format)
-                render_opts, final_filepath = self.render_getopts(format, f".{file_extension}", project, filepath)
-                final_filepath = os.path.abspath(final_filepath)
+            for format, final_filepath, options, cache_hash in render_jobs:
                 pc_logging.debug(f"Rendering: {self.project_name}:{self.name} for format '{format}'")
 
                 wrapper_path = wrapper.get(f"render_{format}.py")
 
                 request = {"wrapped": obj}
+                request.update(options)
 
-                if format in ["svg", "png"]:
-                    request["viewport_origin"] = kwargs.get("viewport_origin", [100, -100, 100])
-                    request["line_weight"] = kwargs.get("line_weight", 1.0)
-                    if format == "png":
-                        request["width"] = kwargs.get("width", 512)
-                        request["height"] = kwargs.get("height", 512)
-
-                elif format in ["3mf", "obj", "gltf", "stl", "threejs"]:
-                    request["tolerance"] = kwargs.get("tolerance", render_opts.get("tolerance", 0.1))
-                    request["angularTolerance"] = kwargs.get(
-                        "angularTolerance", render_opts.get("angularTolerance", 0.1)
-                    )
-                    if format == "stl":
-                        request["ascii"] = kwargs.get("ascii", render_opts.get("ascii", False))
-                    elif format == "gltf":
-                        request["binary"] = kwargs.get("binary", render_opts.get("binary", False))
-
-                elif format in ["step", "iges"]:
-                    request["write_pcurves"] = kwargs.get("write_pcurves", render_opts.get("write_pcurves", True))
-                    request["precision_mode"] = kwargs.get("precision_mode", render_opts.get("precision_mode", 0))
-
-                register_ocp_helper()
-
-                picklestring = pickle.dumps(request)
-                request_serialized = base64.b64encode(picklestring).decode()
+                request_serialized = wrapper.serialize_request(request)
 
                 runtime = ctx.get_python_runtime(version="3.11")
 
@@ -547,18 +652,14 @@ class Shape(ShapeConfiguration):
                 if errors:
                     pc_logging.error(f"Wrapper {format_name} stderr:\n{errors}")
 
-                response_lines = response_serialized.strip().splitlines()
-                if not response_lines:
+                if not response_serialized:
                     pc_logging.error(f"Empty response from wrapper: {wrapper_path}")
                     return
 
-                cleaned_response = response_lines[-1].strip()
-
                 # Handle response
                 result = {}
                 try:
-                    response_bytes = base64.b64decode(cleaned_response)
-                    result = pickle.loads(response_bytes)
+                    result = wrapper.deserialize_response(response_serialized)
                 except Exception as e:
                     pc_logging.error(f"Failed to deserialize response: {e}")
 
@@ -566,9 +667,177 @@ class Shape(ShapeConfiguration):
                     pc_logging.error(
                         f"Render {format_name.upper()} failed for {self.project_name}:{self.name}: {result.get('exception', 'Unknown error')}"
                     )
+                elif cache_hash is not None:
+                    ctx.cache_renders.store(cache_hash, format, final_filepath)
                 if "exception" in result and result["exception"]:
                     pc_logging.exception(f"Render {format_name.upper()} exception: {result['exception']}")
 
+    async def render_mesh_async(
+        self, ctx: Context, format_names: list[str], project: Optional[Project] = None, filepath=None, **kwargs
+    ) -> None:
+        """
+        Render shape into several mesh formats at once, tessellating it once per pair of tolerances.
+        Args:
+            ctx: Execution context.
+            format_names: Mesh formats (see MESH_FORMATS).
+            project: Optional project object.
+            filepath: Target folder for output, the render config of the project is used if not set.
+            kwargs: Additional options (tolerance, angularTolerance, etc.).
+        """
+        if len(format_names) == 1:
+            return await self.render_async(ctx, format_names[0], project, filepath, **kwargs)
+
+        with pc_logging.Action("RenderMesh", self.project_name, self.name, ",".join(format_names)):
+            outputs = []
+            cache_hashes = {}
+            for format in format_names:
+                file_extension = EXTENSION_MAPPING.get(format, format)
+                render_opts, final_filepath = self.render_getopts(format, f".{file_extension}", project)
+                if filepath is not None:
+                    final_filepath = os.path.join(filepath, f"{self.name}.{file_extension}")
+                final_filepath = os.path.abspath(final_filepath)
+                options = self._get_mesh_options(format, render_opts, kwargs)
+                cache_hash = await self._get_render_cache_hash(ctx, format, options)
+                if cache_hash is not None and ctx.cache_renders.restore(cache_hash, format, final_filepath):
+                    pc_logging.debug(f"Reused the render of {self.project_name}:{self.name}: {final_filepath}")
+                    continue
+                ctx.cache_renders.detach(final_filepath)
+                cache_hashes[format] = cache_hash
+                outputs.append({"format": format, "path": final_filepath, **options})
+            if not outputs:
+                return
+
+            obj = await self.get_wrapped(ctx)
+            if obj is None:
+                pc_logging.error(f"Cannot render '{self.name}': shape is empty")
+                return
+
+            request_serialized = wrapper.serialize_request({"wrapped": obj, "outputs": outputs})
+
+            runtime = ctx.get_python_runtime(version="3.11")
+            dependencies = set(dep for output in outputs for dep in WRAPPER_FORMATS[output["format"]])
+            await asyncio.gather(*(runtime.ensure_async(dep) for dep in sorted(dependencies)))
+
+            wrapper_path = wrapper.get("render_mesh.py")
+            with telemetry.start_as_current_span("*Shape.render_mesh_async.{runtime.run_async}"):
+                response_serialized, errors = await runtime.run_async(
+                    [
+                        wrapper_path,
+                        outputs[0]["path"],
+                    ],
+                    request_serialized,
+                )
+            if errors:
+                pc_logging.error(f"Wrapper mesh stderr:\n{errors}")
+
+            if not response_serialized:
+                pc_logging.error(f"Empty response from wrapper: {wrapper_path}")
+                return
+
+            try:
+                result = wrapper.deserialize_response(response_serialized)
+            except Exception as e:
+                pc_logging.error(f"Failed to deserialize response: {e}")
+                return
+
+            for output in outputs:
+                format = output["format"]
+                format_result = result.get("results", {}).get(format, {})
+                if not format_result.get("success", False):
+                    pc_logging.error(
+                        f"Render {format.upper()} failed for {self.project_name}:{self.name}: {format_result.get('exception', 'Unknown error')}"
+                    )
+                elif cache_hashes[format] is not None:
+                    ctx.cache_renders.store(cache_hashes[format], format, output["path"])
+
+    async def render_batch_async(
+        self,
+        ctx: Context,
+        server: RenderServer,
+        jobs: list[tuple[str, Optional[str], dict]],
+        project: Optional[Project] = None,
+        on_result: Callable[[int, str, dict], None] = None,
+    ) -> None:
+        """
+        Render shape in several formats in a render server, the mesh formats out of one tessellation
+        and the SVG and PNG images out of one projection.
+        Args:
+            ctx: Execution context.
+            server: Render server started for all the formats of the jobs.
+            jobs: (format, path, options) tuples, the render config of the project is used if path is None.
+            project: Optional project object.
+            on_result: Called with (index of the job, path, result) as soon as each job is rendered.
+        """
+        obj = await self.get_wrapped(ctx)
+
+        # Each item is ([(index of the job, output path)], format, path, request)
+        submissions = []
+        # The mesh formats are grouped as long as the formats are different
+        meshes = []
+        # The render cache keys of the jobs
+        cache_hashes = []
+        for index, (format, path, options) in enumerate(jobs):
+            final_filepath, options, cache_hash = await self._get_render_job(ctx, format, path, options, project)
+            cache_hashes.append(cache_hash)
+            ctx.cache_renders.detach(final_filepath)
+            if format not in MESH_FORMATS:
+                submissions.append(([(index, final_filepath)], format, final_filepath, {"wrapped": obj, **options}))
+                continue
+            mesh = next((mesh for mesh in meshes if format not in mesh), None)
+            if mesh is None:
+                mesh = {}
+                meshes.append(mesh)
+            mesh[format] = (index, {"format": format, "path": final_filepath, **options})
+        for mesh in meshes:
+            outputs = [output for _index, output in mesh.values()]
+            submissions.append(
+                (
+                    [(index, output["path"]) for index, output in mesh.values()],
+                    "mesh",
+                    outputs[0]["path"],
+                    {"wrapped": obj, "outputs": outputs},
+                )
+            )
+        # The SVG and PNG images are drawn out of the same projection of the shape
+        svg = next((submission for submission in submissions if submission[1] == "svg"), None)
+        png = next((submission for submission in submissions if submission[1] == "png"), None)
+        if (
+            svg is not None
+            and png is not None
+            and all(svg[3][key] == png[3][key] for key in ["viewport_origin", "line_weight"])
+        ):
+            submissions.remove(svg)
+            png[0].extend(svg[0])
+            png[3]["svg_path"] = svg[2]
+
+        async def submit(targets, format_name, path, request):
+            with pc_logging.Action(f"Render{format_name.upper()}", self.project_name, self.name):
+                if obj is None:
+                    response = {"success": False, "exception": "The shape is empty"}
+                else:
+                    try:
+                        response = await server.render(format_name, path, request)
+                    except WorkerError as e:
+                        response = {"success": False, "exception": str(e)}
+
+            for index, target_path in targets:
+                format = jobs[index][0]
+                result = response
+                if "results" in response:
+                    result = response["results"].get(format, {"success": False, "exception": "No result"})
+                if not result.get("success", False):
+                    pc_logging.error(
+                        f"Render {format.upper()} failed for {self.project_name}:{self.name}: {result.get('exception', 'Unknown error')}"
+                    )
+                else:
+                    pc_logging.debug(f"Rendered {self.project_name}:{self.name} to {target_path}")
+                    if cache_hashes[index] is not None:
+                        ctx.cache_renders.store(cache_hashes[index], format, target_path)
+                if on_result is not None:
+                    on_result(index, target_path, result)
+
+        await asyncio.gather(*(submit(*submission) for submission in submissions))
+
     def render(
         self,
         ctx: Context,
@@ -586,10 +855,10 @@ class Shape(ShapeConfiguration):
         if tests is None:
             tests = ctx.get_all_tests()
 
-        test_method = "test_log_wrapper" if use_wrapper else "test_cached"
-        tasks = [asyncio.create_task(getattr(t, test_method)(tests, ctx, self)) for t in tests]
-
-        return all(await asyncio.gather(*tasks))
+        scheduler = BuildScheduler(ctx)
+        jobs = [await scheduler.add_test(self, t, tests, use_wrapper) for t in tests]
+        await scheduler.run()
+        return all(job.error is None and job.result for job in jobs)
 
     async def test_async(self, ctx, tests=None) -> bool:
         return await self._run_test_async(ctx, tests, use_wrapper=False)
@@ -56,6 +56,7 @@ class SketchFactoryAlias(SketchFactory):
                 else:
                     self.source_project_name = source_project.name
             self.source = self.source_project_name + ":" + self.source_sketch_name
+            self.sketch.build_dependencies.append(("sketch", self.source))
 
             if self.source_project_name == target_project.name:
                 self.sketch.desc = "Alias to %s" % self.source_sketch_name
@@ -7,10 +7,7 @@
 # Licensed under Apache License, Version 2.0.
 #
 
-import base64
 import os
-import pickle
-import sys
 
 from OCP.gp import gp_Ax1
 from OCP.TopoDS import (
@@ -26,9 +23,6 @@ from .sketch_factory_python import SketchFactoryPython
 from . import wrapper
 from . import logging as pc_logging
 
-sys.path.append(os.path.join(os.path.dirname(__file__), "wrappers"))
-from ocp_serialize import register as register_ocp_helper
-
 from . import telemetry
 
 
@@ -85,9 +79,7 @@ class SketchFactoryBuild123d(SketchFactoryPython):
             request["patch"] = patch
 
             # Serialize the request
-            register_ocp_helper()
-            picklestring = pickle.dumps(request)
-            request_serialized = base64.b64encode(picklestring).decode()
+            request_serialized = wrapper.serialize_request(request)
 
             await self.runtime.ensure_async(
                 "ocp-tessellate==3.0.9",
@@ -132,9 +124,7 @@ class SketchFactoryBuild123d(SketchFactoryPython):
 
             try:
                 # pc_logging.error("Response: %s" % response_serialized)
-                response = base64.b64decode(response_serialized)
-                register_ocp_helper()
-                result = pickle.loads(response)
+                result = wrapper.deserialize_response(response_serialized)
             except Exception as e:
                 sketch.error("Exception while deserializing %s: %s" % (sketch.name, e))
                 return None
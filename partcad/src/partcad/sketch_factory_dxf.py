@@ -7,18 +7,13 @@
 # Licensed under Apache License, Version 2.0.
 #
 
-import base64
 import os
-import pickle
 import sys
 
 from . import wrapper
 from . import logging as pc_logging
 from .sketch_factory_python import SketchFactoryPython
 
-sys.path.append(os.path.join(os.path.dirname(__file__), "wrappers"))
-from ocp_serialize import register as register_ocp_helper
-
 from . import telemetry
 
 
@@ -77,9 +72,7 @@ class SketchFactoryDxf(SketchFactoryPython):
                     "include": self.include,
                     "exclude": self.exclude,
                 }
-                register_ocp_helper()
-                picklestring = pickle.dumps(request)
-                request_serialized = base64.b64encode(picklestring).decode()
+                request_serialized = wrapper.serialize_request(request)
 
                 await self.runtime.ensure_async("cadquery-ocp==7.7.2")
                 await self.runtime.ensure_async("cadquery==2.5.2")
@@ -93,9 +86,7 @@ class SketchFactoryDxf(SketchFactoryPython):
                 )
                 sys.stderr.write(errors)
 
-                response = base64.b64decode(response_serialized)
-                register_ocp_helper()
-                result = pickle.loads(response)
+                result = wrapper.deserialize_response(response_serialized)
 
                 if not result["success"]:
                     pc_logging.error(result["exception"])
@@ -0,0 +1,132 @@
+#
+# PartCAD, 2025
+#
+# Licensed under Apache License, Version 2.0.
+#
+
+# Pool of worker processes for CPU-bound geometry code.
+#
+# OCP holds the GIL while it computes, so the geometry produced by the factories
+# themselves (OBJ meshes, extrusions, sweeps, STEP assembly import) does not
+# scale across the threads of 'threadpool_manager'. Such code can be run in
+# worker processes instead. The arguments and the results are serialized the
+# same way as the filesystem cache entries, so shapes are transferred as BREP.
+#
+# The methods passed to the pool must be defined at the module level.
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import asyncio
+import multiprocessing
+import os
+import pickle
+import threading
+
+from . import cache_serializer
+from . import logging as pc_logging
+from .sync_threads import threadpool_manager
+from .user_config import user_config
+
+ARGS_SERIALIZERS = ["pickle"]
+RESULT_SERIALIZERS = ["brep", "pickle"]
+# Raised when the arguments can't be pickled, e.g. locks or local functions
+PICKLING_ERRORS = (pickle.PicklingError, TypeError, AttributeError)
+
+
+def _init_worker() -> None:
+    # Load OCP before the first job arrives
+    cache_serializer.get_serializer("pickle")
+
+
+def _run_in_worker(method, args: bytes) -> bytes:
+    result = method(*cache_serializer.loads(args))
+    return cache_serializer.dumps(result, RESULT_SERIALIZERS)
+
+
+class ProcessPoolManager:
+    def __init__(self, processes_max: int = None):
+        # Resolved on first use, as the user config may change until then
+        self.processes_max = processes_max
+        self.executor = None
+        self.lock = threading.Lock()
+
+    def get_processes_max(self) -> int:
+        if self.processes_max is not None:
+            return self.processes_max
+        if user_config.process_pool_size is not None:
+            return user_config.process_pool_size
+        # Leave one core for the main process
+        return max((os.cpu_count() or 1) - 1, 1)
+
+    def is_enabled(self) -> bool:
+        return self.get_processes_max() > 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self.lock:
+            if self.executor is None:
+                # Forking a process running many threads is not safe
+                self.executor = ProcessPoolExecutor(
+                    self.get_processes_max(),
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                )
+            return self.executor
+
+    def _discard_executor(self, executor: ProcessPoolExecutor) -> None:
+        with self.lock:
+            if self.executor is executor:
+                self.executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def run(self, method, *args):
+        """Run in a worker process, or in the constrained thread pool if the process pool is disabled or broken"""
+        if not self.is_enabled():
+            return await threadpool_manager.run(method, *args)
+
+        try:
+            data = cache_serializer.dumps(args, ARGS_SERIALIZERS)
+        except PICKLING_ERRORS as e:
+            pc_logging.warning(f"Failed to pass the arguments of {method.__name__} to a worker process: {e}")
+            return await threadpool_manager.run(method, *args)
+
+        executor = self._get_executor()
+        try:
+            future = executor.submit(_run_in_worker, method, data)
+            result = await asyncio.wrap_future(future)
+        except BrokenProcessPool as e:
+            pc_logging.warning(f"Failed to run {method.__name__} in a worker process, running it in a thread: {e}")
+            self._discard_executor(executor)
+            return await threadpool_manager.run(method, *args)
+        return cache_serializer.loads(result)
+
+    def map(self, method, args_list: list[tuple]) -> list:
+        """Run the method for each set of arguments in worker processes.
+
+        The current thread is used if the pool is disabled or broken.
+        """
+        if not self.is_enabled() or len(args_list) < 2:
+            return [method(*args) for args in args_list]
+
+        try:
+            data = [cache_serializer.dumps(args, ARGS_SERIALIZERS) for args in args_list]
+        except PICKLING_ERRORS as e:
+            pc_logging.warning(f"Failed to pass the arguments of {method.__name__} to worker processes: {e}")
+            return [method(*args) for args in args_list]
+
+        executor = self._get_executor()
+        try:
+            results = list(executor.map(_run_in_worker, [method] * len(data), data))
+        except BrokenProcessPool as e:
+            pc_logging.warning(f"Failed to run {method.__name__} in worker processes, running it here: {e}")
+            self._discard_executor(executor)
+            return [method(*args) for args in args_list]
+        return [cache_serializer.loads(result) for result in results]
+
+    def shutdown(self) -> None:
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+process_pool_manager = ProcessPoolManager()
@@ -11,10 +11,9 @@ from opentelemetry.trace import Tracer
 import os
 
 from . import telemetry_none
-from . import telemetry_sentry
 
 partcad_version = None
-tracer: Tracer | None  # To be initialized in telemetry_init()
+tracer: Tracer | None = None  # To be initialized in telemetry_init()
 tracer_onced = False
 
 
@@ -36,6 +35,9 @@ def once():
 
     if not os.getenv("PYTEST_VERSION"):
         # TODO(clairbee): add suport for alternate telemetry backends
+        # Imported here as sentry_sdk takes a while to load
+        from . import telemetry_sentry
+
         tracer = telemetry_sentry.init_sentry(partcad_version)
     else:
         # Do not collect telemetry data for pytest as it's mostly short meaningless transactions
@@ -70,16 +72,15 @@ def set_context(ctx):
 
 
 def instrument_span(name, category: str = ""):
-    once()
-
-    global tracer
-
     def decorator(func, attr_getter):
         def wrapper(*args, **kwargs):
             parent = trace.get_current_span()
             tag = name if not category else f"{category}.{name}"
             if getattr(parent, "tag", "") == tag:
                 return func(*args, **kwargs)
+            # Initialized on the first call rather than when the instrumented modules are imported
+            if not tracer_onced:
+                once()
             with tracer.start_as_current_span(tag) as span:
                 for k, v in attr_getter(*args, **kwargs).items():
                     span.set_attribute(k, v)
@@ -102,8 +103,6 @@ def instrument_span(name, category: str = ""):
 
 
 def instrument_span_async(name, category: str = ""):
-    once()
-
     def decorator(func, attr_getter):
         async def wrapper(*args, **kwargs):
             parent = trace.get_current_span()
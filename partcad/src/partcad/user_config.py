@@ -304,9 +304,16 @@ class UserConfig(vyper.Vyper):
         self.set_default("cacheFiles", True)
         self.set_default("cacheFilesMaxEntrySize", 10 * 1024 * 1024)
         self.set_default("cacheFilesMinEntrySize", 100)
+        self.set_default("cacheMemoryMax", 2 * 1024 * 1024 * 1024)
         self.set_default("cacheMemoryMaxEntrySize", 100 * 1024 * 1024)
         self.set_default("cacheMemoryDoubleCacheMaxEntrySize", 1 * 1024 * 1024)
         self.set_default("cacheDependenciesIgnore", False)
+        self.set_default("cacheDependenciesParanoid", False)
+        self.set_default("cacheHashAlgorithm", "md5")
+        self.set_default("cacheFilesSerialization", "brep")
+        self.set_default("cacheFilesCompression", "none")
+        self.set_default("cacheFilesMaxSize", 5 * 1024 * 1024 * 1024)
+        self.set_default("cacheFilesEvictionPolicy", "lru")
 
         if shutil.which("conda") is not None or importlib.util.find_spec("conda") is not None:
             self.set_default("pythonSandbox", "conda")
@@ -315,8 +322,15 @@ class UserConfig(vyper.Vyper):
 
         self.set_default("internalStateDir", UserConfig.get_config_dir())
         self.set_default("forceUpdate", False)
+        self.set_default("lazyLoading", True)
 
         self.set_default("useDockerPython", False)
+
+        self.set_default("pythonWorkerPool", False)
+        self.set_default("pythonWorkerPoolSize", 2)
+        self.set_default("pythonWorkerMaxJobs", 100)
+        self.set_default("pythonWorkerMaxRss", 2 * 1024 * 1024 * 1024)
+        self.set_default("renderBatch", True)
         self.set_default("useDockerKicad", True)
 
         self.set_env_prefix("pc")
@@ -330,6 +344,34 @@ class UserConfig(vyper.Vyper):
         if self.is_set("threadsMax"):
             self.threads_max = self.get_int("threadsMax")
 
+        # option: processPoolSize
+        # description: the number of worker processes running CPU-bound geometry code
+        #   (OBJ import, extrusions, sweeps, STEP assembly import)
+        # values: >=0, 0 means running it in threads
+        # default: <cpu threads count - 1>
+        self.bind_env("processPoolSize", "PC_PROCESS_POOL_SIZE")
+        self.process_pool_size = None
+        if self.is_set("processPoolSize"):
+            self.process_pool_size = self.get_int("processPoolSize")
+
+        # option: jobs
+        # description: the maximum number of shapes to build, render or test at the same time
+        # values: >0
+        # default: threadsMax if set, <cpu threads count> otherwise
+        self.bind_env("jobs", "PC_JOBS")
+        self.jobs = None
+        if self.is_set("jobs"):
+            self.jobs = self.get_int("jobs")
+
+        # option: maxMemory
+        # description: the estimated memory in bytes that the shapes built, rendered or tested at the same time may use
+        # values: >=0, 0 means no limit
+        # default: half of the physical memory
+        self.bind_env("maxMemory", "PC_MAX_MEMORY")
+        self.max_memory = None
+        if self.is_set("maxMemory"):
+            self.max_memory = self.get_int("maxMemory")
+
         # option: cacheFiles
         # description: enable caching of intermediate results to the filesystem
         # values: [True | False]
@@ -351,6 +393,28 @@ class UserConfig(vyper.Vyper):
         self.bind_env("cacheFilesMinEntrySize", "PC_CACHE_FILES_MIN_ENTRY_SIZE")
         self.cache_min_entry_size = self.get_int("cacheFilesMinEntrySize")
 
+        # option: cacheFilesMaxSize
+        # description: the total size of the filesystem cache in bytes, least valuable entries are evicted above it
+        # values: >=0, 0 means no limit
+        # default: 5*1024*1024*1024 (5GB)
+        self.bind_env("cacheFilesMaxSize", "PC_CACHE_FILES_MAX_SIZE")
+        self.cache_max_size = self.get_int("cacheFilesMaxSize")
+
+        # option: cacheFilesEvictionPolicy
+        # description: which filesystem cache entries to evict first: least recently used or least frequently used
+        # values: [lru | lfu]
+        # default: lru
+        self.bind_env("cacheFilesEvictionPolicy", "PC_CACHE_FILES_EVICTION_POLICY")
+        self.cache_eviction_policy = self.get_string("cacheFilesEvictionPolicy")
+
+        # option: cacheMemoryMax
+        # description: the total memory used by shapes of a context in bytes,
+        #   least recently used shapes are freed above it
+        # values: >=0, 0 means no limit
+        # default: 2*1024*1024*1024 (2GB)
+        self.bind_env("cacheMemoryMax", "PC_CACHE_MEMORY_MAX")
+        self.cache_memory_max = self.get_int("cacheMemoryMax")
+
         # option: cacheMemoryMaxEntrySize
         # description: the maximum size of a single memory cache entry in bytes
         # values: >=0, 0 means no limit
@@ -372,6 +436,35 @@ class UserConfig(vyper.Vyper):
         self.bind_env("cacheDependenciesIgnore", "PC_CACHE_DEPENDENCIES_IGNORE")
         self.cache_dependencies_ignore = self.get_bool("cacheDependenciesIgnore")
 
+        # option: cacheDependenciesParanoid
+        # description: always read the files shapes depend on, instead of trusting their size and modification time
+        # values: [True | False]
+        # default: False
+        self.bind_env("cacheDependenciesParanoid", "PC_CACHE_DEPENDENCIES_PARANOID")
+        self.cache_dependencies_paranoid = self.get_bool("cacheDependenciesParanoid")
+
+        # option: cacheHashAlgorithm
+        # description: the algorithm used to produce cache keys,
+        #   blake3 and xxh3_128 require 'blake3' and 'xxhash' to be installed
+        # values: [md5 | sha1 | sha256 | blake2b | blake2s | blake3 | xxh3_128]
+        # default: md5
+        self.bind_env("cacheHashAlgorithm", "PC_CACHE_HASH_ALGORITHM")
+        self.cache_hash_algorithm = self.get_string("cacheHashAlgorithm")
+
+        # option: cacheFilesSerialization
+        # description: the preferred serialization of shapes in the filesystem cache (other objects are pickled)
+        # values: [brep | pickle]
+        # default: brep
+        self.bind_env("cacheFilesSerialization", "PC_CACHE_FILES_SERIALIZATION")
+        self.cache_serialization = self.get_string("cacheFilesSerialization")
+
+        # option: cacheFilesCompression
+        # description: the compression of filesystem cache entries (requires 'zstandard' or 'lz4' to be installed)
+        # values: [none | zstd | lz4]
+        # default: none
+        self.bind_env("cacheFilesCompression", "PC_CACHE_FILES_COMPRESSION")
+        self.cache_compression = self.get_string("cacheFilesCompression")
+
         # option: pythonSandbox
         # description: sandboxing environment for invoking python scripts
         # values: [none | pypy | conda]
@@ -379,6 +472,42 @@ class UserConfig(vyper.Vyper):
         self.bind_env("pythonSandbox", "PC_PYTHON_SANDBOX")
         self.python_sandbox = self.get_string("pythonSandbox")
 
+        # option: pythonWorkerPool
+        # description: keep pre-warmed sandbox interpreters running between jobs instead of starting one per job
+        # values: [True | False]
+        # default: False
+        self.bind_env("pythonWorkerPool", "PC_PYTHON_WORKER_POOL")
+        self.python_worker_pool = self.get_bool("pythonWorkerPool")
+
+        # option: pythonWorkerPoolSize
+        # description: the number of sandbox interpreters to keep running per sandbox environment
+        # values: >0
+        # default: 2
+        self.bind_env("pythonWorkerPoolSize", "PC_PYTHON_WORKER_POOL_SIZE")
+        self.python_worker_pool_size = self.get_int("pythonWorkerPoolSize")
+
+        # option: pythonWorkerMaxJobs
+        # description: the number of jobs after which a sandbox interpreter is restarted
+        # values: >=0, 0 means no limit
+        # default: 100
+        self.bind_env("pythonWorkerMaxJobs", "PC_PYTHON_WORKER_MAX_JOBS")
+        self.python_worker_max_jobs = self.get_int("pythonWorkerMaxJobs")
+
+        # option: pythonWorkerMaxRss
+        # description: the resident memory size in bytes above which a sandbox interpreter is restarted
+        # values: >=0, 0 means no limit
+        # default: 2*1024*1024*1024 (2GB)
+        self.bind_env("pythonWorkerMaxRss", "PC_PYTHON_WORKER_MAX_RSS")
+        self.python_worker_max_rss = self.get_int("pythonWorkerMaxRss")
+
+        # option: renderBatch
+        # description: render all the shapes of a package in one long-lived sandbox interpreter
+        #   instead of starting one per shape and format
+        # values: [True | False]
+        # default: True
+        self.bind_env("renderBatch", "PC_RENDER_BATCH")
+        self.render_batch = self.get_bool("renderBatch")
+
         # option: internalStateDir
         # description: folder to store all temporary files
         # values: <path>
@@ -393,6 +522,13 @@ class UserConfig(vyper.Vyper):
         self.bind_env("forceUpdate", "PC_FORCE_UPDATE")
         self.force_update = self.get_bool("forceUpdate")
 
+        # option: lazyLoading
+        # description: only instantiate the sketches, parts and assemblies of a package when they are requested
+        # values: [True | False]
+        # default: True
+        self.bind_env("lazyLoading", "PC_LAZY_LOADING")
+        self.lazy_loading = self.get_bool("lazyLoading")
+
         # option: googleApiKey
         # description: GOOGLE API key for AI services
         # values: <string>
@@ -465,6 +601,34 @@ class UserConfig(vyper.Vyper):
         # default: {}
         self.git_config = GitConfig(self)
 
+        # option: git.clone.shallow
+        # description: fetch only the imported revisions of git dependencies, without their history
+        # values: [True | False]
+        # default: True
+        self.set_default("git.clone.shallow", True)
+        self.bind_env("git.clone.shallow", "PC_GIT_CLONE_SHALLOW")
+
+        # option: git.clone.filter
+        # description: the partial clone filter to fetch git dependencies with, fetch all objects if empty
+        # values: string
+        # default: "blob:none"
+        self.set_default("git.clone.filter", "blob:none")
+        self.bind_env("git.clone.filter", "PC_GIT_CLONE_FILTER")
+
+        # option: tar.download.retry.max
+        # description: the number of times to resume the download of a tar dependency after a network failure
+        # values: <int>
+        # default: 3
+        self.set_default("tar.download.retry.max", 3)
+        self.bind_env("tar.download.retry.max", "PC_TAR_DOWNLOAD_RETRY_MAX")
+
+        # option: tar.download.retry.patience
+        # description: the number of seconds to wait before resuming the download of a tar dependency
+        # values: <float>
+        # default: 1.0
+        self.set_default("tar.download.retry.patience", 1.0)
+        self.bind_env("tar.download.retry.patience", "PC_TAR_DOWNLOAD_RETRY_PATIENCE")
+
         # option: Provider Key
         # description: Provider Key configuration
         # values: <dict>
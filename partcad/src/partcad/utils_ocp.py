@@ -50,9 +50,6 @@ def get_faces(shape):
 def tessellate(
     shape, tolerance: float = 0.1, angularTolerance: float = 0.1
 ) -> Tuple[List[Tuple[float, float, float]], List[Tuple[int, int, int]]]:
-    from OCP.TopAbs import TopAbs_Orientation
-    from OCP.TopLoc import TopLoc_Location
-    from OCP.BRep import BRep_Tool
     from OCP.BRepTools import BRepTools
 
     from OCP.BRepMesh import BRepMesh_IncrementalMesh
@@ -70,6 +67,15 @@ def tessellate(
             theAngDeflection=angularTolerance,
             isInParallel=True,
         )
+    return get_tessellation(shape)
+
+
+def get_tessellation(shape) -> Tuple[List[Tuple[float, float, float]], List[Tuple[int, int, int]]]:
+    """Returns the vertices and the triangles of the faces which are already triangulated"""
+    from OCP.TopAbs import TopAbs_Orientation
+    from OCP.TopLoc import TopLoc_Location
+    from OCP.BRep import BRep_Tool
+
     vertices: List[Tuple[float, float, float]] = []
     triangles: List[Tuple[int, int, int]] = []
     offset = 0
@@ -108,3 +114,207 @@ def tessellate(
         offset += poly.NbNodes()
 
     return vertices, triangles
+
+
+# The binary BREP of a face made of one triangle, split around its triangulation data
+_triangulation_template = None
+
+
+def _get_triangulation_template() -> Tuple[bytes, bytes, bytes]:
+    global _triangulation_template
+    if _triangulation_template is not None:
+        return _triangulation_template
+
+    from io import BytesIO
+    from OCP.BinTools import BinTools, BinTools_FormatVersion
+    from OCP.BRep import BRep_Builder
+    from OCP.gp import gp_Pnt
+    from OCP.Poly import Poly_Triangle, Poly_Triangulation
+    from OCP.TopoDS import TopoDS_Face
+
+    triangulation = Poly_Triangulation(3, 1, False)
+    for i, point in enumerate([(0.0, 0.0, 0.0), (1.0, 0.0, 0.0), (0.0, 1.0, 0.0)], 1):
+        triangulation.SetNode(i, gp_Pnt(*point))
+    triangulation.SetTriangle(1, Poly_Triangle(1, 2, 3))
+    face = TopoDS_Face()
+    BRep_Builder().MakeFace(face, triangulation)
+
+    bio = BytesIO()
+    BinTools.Write_s(face, bio, True, False, BinTools_FormatVersion.BinTools_FormatVersion_VERSION_3)
+    data = bio.getvalue()
+
+    # The triangulation is stored as: the number of nodes and triangles (int32),
+    # a few flags and the deflection, the nodes (3 doubles each) and the triangles (3 int32 each)
+    marker = b"Triangulations 1\n"
+    start = data.index(marker) + len(marker)
+    end = data.index(b"\nTShapes", start)
+    header_end = end - 3 * 3 * 8 - 3 * 4
+    if data[start : start + 8] != (3).to_bytes(4, "little") + (1).to_bytes(4, "little"):
+        raise ValueError("Unexpected layout of binary BREP triangulations")
+
+    _triangulation_template = (data[:start], data[start + 8 : header_end], data[end:])
+    return _triangulation_template
+
+
+def make_triangulated_face(nodes, triangles):
+    """
+    Creates a face without a surface, holding the given triangulation only.
+
+    The nodes are an (N, 3) array of coordinates, the triangles are an (M, 3) array of 0-based node indices.
+    The face is built by loading a binary BREP blob assembled with NumPy, instead of setting every node
+    and triangle through OCP one by one.
+    """
+    import numpy as np
+    from io import BytesIO
+    from OCP.BinTools import BinTools
+    from OCP.TopoDS import TopoDS, TopoDS_Shape
+
+    nodes = np.ascontiguousarray(nodes, dtype="<f8").reshape(-1, 3)
+    triangles = np.ascontiguousarray(triangles, dtype="<i4").reshape(-1, 3) + 1
+
+    prefix, header, suffix = _get_triangulation_template()
+    data = b"".join(
+        [
+            prefix,
+            np.array([len(nodes), len(triangles)], dtype="<i4").tobytes(),
+            header,
+            nodes.tobytes(),
+            triangles.tobytes(),
+            suffix,
+        ]
+    )
+
+    shape = TopoDS_Shape()
+    with BytesIO(data) as bio:
+        BinTools.Read_s(shape, bio)
+    return TopoDS.Face_s(shape)
+
+
+def tessellate_arrays(shape, tolerance: float = 0.1, angularTolerance: float = 0.1, dtype: str = "float32"):
+    """Same as tessellate(), returning the vertices and the triangles as NumPy arrays (see get_tessellation_arrays)"""
+    from OCP.BRepTools import BRepTools
+    from OCP.BRepMesh import BRepMesh_IncrementalMesh
+
+    if tolerance is None:
+        tolerance = 0.1
+    if angularTolerance is None:
+        angularTolerance = 0.1
+
+    if not BRepTools.Triangulation_s(shape, tolerance):
+        BRepMesh_IncrementalMesh(
+            shape,
+            theLinDeflection=tolerance,
+            isRelative=False,
+            theAngDeflection=angularTolerance,
+            isInParallel=True,
+        )
+    return get_tessellation_arrays(shape, dtype)
+
+
+def get_tessellation_arrays(shape, dtype: str = "float32"):
+    """
+    Returns the vertices, an (N, 3) array of the given type, and the triangles, an (M, 3) uint32 array
+    of 0-based indices, of the faces which are already triangulated.
+
+    Single precision is enough for the viewers, "float64" keeps the coordinates exactly as computed by OCCT.
+
+    The nodes and the triangles of each face are read out of its binary BREP in bulk,
+    and the location of the face is applied to all its nodes as one matrix multiplication.
+    """
+    import numpy as np
+    from io import BytesIO
+    from OCP.BinTools import BinTools, BinTools_FormatVersion
+    from OCP.BRep import BRep_Builder, BRep_Tool
+    from OCP.TopAbs import TopAbs_Orientation
+    from OCP.TopLoc import TopLoc_Location
+    from OCP.TopoDS import TopoDS_Face
+
+    faces = []
+    nb_nodes = 0
+    nb_triangles = 0
+    for f in get_faces(shape):
+        loc = TopLoc_Location()
+        poly = BRep_Tool.Triangulation_s(f, loc)
+        if poly is None:
+            continue
+        faces.append((f, loc, poly, nb_nodes, nb_triangles))
+        nb_nodes += poly.NbNodes()
+        nb_triangles += poly.NbTriangles()
+
+    vertices = np.empty((nb_nodes, 3), dtype=dtype)
+    triangles = np.empty((nb_triangles, 3), dtype=np.uint32)
+
+    _, header, _ = _get_triangulation_template()
+    marker = b"Triangulations 1\n"
+    builder = BRep_Builder()
+    for f, loc, poly, node_offset, triangle_offset in faces:
+        # A face holding nothing but the triangulation
+        face = TopoDS_Face()
+        builder.MakeFace(face, poly)
+        bio = BytesIO()
+        BinTools.Write_s(face, bio, True, False, BinTools_FormatVersion.BinTools_FormatVersion_VERSION_3)
+        data = bio.getbuffer()
+
+        # See _get_triangulation_template() for the layout
+        start = bytes(data[:256]).index(marker) + len(marker)
+        n, m = np.frombuffer(data, dtype="<i4", count=2, offset=start)
+        has_uv = data[start + 8]
+        start += 8 + len(header)
+        nodes = np.frombuffer(data, dtype="<f8", count=3 * n, offset=start).reshape(-1, 3)
+        start += 3 * 8 * n + (2 * 8 * n if has_uv else 0)
+        face_triangles = np.frombuffer(data, dtype="<i4", count=3 * m, offset=start).reshape(-1, 3)
+
+        if not loc.IsIdentity():
+            trsf = loc.Transformation()
+            matrix = np.array([[trsf.Value(i, j) for j in range(1, 5)] for i in range(1, 4)])
+            nodes = nodes @ matrix[:, :3].T + matrix[:, 3]
+        vertices[node_offset : node_offset + n] = nodes
+
+        face_triangles = face_triangles + (node_offset - 1)
+        if f.Orientation() == TopAbs_Orientation.TopAbs_REVERSED:
+            face_triangles = face_triangles[:, [0, 2, 1]]
+        triangles[triangle_offset : triangle_offset + m] = face_triangles
+
+    return vertices, triangles
+
+
+def write_obj(path: str, vertices, triangles) -> None:
+    """Writes the vertices and the triangles as an indexed OBJ file (pass float64 vertices to keep the precision)"""
+    with open(path, "w", encoding="utf-8", buffering=256 * 1024) as f:
+        f.write("# OBJ file\n")
+        if len(vertices):
+            f.write(("v %.4f %.4f %.4f\n" * len(vertices)) % tuple(vertices.ravel().tolist()))
+        if len(triangles):
+            f.write(("f %d %d %d\n" * len(triangles)) % tuple((triangles.ravel() + 1).tolist()))
+
+
+def write_threejs(path: str, vertices, triangles, buffer_geometry: bool = False) -> None:
+    """
+    Writes the vertices and the triangles as a JSON file for ThreeJS.
+
+    The default layout lists the vertices and the faces one by one.
+    The buffer geometry layout is the one of THREE.BufferGeometry.toJSON(): flat typed arrays
+    of the coordinates and the indices, to be loaded with THREE.BufferGeometryLoader.
+    """
+    # ThreeJS keeps the coordinates in Float32Array
+    if buffer_geometry:
+        positions = ",".join(["%.7g"] * vertices.size) % tuple(vertices.ravel().tolist())
+        indices = ",".join(map(str, triangles.ravel().tolist()))
+        content = (
+            '{"metadata":{"version":4.6,"type":"BufferGeometry","generator":"PartCAD"},'
+            '"type":"BufferGeometry","data":{"attributes":{"position":'
+            '{"itemSize":3,"type":"Float32Array","array":[%s],"normalized":false}},'
+            '"index":{"type":"Uint32Array","array":[%s]}}}'
+        ) % (positions, indices)
+    else:
+        positions = ",".join(["[%.7g,%.7g,%.7g]"] * len(vertices)) % tuple(vertices.ravel().tolist())
+        faces = ",".join(["[0,%d,%d,%d]"] * len(triangles)) % tuple(triangles.ravel().tolist())
+        content = '{"vertices":[%s],"faces":[%s],"nVertices":%d,"nFaces":%d}' % (
+            positions,
+            faces,
+            len(vertices),
+            len(triangles),
+        )
+
+    with open(path, "w", encoding="utf-8", buffering=256 * 1024) as f:
+        f.write(content)
@@ -8,6 +8,9 @@
 #
 
 import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "wrappers"))
 
 
 def get(filename):
@@ -16,3 +19,20 @@ def get(filename):
         "wrappers",
         "wrapper_" + filename,
     )
+
+
+def serialize_request(request) -> bytes:
+    """Serializes the request to be passed to a wrapper script via stdin"""
+    import ipc_framing
+    from ocp_serialize import out_of_band_dispatch_table
+
+    return ipc_framing.dumps(request, out_of_band_dispatch_table())
+
+
+def deserialize_response(response: bytes):
+    """Deserializes the response produced by a wrapper script on stdout"""
+    import ipc_framing
+    from ocp_serialize import register as register_ocp_helper
+
+    register_ocp_helper()
+    return ipc_framing.loads(response)
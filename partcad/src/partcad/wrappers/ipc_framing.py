@@ -0,0 +1,140 @@
+#
+# PartCAD, 2025
+#
+# Licensed under Apache License, Version 2.0.
+#
+
+# This module implements the binary framing used to exchange data with the
+# sandboxed python environments: requests and responses of wrapper scripts,
+# and messages of long-lived sandbox workers (see "wrapper_worker.py").
+# It must not import anything beyond the standard library, as it is loaded
+# both by PartCAD and inside the sandboxed python environments.
+
+import io
+import pickle
+import struct
+
+# Each frame is: <8 bytes of payload length, network byte order><payload>
+FRAME_HEADER = struct.Struct("!Q")
+
+# Serialized objects are pickled with protocol 5, with large binary blobs
+# (e.g. BREP data of shapes) passed out-of-band, to avoid copying them:
+#   <magic><pickle length><buffer count><pickle data>[<buffer length><buffer data>]...
+# The magic marks the beginning of the object in case the wrapper script
+# or the libraries it uses printed anything else to stdout before it.
+OBJECT_MAGIC = b"\x00PCIPC\x01\x00"
+OBJECT_HEADER = struct.Struct("!8sQI")
+BUFFER_HEADER = struct.Struct("!Q")
+
+
+class FrameError(Exception):
+    pass
+
+
+def _read_exactly(stream, size: int) -> bytes:
+    chunks = []
+    remaining = size
+    while remaining > 0:
+        chunk = stream.read(remaining)
+        if not chunk:
+            raise EOFError("Unexpected end of stream (%d bytes missing)" % remaining)
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+def write_frame(stream, payload: bytes) -> None:
+    stream.write(FRAME_HEADER.pack(len(payload)))
+    stream.write(payload)
+    stream.flush()
+
+
+def read_frame(stream) -> bytes:
+    header = stream.read(FRAME_HEADER.size)
+    if not header:
+        raise EOFError("The stream is closed")
+    if len(header) < FRAME_HEADER.size:
+        header += _read_exactly(stream, FRAME_HEADER.size - len(header))
+    (size,) = FRAME_HEADER.unpack(header)
+    return _read_exactly(stream, size)
+
+
+def write_message(stream, message: dict) -> None:
+    write_frame(stream, pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def read_message(stream) -> dict:
+    payload = read_frame(stream)
+    try:
+        return pickle.loads(payload)
+    except Exception as e:
+        raise FrameError("Failed to decode the message: %s" % e) from e
+
+
+def serialize(obj, dispatch_table: dict = None) -> list:
+    """Returns the list of chunks to be written to the stream in the given order"""
+    buffers = []
+    chunks = []
+
+    def buffer_callback(buffer: pickle.PickleBuffer):
+        buffers.append(buffer.raw())
+
+    data = _dumps(obj, dispatch_table, buffer_callback)
+    chunks.append(OBJECT_HEADER.pack(OBJECT_MAGIC, len(data), len(buffers)))
+    chunks.append(data)
+    for buffer in buffers:
+        chunks.append(BUFFER_HEADER.pack(buffer.nbytes))
+        chunks.append(buffer)
+    return chunks
+
+
+def _dumps(obj, dispatch_table, buffer_callback) -> bytes:
+    with io.BytesIO() as bio:
+        pickler = pickle.Pickler(bio, protocol=5, buffer_callback=buffer_callback)
+        if dispatch_table is not None:
+            pickler.dispatch_table = dispatch_table
+        pickler.dump(obj)
+        return bio.getvalue()
+
+
+def dumps(obj, dispatch_table: dict = None) -> bytes:
+    # The buffers are copied once, straight into the stream, which returns
+    # its own memory without copying it again
+    with io.BytesIO() as bio:
+        write_object(bio, obj, dispatch_table)
+        return bio.getvalue()
+
+
+def write_object(stream, obj, dispatch_table: dict = None) -> None:
+    for chunk in serialize(obj, dispatch_table):
+        stream.write(chunk)
+    stream.flush()
+
+
+def loads(data) -> object:
+    """Deserializes the object, skipping anything that precedes it"""
+    start = data.find(OBJECT_MAGIC)
+    if start < 0:
+        raise FrameError("No serialized object found")
+
+    # Slice the memory view to pass the buffers to unpickler without copying
+    view = memoryview(data)
+    offset = start + OBJECT_HEADER.size
+    if len(view) < offset:
+        raise FrameError("Truncated object header")
+    _, data_len, buffers_count = OBJECT_HEADER.unpack(view[start:offset])
+
+    pickled = view[offset : offset + data_len]
+    offset += data_len
+    buffers = []
+    for _ in range(buffers_count):
+        if len(view) < offset + BUFFER_HEADER.size:
+            raise FrameError("Truncated buffer header")
+        (buffer_len,) = BUFFER_HEADER.unpack(view[offset : offset + BUFFER_HEADER.size])
+        offset += BUFFER_HEADER.size
+        buffers.append(view[offset : offset + buffer_len])
+        offset += buffer_len
+    if len(view) < offset:
+        raise FrameError("Truncated object data")
+
+    return pickle.loads(pickled, buffers=buffers)
@@ -52,6 +52,7 @@ license:
 
 import copyreg
 from io import BytesIO
+import pickle
 from typing import Any
 
 import OCP
@@ -107,6 +108,29 @@ def _reduce_topods(shape):
         return _inflate_topods, (bio.getvalue(),)
 
 
+def _inflate_topods_binary(data):
+    with BytesIO(data) as bio:
+        shape = OCP.TopoDS.TopoDS_Shape()
+        OCP.BinTools.BinTools.Read_s(shape, bio)
+        return downcast(shape)
+
+
+def _reduce_topods_out_of_band(shape):
+    # The binary BREP blob is handed over to the pickler as a buffer,
+    # so that (with protocol 5) it is not copied into the pickle stream
+    # Format version 4 relies on stream positioning which is not reliable
+    # with python streams, hence version 3 is used
+    bio = BytesIO()
+    OCP.BinTools.BinTools.Write_s(
+        shape,
+        bio,
+        True,  # theWithTriangles
+        False,  # theWithNormals
+        OCP.BinTools.BinTools_FormatVersion.BinTools_FormatVersion_VERSION_3,
+    )
+    return _inflate_topods_binary, (pickle.PickleBuffer(bio.getbuffer()),)
+
+
 def _inflate_transform(*values: float):
     trsf = OCP.gp.gp_Trsf()
     trsf.SetValues(*values)
@@ -224,6 +248,31 @@ def _reduce_xyz(dir: OCP.gp.gp_XYZ):
     return _inflate_xyz, (dir.X(), dir.Y(), dir.Z())
 
 
+TOPODS_CLASSES = (
+    OCP.TopoDS.TopoDS_Shape,
+    OCP.TopoDS.TopoDS_Compound,
+    OCP.TopoDS.TopoDS_CompSolid,
+    OCP.TopoDS.TopoDS_Solid,
+    OCP.TopoDS.TopoDS_Shell,
+    OCP.TopoDS.TopoDS_Face,
+    OCP.TopoDS.TopoDS_Wire,
+    OCP.TopoDS.TopoDS_Edge,
+    OCP.TopoDS.TopoDS_Vertex,
+)
+
+
+def out_of_band_dispatch_table() -> dict:
+    """
+    Returns a pickle dispatch table that serializes shapes as out-of-band
+    binary BREP buffers. To be used with pickle protocol 5 and a buffer callback.
+    """
+    register()
+    table = copyreg.dispatch_table.copy()
+    for cls in TOPODS_CLASSES:
+        table[cls] = _reduce_topods_out_of_band
+    return table
+
+
 def register():
     """
     Registers pickle support functions for common OCCT objects.
@@ -246,15 +295,5 @@ def register():
         lambda loc: (OCP.TopLoc.TopLoc_Location, (loc.Transformation(),)),
     )
 
-    for cls in (
-        OCP.TopoDS.TopoDS_Shape,
-        OCP.TopoDS.TopoDS_Compound,
-        OCP.TopoDS.TopoDS_CompSolid,
-        OCP.TopoDS.TopoDS_Solid,
-        OCP.TopoDS.TopoDS_Shell,
-        OCP.TopoDS.TopoDS_Face,
-        OCP.TopoDS.TopoDS_Wire,
-        OCP.TopoDS.TopoDS_Edge,
-        OCP.TopoDS.TopoDS_Vertex,
-    ):
+    for cls in TOPODS_CLASSES:
         copyreg.pickle(cls, _reduce_topods)
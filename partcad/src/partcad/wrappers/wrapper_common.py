@@ -9,15 +9,13 @@
 
 # This script contains code shared by all wrapper scripts.
 
-import base64
-
 # import fcntl  # TODO(clairbee): replace it with whatever works on Windows if needed
 import locale
 import os
-import pickle
 import sys
 
-from ocp_serialize import register as register_ocp_helper
+import ipc_framing
+from ocp_serialize import out_of_band_dispatch_table, register as register_ocp_helper
 
 
 def handle_input():
@@ -37,24 +35,17 @@ def handle_input():
     # flag = fcntl.fcntl(sys.stdin, fcntl.F_GETFL)
     # fcntl.fcntl(sys.stdin, fcntl.F_SETFL, flag & ~os.O_NONBLOCK)
     #   - Read until EOF
-    input_str = sys.stdin.read()
+    request_bytes = sys.stdin.buffer.read()
     #   - Unpack the content received via stdin
-
-    # TODO(clairbee): is .encode() needed here?
-    request_bytes = base64.b64decode(input_str)
-
     register_ocp_helper()
-    request = pickle.loads(request_bytes)
+    request = ipc_framing.loads(request_bytes)
     return path, request
 
 
 def handle_output(model):
     # Serialize the output
-    register_ocp_helper()
-    picklestring = pickle.dumps(model)
-    response = base64.b64encode(picklestring)
-    sys.stdout.write(response.decode())
     sys.stdout.flush()
+    ipc_framing.write_object(sys.stdout.buffer, model, out_of_band_dispatch_table())
 
 
 def handle_exception(exc, cqscript=None):
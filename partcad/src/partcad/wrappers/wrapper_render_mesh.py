@@ -0,0 +1,139 @@
+#
+# PartCAD, 2025
+#
+# Licensed under Apache License, Version 2.0.
+#
+# This script is executed within a python runtime environment
+# to render a shape into several mesh formats at once.
+# The shape is tessellated once per pair of tolerances, and all the files
+# requested with these tolerances are written from the same triangulation.
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(__file__))
+import wrapper_common
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+import utils_ocp
+
+# glTF goes last as its exporter removes the triangulation when it is done
+FORMATS = ["stl", "obj", "threejs", "3mf", "gltf"]
+
+
+def write_stl(obj, path, output, tessellation):
+    from OCP.StlAPI import StlAPI_Writer
+
+    # The native writer reads the triangulation faster than it can be extracted
+    writer = StlAPI_Writer()
+    writer.ASCIIMode = output.get("ascii", False)
+    if not writer.Write(obj, path) or not os.path.exists(path) or os.path.getsize(path) == 0:
+        raise Exception(f"Failed to create STL file: {path}")
+
+
+def write_obj(obj, path, output, tessellation):
+    utils_ocp.write_obj(path, *tessellation("float64"))
+
+
+def write_threejs(obj, path, output, tessellation):
+    utils_ocp.write_threejs(path, *tessellation(), output.get("bufferGeometry", False))
+
+
+def write_3mf(obj, path, output, tessellation):
+    import cadquery as cq
+
+    # Meshing with the same tolerances reuses the existing triangulation
+    cq_solid = cq.Solid.makeBox(1, 1, 1)
+    cq_solid.wrapped = obj
+    cq.exporters.export(
+        cq_solid,
+        path,
+        tolerance=output["tolerance"],
+        angularTolerance=output["angularTolerance"],
+    )
+
+
+def write_gltf(obj, path, output, tessellation):
+    import build123d as b3d
+
+    # Meshing with the same tolerances reuses the existing triangulation
+    b3d_solid = b3d.Solid.make_box(1, 1, 1)
+    b3d_solid.wrapped = obj
+    b3d.export_gltf(
+        b3d_solid,
+        path,
+        binary=output.get("binary", False),
+        linear_deflection=output["tolerance"],
+        angular_deflection=output["angularTolerance"],
+    )
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        raise Exception(f"Failed to create GLTF file: {path}")
+
+
+WRITERS = {
+    "stl": write_stl,
+    "obj": write_obj,
+    "threejs": write_threejs,
+    "3mf": write_3mf,
+    "gltf": write_gltf,
+}
+
+
+def process(request):
+    from OCP.BRepMesh import BRepMesh_IncrementalMesh
+    from OCP.BRepTools import BRepTools
+
+    obj = request["wrapped"]
+    results = {}
+
+    groups = {}
+    for output in request["outputs"]:
+        groups.setdefault((output["tolerance"], output["angularTolerance"]), []).append(output)
+
+    for (tolerance, angular_tolerance), outputs in groups.items():
+        try:
+            # Drop the triangulation made with other tolerances, if any
+            BRepTools.Clean_s(obj)
+            BRepMesh_IncrementalMesh(
+                obj,
+                theLinDeflection=tolerance,
+                isRelative=True,
+                theAngDeflection=angular_tolerance,
+                isInParallel=True,
+            )
+        except Exception as e:
+            wrapper_common.handle_exception(e)
+            for output in outputs:
+                results[output["format"]] = {"success": False, "exception": str(e)}
+            continue
+
+        # Extracted once for all the formats which need it
+        cached = []
+
+        def tessellation(dtype="float32"):
+            if not cached:
+                cached.append(utils_ocp.get_tessellation_arrays(obj, "float64"))
+            vertices, triangles = cached[0]
+            return vertices.astype(dtype, copy=False), triangles
+
+        for output in sorted(outputs, key=lambda output: FORMATS.index(output["format"])):
+            try:
+                path = output["path"]
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                WRITERS[output["format"]](obj, path, output, tessellation)
+                results[output["format"]] = {"success": True, "exception": None}
+            except Exception as e:
+                wrapper_common.handle_exception(e)
+                results[output["format"]] = {"success": False, "exception": str(e)}
+
+    return {
+        "success": all(result["success"] for result in results.values()),
+        "exception": None,
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    path, request = wrapper_common.handle_input()
+    response = process(request)
+    wrapper_common.handle_output(response)
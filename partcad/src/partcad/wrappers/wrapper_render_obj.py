@@ -17,7 +17,7 @@ sys.path.append(os.path.dirname(__file__))
 import wrapper_common
 
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
-from utils_ocp import tessellate
+from utils_ocp import tessellate_arrays, write_obj
 
 
 def process(path, request):
@@ -25,23 +25,8 @@ def process(path, request):
     try:
         obj = request["wrapped"]
 
-        vertices, triangles = tessellate(obj, request["tolerance"], request["angularTolerance"])
-
-        # b3d_obj = b3d.Shape(request["wrapped"])
-        # vertices, triangles = b3d.Mesher._mesh_shape(
-        #     b3d_obj, request["tolerance"], request["angularTolerance"]
-        # )
-
-        with open(path, "w", encoding="utf-8", buffering=256 * 1024) as f:
-            f.write("# OBJ file\n")
-            for v in vertices:
-                f.write(f"v {v[0]:.4f} {v[1]:.4f} {v[2]:.4f}\n")
-            for p in triangles:
-                f.write("f")
-                for i in p:
-                    f.write(" %d" % (i + 1))
-                f.write("\n")
-            f.flush()
+        vertices, triangles = tessellate_arrays(obj, request["tolerance"], request["angularTolerance"], "float64")
+        write_obj(path, vertices, triangles)
 
         return {
             "success": True,
@@ -55,9 +40,10 @@ def process(path, request):
         }
 
 
-path, request = wrapper_common.handle_input()
+if __name__ == "__main__":
+    path, request = wrapper_common.handle_input()
 
-# Perform rendering
-response = process(path, request)
+    # Perform rendering
+    response = process(path, request)
 
-wrapper_common.handle_output(response)
+    wrapper_common.handle_output(response)
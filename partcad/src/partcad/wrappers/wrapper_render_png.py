@@ -10,49 +10,106 @@
 # This script is executed within a python runtime environment
 # (no need for a sandbox) to speed up parallel rendering and
 # to reduce Python dependencies on the host environment
+#
+# The edges projected for the SVG image are drawn straight into the raster
+# image. If "svg_path" is in the request, the SVG image is written too, out of
+# the same projection.
 
 import os
 import sys
-import tempfile
 
 sys.path.append(os.path.dirname(__file__))
 import wrapper_common
 import wrapper_render_svg
 
-import svglib.svglib as svglib
+import build123d as b3d
+from OCP.BRepAdaptor import BRepAdaptor_Curve
+from OCP.GCPnts import GCPnts_TangentialDeflection
 import reportlab.graphics.renderPM as renderPM
+from reportlab.graphics.shapes import Drawing, PolyLine
+from reportlab.lib.colors import Color
+
+# Maximum distance between the drawn lines and the edges, in pixels
+DEFLECTION = 0.25
+ANGULAR_DEFLECTION = 0.1
+
+
+def get_points(edge, deflection: float) -> list:
+    """Returns the (x, y) points of the polyline approximating the projected edge"""
+    points = GCPnts_TangentialDeflection(BRepAdaptor_Curve(edge), ANGULAR_DEFLECTION, deflection)
+    return [(points.Value(i).X(), points.Value(i).Y()) for i in range(1, points.NbPoints() + 1)]
+
+
+def get_drawing(visible, request) -> Drawing:
+    """Returns the drawing of the edges, the way they are laid out in the SVG image, scaled to fit the size"""
+    bounding_box = b3d.Compound(children=visible).bounding_box()
+    # The lines are in millimeters of the SVG image
+    svg_scale = wrapper_render_svg.get_scale(visible)
+    margin = request["line_weight"] / 2 / svg_scale
+    view_width = bounding_box.size.X + 2 * margin
+    view_height = bounding_box.size.Y + 2 * margin
+    if view_width <= 0 or view_height <= 0:
+        raise ValueError("Nothing to draw")
+
+    scale = min(float(request["width"]) / view_width, float(request["height"]) / view_height)
+    drawing = Drawing(view_width * scale, view_height * scale)
+    color = Color(64 / 255, 192 / 255, 64 / 255)
+    left = bounding_box.min.X - margin
+    bottom = bounding_box.min.Y - margin
+    for edge in visible:
+        points = []
+        for x, y in get_points(edge.wrapped, DEFLECTION / scale):
+            points += [(x - left) * scale, (y - bottom) * scale]
+        drawing.add(
+            PolyLine(
+                points,
+                strokeColor=color,
+                strokeWidth=request["line_weight"] * scale / svg_scale,
+                strokeLineCap=1,
+                strokeLineJoin=1,
+            )
+        )
+    return drawing
+
+
+def write_png(path, visible, request):
+    renderPM.drawToFile(
+        get_drawing(visible, request),
+        path,
+        fmt="PNG",
+        configPIL={"transparent": True},
+    )
 
 
 def process(path, request):
     try:
-        svg_path = tempfile.mktemp(".svg")
-        wrapper_render_svg.process(svg_path, request)
-
-        # Render the raster image
-        drawing = svglib.svg2rlg(svg_path)
-        if drawing is None:
-            return {
-                "success": False,
-                "exception": "Failed to convert to RLG. Aborting.",
-            }
-
-        scale_width = float(request["width"]) / float(drawing.width)
-        scale_height = float(request["height"]) / float(drawing.height)
-        scale = min(scale_width, scale_height)
-        drawing.scale(scale, scale)
-        drawing.width *= scale
-        drawing.height *= scale
-        renderPM.drawToFile(
-            drawing,
-            path,
-            fmt="PNG",
-            configPIL={"transparent": True},
-        )
+        visible = wrapper_render_svg.project(request)
 
-        return {
-            "success": True,
-            "exception": None,
+        svg_path = request.get("svg_path", None)
+        results = {}
+        if svg_path is not None:
+            try:
+                os.makedirs(os.path.dirname(svg_path), exist_ok=True)
+                wrapper_render_svg.write_svg(svg_path, visible, request)
+                results["svg"] = {"success": True, "exception": None}
+            except Exception as e:
+                wrapper_common.handle_exception(e)
+                results["svg"] = {"success": False, "exception": str(e.with_traceback(None))}
+
+        try:
+            write_png(path, visible, request)
+            results["png"] = {"success": True, "exception": None}
+        except Exception as e:
+            wrapper_common.handle_exception(e)
+            results["png"] = {"success": False, "exception": str(e.with_traceback(None))}
+
+        response = {
+            "success": all(result["success"] for result in results.values()),
+            "exception": results["png"]["exception"],
         }
+        if svg_path is not None:
+            response["results"] = results
+        return response
     except Exception as e:
         wrapper_common.handle_exception(e)
         return {
@@ -61,9 +118,10 @@ def process(path, request):
         }
 
 
-path, request = wrapper_common.handle_input()
+if __name__ == "__main__":
+    path, request = wrapper_common.handle_input()
 
-# Perform rendering
-response = process(path, request)
+    # Perform rendering
+    response = process(path, request)
 
-wrapper_common.handle_output(response)
+    wrapper_common.handle_output(response)
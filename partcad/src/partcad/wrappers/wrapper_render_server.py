@@ -0,0 +1,113 @@
+#
+# PartCAD, 2025
+#
+# Licensed under Apache License, Version 2.0.
+#
+
+# This script is executed within the python runtime environment as a
+# long-lived render server. It imports the rendering libraries once and renders
+# the jobs it receives in a pool of threads, reporting the result of each job
+# as soon as it is done, so that many shapes are rendered without starting
+# an interpreter per shape and per format.
+#
+# Usage: wrapper_render_server.py <threads> [<format> ...]
+#
+# Requests are framed serialized objects (see "wrapper.serialize_request()"):
+#   {"op": "render", "id": <int>, "format": <format or "mesh">, "path": <path>, "request": <wrapper request>}
+#   {"op": "exit"} (the server exits once the jobs received so far are done)
+# Responses are framed messages (see "ipc_framing.py"):
+#   {"op": "ready", "pid": <int>} once the modules are imported
+#   {"op": "result", "id": <int>, "success": <bool>, "exception": <str>, ...} per job
+
+import concurrent.futures
+import importlib
+import locale
+import os
+import sys
+import threading
+
+sys.path.append(os.path.dirname(__file__))
+import ipc_framing
+import wrapper_common
+from ocp_serialize import register as register_ocp_helper
+
+# The mesh formats are rendered by "wrapper_render_mesh.py", out of one tessellation
+MESH_FORMATS = ["stl", "obj", "threejs", "3mf", "gltf"]
+# Libraries imported by "wrapper_render_mesh.py" when the format is written
+MESH_LIBRARIES = {"3mf": "cadquery", "gltf": "build123d"}
+
+
+def get_module_names(formats: list) -> list:
+    names = []
+    for format_name in formats:
+        if format_name in MESH_FORMATS:
+            names.append("wrapper_render_mesh")
+            if format_name in MESH_LIBRARIES:
+                names.append(MESH_LIBRARIES[format_name])
+        else:
+            names.append("wrapper_render_" + format_name)
+    return list(dict.fromkeys(names))
+
+
+def render(job: dict) -> dict:
+    path = job["path"]
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if job["format"] == "mesh":
+        return importlib.import_module("wrapper_render_mesh").process(job["request"])
+    module = importlib.import_module("wrapper_render_" + job["format"])
+    return module.process(path, job["request"])
+
+
+def main():
+    # Reserve the original stdout for the protocol, and make sure that
+    # whatever the rendering libraries print to stdout does not corrupt it
+    protocol_in = os.fdopen(os.dup(sys.stdin.fileno()), "rb")
+    protocol_out = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, sys.stdin.fileno())
+    os.close(devnull)
+
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    locale.setlocale(locale.LC_ALL, "en_US.UTF-8")
+    register_ocp_helper()
+    for module_name in get_module_names(sys.argv[2:]):
+        try:
+            importlib.import_module(module_name)
+        except Exception as e:
+            sys.stderr.write("Failed to preload %s: %s\n" % (module_name, e))
+
+    protocol_lock = threading.Lock()
+
+    def reply(message: dict) -> None:
+        with protocol_lock:
+            ipc_framing.write_message(protocol_out, message)
+
+    def run(job: dict) -> None:
+        try:
+            response = render(job)
+        except Exception as e:
+            wrapper_common.handle_exception(e)
+            response = {"success": False, "exception": str(e)}
+        reply({**response, "op": "result", "id": job["id"]})
+
+    reply({"op": "ready", "pid": os.getpid()})
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(threads, 1)) as executor:
+        while True:
+            try:
+                request = ipc_framing.loads(ipc_framing.read_frame(protocol_in))
+            except EOFError:
+                break
+
+            op = request.get("op", None)
+            if op == "exit":
+                break
+            elif op == "render":
+                executor.submit(run, request)
+            else:
+                reply({"op": "error", "error": "Unknown operation: %s" % op})
+
+
+if __name__ == "__main__":
+    main()
@@ -19,46 +19,107 @@ sys.path.append(os.path.dirname(__file__))
 import wrapper_common
 
 
+def get_mesh_faces(wrapped):
+    """Replaces the faces holding a triangulation only (large meshes) with a planar face per triangle"""
+    from OCP.BRep import BRep_Builder, BRep_Tool
+    from OCP.BRepBuilderAPI import BRepBuilderAPI_MakeFace, BRepBuilderAPI_MakePolygon
+    from OCP.TopAbs import TopAbs_FACE
+    from OCP.TopExp import TopExp_Explorer
+    from OCP.TopLoc import TopLoc_Location
+    from OCP.TopoDS import TopoDS, TopoDS_Compound
+
+    faces = []
+    has_mesh_faces = False
+    explorer = TopExp_Explorer(wrapped, TopAbs_FACE)
+    while explorer.More():
+        face = TopoDS.Face_s(explorer.Current())
+        explorer.Next()
+        if BRep_Tool.Surface_s(face) is not None:
+            faces.append(face)
+            continue
+
+        # Hidden line removal needs the surfaces of the faces
+        has_mesh_faces = True
+        location = TopLoc_Location()
+        triangulation = BRep_Tool.Triangulation_s(face, location)
+        if triangulation is None:
+            continue
+        transformation = location.Transformation()
+        nodes = [triangulation.Node(i).Transformed(transformation) for i in range(1, triangulation.NbNodes() + 1)]
+        for i in range(1, triangulation.NbTriangles() + 1):
+            n1, n2, n3 = triangulation.Triangle(i).Get()
+            polygon = BRepBuilderAPI_MakePolygon(nodes[n1 - 1], nodes[n2 - 1], nodes[n3 - 1], True)
+            if not polygon.IsDone():
+                # Degenerate triangle
+                continue
+            maker = BRepBuilderAPI_MakeFace(polygon.Wire(), True)
+            if maker.IsDone():
+                faces.append(maker.Face())
+
+    if not has_mesh_faces:
+        return wrapped
+
+    builder = BRep_Builder()
+    compound = TopoDS_Compound()
+    builder.MakeCompound(compound)
+    for face in faces:
+        builder.Add(compound, face)
+    return compound
+
+
+def project(request):
+    """Returns the visible edges of the shape projected to the viewport"""
+    b3d_obj = b3d.Solid.make_box(1, 1, 1)
+    b3d_obj.wrapped = get_mesh_faces(request["wrapped"])
+
+    viewport_origin = tuple(request["viewport_origin"])
+    visible, hidden = b3d_obj.project_to_viewport(viewport_origin=viewport_origin)
+    # visible = b3d_obj.project_to_viewport(
+    #     viewport_origin=viewport_origin,
+    #     ignore_hidden=True,
+    # )[0]
+    return visible
+
+
+def get_scale(visible) -> float:
+    """Returns the scale of the SVG document, in millimeters per model unit"""
+    max_dimension = max(
+        # *b3d.Compound(children=visible + hidden)
+        *b3d.Compound(children=visible)
+        .bounding_box()
+        .size
+    )
+    if max_dimension == 0:
+        max_dimension = 4
+    return 512.0 / max_dimension
+
+
+def write_svg(path, visible, request):
+    exporter = b3d.ExportSVG(
+        scale=get_scale(visible),
+        precision=10,
+    )
+    exporter.add_layer(
+        "Visible",
+        line_color=(64, 192, 64),
+        line_weight=request["line_weight"],
+    )
+    # exporter.add_layer(
+    #     "Hidden",
+    #     line_color=(32, 64, 32),
+    #     line_type=b3d.LineType.ISO_DOT,
+    # )
+    try:
+        exporter.add_shape(visible, layer="Visible")
+        # exporter.add_shape(hidden, layer="Hidden")
+    except:
+        pass
+    exporter.write(path)
+
+
 def process(path, request):
     try:
-        b3d_obj = b3d.Solid.make_box(1, 1, 1)
-        b3d_obj.wrapped = request["wrapped"]
-
-        viewport_origin = tuple(request["viewport_origin"])
-        visible, hidden = b3d_obj.project_to_viewport(viewport_origin=viewport_origin)
-        # visible = b3d_obj.project_to_viewport(
-        #     viewport_origin=viewport_origin,
-        #     ignore_hidden=True,
-        # )[0]
-        max_dimension = max(
-            # *b3d.Compound(children=visible + hidden)
-            *b3d.Compound(children=visible)
-            .bounding_box()
-            .size
-        )
-        if max_dimension == 0:
-            max_dimension = 4
-        scale = 512.0 / max_dimension
-        exporter = b3d.ExportSVG(
-            scale=scale,
-            precision=10,
-        )
-        exporter.add_layer(
-            "Visible",
-            line_color=(64, 192, 64),
-            line_weight=request["line_weight"],
-        )
-        # exporter.add_layer(
-        #     "Hidden",
-        #     line_color=(32, 64, 32),
-        #     line_type=b3d.LineType.ISO_DOT,
-        # )
-        try:
-            exporter.add_shape(visible, layer="Visible")
-            # exporter.add_shape(hidden, layer="Hidden")
-        except:
-            pass
-        exporter.write(path)
+        write_svg(path, project(request), request)
 
         return {
             "success": True,
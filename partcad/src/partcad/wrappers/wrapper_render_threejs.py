@@ -12,13 +12,12 @@
 
 import os
 import sys
-import json
 
 sys.path.append(os.path.dirname(__file__))
 import wrapper_common
 
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
-from utils_ocp import tessellate
+from utils_ocp import tessellate_arrays, write_threejs
 
 
 def process(path, request):
@@ -26,29 +25,8 @@ def process(path, request):
     try:
         obj = request["wrapped"]
 
-        vertices, triangles = tessellate(obj, request["tolerance"], request["angularTolerance"])
-
-        result = {
-            "vertices": [],
-            "faces": [],
-            "nVertices": len(vertices),
-            "nFaces": len(triangles),
-        }
-
-        # add vertices
-        for [x, y, z] in vertices:
-            result["vertices"].append([x, y, z])
-
-        # add triangles
-        for [i, j, k] in triangles:
-            # 0 means just a triangle
-            result["faces"].append([0, i, j, k])
-
-        BUFFER_SIZE = 256 * 1024  # 256KB buffer for file writes
-
-        json_str = json.dumps(result)
-        with open(path, "w", encoding="utf-8", buffering=BUFFER_SIZE) as f:
-            f.write(json_str)
+        vertices, triangles = tessellate_arrays(obj, request["tolerance"], request["angularTolerance"])
+        write_threejs(path, vertices, triangles, request.get("bufferGeometry", False))
 
         return {
             "success": True,
@@ -62,9 +40,10 @@ def process(path, request):
         }
 
 
-path, request = wrapper_common.handle_input()
+if __name__ == "__main__":
+    path, request = wrapper_common.handle_input()
 
-# Perform rendering
-response = process(path, request)
+    # Perform rendering
+    response = process(path, request)
 
-wrapper_common.handle_output(response)
+    wrapper_common.handle_output(response)
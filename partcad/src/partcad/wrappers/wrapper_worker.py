@@ -0,0 +1,170 @@
+#
+# PartCAD, 2025
+#
+# Licensed under Apache License, Version 2.0.
+#
+
+# This script is executed within the python sandbox environment (python runtime)
+# as a long-lived worker. It keeps heavy modules (OCP, cadquery, build123d...)
+# imported and executes other wrapper scripts in-process on request.
+#
+# Usage: wrapper_worker.py [<module to preload> ...]
+#
+# Requests and responses are framed messages (see "ipc_framing.py"):
+#   {"op": "ping"} -> {"op": "pong", "rss": <bytes>}
+#   {"op": "exit"} -> (no response, the worker exits)
+#   {"op": "run", "argv": [<script>, ...], "cwd": <path>, "stdin": <bytes>} ->
+#       {"op": "done", "stdout": <bytes>, "stderr": <bytes>, "exit_code": <int>, "rss": <bytes>}
+
+import importlib
+import io
+import os
+import runpy
+import sys
+import sysconfig
+import traceback
+
+sys.path.append(os.path.dirname(__file__))
+import ipc_framing
+
+
+def get_rss() -> int:
+    """Returns the resident set size of this process in bytes"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        pass
+    try:
+        import resource
+
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Reported in kilobytes on Linux and in bytes on macOS
+        return rss if sys.platform == "darwin" else rss * 1024
+    except Exception:
+        return 0
+
+
+def get_library_paths() -> list:
+    """Returns the folders where the interpreter keeps modules that are safe to keep imported between jobs"""
+    paths = set()
+    for name in ("stdlib", "platstdlib", "purelib", "platlib"):
+        path = sysconfig.get_paths().get(name, None)
+        if path:
+            paths.add(os.path.abspath(path))
+    paths.add(os.path.abspath(os.path.dirname(__file__)))
+    return list(paths)
+
+
+LIBRARY_PATHS = get_library_paths()
+
+
+def is_library_module(module) -> bool:
+    filename = getattr(module, "__file__", None)
+    if filename is None:
+        # Builtin or namespace modules
+        return True
+    filename = os.path.abspath(filename)
+    return any(filename.startswith(path + os.sep) for path in LIBRARY_PATHS)
+
+
+def run(argv: list, cwd, stdin: bytes) -> tuple:
+    saved_argv = sys.argv
+    saved_path = list(sys.path)
+    saved_stdin, saved_stdout, saved_stderr = sys.stdin, sys.stdout, sys.stderr
+    saved_cwd = os.getcwd()
+    saved_modules = set(sys.modules.keys())
+
+    stdout_buffer = io.BytesIO()
+    stderr_buffer = io.BytesIO()
+    stdout_wrapper = io.TextIOWrapper(stdout_buffer, encoding="utf-8", write_through=True)
+    stderr_wrapper = io.TextIOWrapper(stderr_buffer, encoding="utf-8", write_through=True)
+    sys.stdin = io.TextIOWrapper(io.BytesIO(stdin), encoding="utf-8")
+    sys.stdout = stdout_wrapper
+    sys.stderr = stderr_wrapper
+
+    exit_code = 0
+    try:
+        if cwd is not None:
+            os.chdir(cwd)
+        # Packages may have been installed since the previous job
+        importlib.invalidate_caches()
+        sys.argv = list(argv)
+        runpy.run_path(argv[0], run_name="__main__")
+    except SystemExit as e:
+        if isinstance(e.code, int):
+            exit_code = e.code
+        elif e.code is not None:
+            sys.stderr.write(str(e.code))
+            exit_code = 1
+    except BaseException:
+        traceback.print_exc(file=stderr_wrapper)
+        exit_code = 1
+    finally:
+        # Detach the buffers so that they are not closed with the wrappers
+        stdout_wrapper.flush()
+        stderr_wrapper.flush()
+        stdout_wrapper.detach()
+        stderr_wrapper.detach()
+        sys.argv = saved_argv
+        sys.path[:] = saved_path
+        sys.stdin, sys.stdout, sys.stderr = saved_stdin, saved_stdout, saved_stderr
+        os.chdir(saved_cwd)
+
+        # Forget the modules imported by the user scripts (they may differ from
+        # one package to another), but keep the libraries warm
+        for name in set(sys.modules.keys()) - saved_modules:
+            module = sys.modules.get(name, None)
+            if module is not None and not is_library_module(module):
+                del sys.modules[name]
+
+    return stdout_buffer.getvalue(), stderr_buffer.getvalue(), exit_code
+
+
+def main():
+    # Reserve the original stdout for the protocol, and make sure that
+    # whatever native libraries print to stdout does not corrupt it
+    protocol_in = os.fdopen(os.dup(sys.stdin.fileno()), "rb")
+    protocol_out = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, sys.stdin.fileno())
+    os.close(devnull)
+
+    for module_name in sys.argv[1:]:
+        try:
+            importlib.import_module(module_name)
+        except Exception as e:
+            sys.stderr.write("Failed to preload %s: %s\n" % (module_name, e))
+
+    ipc_framing.write_message(protocol_out, {"op": "ready", "pid": os.getpid(), "rss": get_rss()})
+
+    while True:
+        try:
+            request = ipc_framing.read_message(protocol_in)
+        except EOFError:
+            break
+
+        op = request.get("op", None)
+        if op == "exit":
+            break
+        elif op == "ping":
+            ipc_framing.write_message(protocol_out, {"op": "pong", "rss": get_rss()})
+        elif op == "run":
+            stdout, stderr, exit_code = run(request["argv"], request.get("cwd", None), request.get("stdin", b""))
+            ipc_framing.write_message(
+                protocol_out,
+                {
+                    "op": "done",
+                    "stdout": stdout,
+                    "stderr": stderr,
+                    "exit_code": exit_code,
+                    "rss": get_rss(),
+                },
+            )
+        else:
+            ipc_framing.write_message(protocol_out, {"op": "error", "error": "Unknown operation: %s" % op})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+#
+# PartCAD, 2025
+#
+# Licensed under Apache License, Version 2.0.
+#
+
+# Measures the time and the peak memory needed to build the compound of an
+# assembly made of many instances of the same fastener, comparing the current
+# implementation with the previous one (a copy of each instance, added in the
+# order of completion).
+#
+# Usage: bench_assembly.py [<number of fasteners>]   (default: 10000)
+
+import asyncio
+import copy
+import math
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+import build123d as b3d
+from OCP.BRepAlgoAPI import BRepAlgoAPI_Fuse
+from OCP.BRepPrimAPI import BRepPrimAPI_MakeCylinder, BRepPrimAPI_MakePrism
+from OCP.BRepBuilderAPI import BRepBuilderAPI_MakeFace, BRepBuilderAPI_MakePolygon
+from OCP.gp import gp_Pnt, gp_Vec
+
+import partcad as pc
+
+
+def make_bolt():
+    # Hex head and a shank
+    head = BRepBuilderAPI_MakePolygon()
+    for i in range(6):
+        head.Add(gp_Pnt(5 * math.cos(i * math.pi / 3), 5 * math.sin(i * math.pi / 3), 0))
+    head.Close()
+    head = BRepPrimAPI_MakePrism(BRepBuilderAPI_MakeFace(head.Wire()).Face(), gp_Vec(0, 0, 4)).Shape()
+    shank = BRepPrimAPI_MakeCylinder(3, 30).Shape()
+    return BRepAlgoAPI_Fuse(head, shank).Shape()
+
+
+async def legacy_get_shape(assembly, ctx):
+    # Assembly._get_shape_real() before instances were shared
+    child_shapes = []
+
+    async def per_child(child):
+        item = await child.item.get_build123d(ctx)
+        if child.name is not None or child.location is not None:
+            item = copy.copy(item)
+            if child.name is not None:
+                item.label = child.name
+            if child.location is not None:
+                item.locate(child.location)
+        return item
+
+    tasks = [asyncio.create_task(per_child(child)) for child in assembly.children]
+    for f in asyncio.as_completed(tasks):
+        child_shapes.append(await f)
+
+    compound = b3d.Compound(children=child_shapes)
+    compound.label = assembly.name
+    return compound.wrapped
+
+
+def bench_child(count: int, implementation: str) -> None:
+    pc.logging.setLevel("ERROR")
+    bolt = pc.Part("bench", {"name": "bolt", "cache": False}, shape=make_bolt())
+    assembly = pc.Assembly("bench", {"name": "fasteners", "cache": False})
+    for i in range(count):
+        assembly.add(bolt, f"bolt_{i}", b3d.Location((i % 100 * 10, i // 100 * 10, 0), (0, 0, 1), i % 360))
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    start = time.perf_counter()
+    if implementation == "legacy":
+        asyncio.run(legacy_get_shape(assembly, None))
+    else:
+        asyncio.run(assembly.get_shape(None))
+    elapsed = time.perf_counter() - start
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{elapsed} {max_rss} {max_rss - rss_before}")
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        bench_child(int(sys.argv[2]), sys.argv[3])
+        return
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    print("%d fasteners" % count)
+    for implementation in ("legacy", "shared"):
+        # A new process per measurement to get the peak memory usage of each one
+        output = subprocess.check_output([sys.executable, __file__, "--child", str(count), implementation], text=True)
+        elapsed, max_rss, growth = map(float, output.split()[-3:])
+        print("  %-7s %8.3fs  peak RSS %8.1f MB (+%.1f MB while building)" % (implementation, elapsed, max_rss, growth))
+
+
+if __name__ == "__main__":
+    main()
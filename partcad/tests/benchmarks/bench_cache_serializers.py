@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+#
+# PartCAD, 2025
+#
+# Licensed under Apache License, Version 2.0.
+#
+
+# Measures the write/read throughput and the on-disk size of the shape cache
+# entries produced by each serializer and compression, using the example parts.
+#
+# Usage: bench_cache_serializers.py [<repetitions>]   (default: 5)
+
+import glob
+import os
+import pickle
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+from OCP.IFSelect import IFSelect_RetDone
+from OCP.STEPControl import STEPControl_Reader
+
+from partcad import cache_serializer
+
+EXAMPLES_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "..", "examples")
+
+
+def load_examples() -> list:
+    shapes = []
+    for path in sorted(glob.glob(os.path.join(EXAMPLES_DIR, "**", "*.step"), recursive=True)):
+        reader = STEPControl_Reader()
+        if reader.ReadFile(path) != IFSelect_RetDone:
+            continue
+        reader.TransferRoots()
+        shapes.append(reader.OneShape())
+    return shapes
+
+
+def bench(shapes: list, dumps, loads, repetitions: int) -> dict:
+    entries = []
+    start = time.perf_counter()
+    for _ in range(repetitions):
+        entries = [dumps(shape) for shape in shapes]
+    write_time = (time.perf_counter() - start) / repetitions
+
+    start = time.perf_counter()
+    for _ in range(repetitions):
+        for entry in entries:
+            loads(entry)
+    read_time = (time.perf_counter() - start) / repetitions
+
+    return {
+        "bytes": sum(len(entry) for entry in entries),
+        "write": write_time,
+        "read": read_time,
+    }
+
+
+def main():
+    repetitions = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    shapes = load_examples()
+    print("%d example parts, %d repetitions" % (len(shapes), repetitions))
+
+    # Entries written before the serializers were introduced: pickled text BREP
+    cache_serializer.get_serializer("pickle")  # Registers the OCP reducers
+    results = [("legacy", "none", bench(shapes, pickle.dumps, pickle.loads, repetitions))]
+    for serializer in cache_serializer.SERIALIZERS:
+        for compression in cache_serializer.COMPRESSORS:
+            if cache_serializer.get_compressor(compression) is None:
+                print("  %-7s %-5s not installed" % (serializer, compression))
+                continue
+            dumps = lambda shape: cache_serializer.dumps(shape, [serializer], compression)
+            results.append((serializer, compression, bench(shapes, dumps, cache_serializer.loads, repetitions)))
+
+    mb = results[0][2]["bytes"] / 1024 / 1024
+    for serializer, compression, result in results:
+        print(
+            "  %-7s %-5s  size %8.2f MB  write %7.1f MB/s (%6.3fs)  read %7.1f MB/s (%6.3fs)"
+            % (
+                serializer,
+                compression,
+                result["bytes"] / 1024 / 1024,
+                mb / result["write"],
+                result["write"],
+                mb / result["read"],
+                result["read"],
+            )
+        )
+    print("(throughput is relative to the size of the legacy entries)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+#
+# PartCAD, 2025
+#
+# Licensed under Apache License, Version 2.0.
+#
+
+# Measures the throughput of each hash algorithm used for cache keys, hashing
+# a large file the way dependencies of shapes are hashed (chunked or mapped
+# in memory), and the peak memory used by each strategy.
+#
+# Usage: bench_hash.py [<file size in MB>]   (default: 1024)
+
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+from partcad import cache_digest_index
+from partcad.cache_hash_algorithms import ALGORITHMS, resolve_algorithm
+
+
+def bench_child(filename: str, algo: str, strategy: str) -> None:
+    if strategy == "read":
+        # What hashing used to do: load the whole file in memory
+        hasher = cache_digest_index.new_hasher(algo)
+        start = time.perf_counter()
+        with open(filename, "rb") as f:
+            hasher.update(f.read())
+        hasher.digest()
+    else:
+        if strategy == "chunked":
+            cache_digest_index.MMAP_MIN_SIZE = sys.maxsize
+        start = time.perf_counter()
+        cache_digest_index.hash_file(filename, algo)
+    elapsed = time.perf_counter() - start
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{elapsed} {max_rss}")
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        bench_child(*sys.argv[2:])
+        return
+
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 1024
+    with tempfile.NamedTemporaryFile(suffix=".step") as f:
+        chunk = os.urandom(1024 * 1024)
+        for _ in range(size_mb):
+            f.write(chunk)
+        f.flush()
+        print("%d MB file" % size_mb)
+
+        for algo in ALGORITHMS:
+            if resolve_algorithm(algo) != algo:
+                print("  %-9s not installed" % algo)
+                continue
+            for strategy in ("read", "chunked", "mmap"):
+                # A new process per measurement to get the peak memory usage of each one
+                output = subprocess.check_output(
+                    [sys.executable, __file__, "--child", f.name, algo, strategy],
+                    text=True,
+                )
+                elapsed, max_rss = map(float, output.split()[-2:])
+                print(
+                    "  %-9s %-8s %8.1f MB/s (%6.3fs)  peak RSS %7.1f MB"
+                    % (algo, strategy, size_mb / elapsed, elapsed, max_rss)
+                )
+        print("(the peak RSS of 'mmap' includes the mapped file pages, which are shared and reclaimable)")
+
+
+if __name__ == "__main__":
+    main()
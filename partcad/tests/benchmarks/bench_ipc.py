@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+#
+# PartCAD, 2025
+#
+# Licensed under Apache License, Version 2.0.
+#
+
+# Compares the legacy sandbox transport (pickled text BREP, base64 encoded)
+# with the binary framed transport (pickle protocol 5, out-of-band binary BREP)
+# by sending a compound of the given size to a python subprocess and back.
+#
+# Usage: bench_ipc.py [<payload size in MB> ...]   (default: 50 500)
+
+import base64
+import io
+import os
+import pickle
+import subprocess
+import sys
+import time
+
+WRAPPERS_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "src", "partcad", "wrappers")
+sys.path.append(WRAPPERS_DIR)
+
+from OCP.BinTools import BinTools
+from OCP.BRep import BRep_Builder
+from OCP.BRepPrimAPI import BRepPrimAPI_MakeSphere
+from OCP.gp import gp_Pnt
+from OCP.TopoDS import TopoDS_Compound
+
+import ipc_framing
+from ocp_serialize import out_of_band_dispatch_table, register as register_ocp_helper
+
+# The child process echoes the object back, the way wrapper scripts do
+LEGACY_CHILD = """
+import base64, pickle, sys
+sys.path.append(sys.argv[1])
+from ocp_serialize import register
+register()
+obj = pickle.loads(base64.b64decode(sys.stdin.read()))
+sys.stdout.write(base64.b64encode(pickle.dumps(obj)).decode())
+"""
+
+BINARY_CHILD = """
+import sys
+sys.path.append(sys.argv[1])
+import ipc_framing
+from ocp_serialize import out_of_band_dispatch_table, register
+register()
+obj = ipc_framing.loads(sys.stdin.buffer.read())
+ipc_framing.write_object(sys.stdout.buffer, obj, out_of_band_dispatch_table())
+"""
+
+
+def make_compound(size_mb: int) -> TopoDS_Compound:
+    builder = BRep_Builder()
+    compound = TopoDS_Compound()
+    builder.MakeCompound(compound)
+
+    # Estimate the number of solids needed to reach the requested size
+    probe = BRepPrimAPI_MakeSphere(gp_Pnt(0, 0, 0), 1.0).Shape()
+    with io.BytesIO() as bio:
+        BinTools.Write_s(probe, bio)
+        solid_size = len(bio.getvalue())
+    count = max(1, size_mb * 1024 * 1024 // solid_size)
+
+    for i in range(count):
+        builder.Add(compound, BRepPrimAPI_MakeSphere(gp_Pnt(i * 3.0, 0, 0), 1.0).Shape())
+    return compound
+
+
+def run_child(code: str, payload: bytes):
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-c", code, os.path.abspath(WRAPPERS_DIR)],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+    )
+    stdout, _ = process.communicate(payload)
+    elapsed = time.perf_counter() - start
+    if process.returncode != 0:
+        raise RuntimeError("the child process failed with exit code %d" % process.returncode)
+    return stdout, elapsed
+
+
+def bench_legacy(shape) -> dict:
+    register_ocp_helper()
+    start = time.perf_counter()
+    payload = base64.b64encode(pickle.dumps({"shape": shape})).decode().encode()
+    serialize_time = time.perf_counter() - start
+
+    stdout, child_time = run_child(LEGACY_CHILD, payload)
+
+    start = time.perf_counter()
+    pickle.loads(base64.b64decode(stdout))["shape"]
+    deserialize_time = time.perf_counter() - start
+    return {
+        "bytes": len(payload),
+        "serialize": serialize_time,
+        "child": child_time,
+        "deserialize": deserialize_time,
+    }
+
+
+def bench_binary(shape) -> dict:
+    register_ocp_helper()
+    start = time.perf_counter()
+    payload = ipc_framing.dumps({"shape": shape}, out_of_band_dispatch_table())
+    serialize_time = time.perf_counter() - start
+
+    stdout, child_time = run_child(BINARY_CHILD, payload)
+
+    start = time.perf_counter()
+    ipc_framing.loads(stdout)["shape"]
+    deserialize_time = time.perf_counter() - start
+    return {
+        "bytes": len(payload),
+        "serialize": serialize_time,
+        "child": child_time,
+        "deserialize": deserialize_time,
+    }
+
+
+def report(name: str, result: dict) -> None:
+    total = result["serialize"] + result["child"] + result["deserialize"]
+    print(
+        "  %-8s %10.1f MB  serialize %7.2fs  child %7.2fs  deserialize %7.2fs  total %7.2fs"
+        % (
+            name,
+            result["bytes"] / 1024 / 1024,
+            result["serialize"],
+            result["child"],
+            result["deserialize"],
+            total,
+        )
+    )
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [50, 500]
+    for size_mb in sizes:
+        shape = make_compound(size_mb)
+        print("Payload of ~%d MB:" % size_mb)
+        for name, bench in (("legacy", bench_legacy), ("binary", bench_binary)):
+            try:
+                report(name, bench(shape))
+            except (RuntimeError, MemoryError) as e:
+                # Large payloads may exhaust the memory with the legacy transport
+                print("  %-8s failed: %s" % (name, e))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+#
+# PartCAD, 2025
+#
+# Licensed under Apache License, Version 2.0.
+#
+
+# Measures the wall time and the peak RSS of loading large OBJ meshes with:
+#  - legacy: the line by line parser building a planar face per polygon,
+#  - faces: the NumPy parser building a planar face per polygon,
+#  - mesh: the NumPy parser building a single triangulated face.
+# Each load runs in a fresh interpreter, so that the peak RSS is its own.
+#
+# Usage: bench_obj.py [<faces> ...]   (default: 100000 1000000)
+#        PC_BENCH_LOADERS=mesh,faces bench_obj.py ...   (to skip the slow ones)
+
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+LOADERS = ["legacy", "faces", "mesh"]
+
+
+def write_mesh(path: str, faces: int) -> None:
+    """Writes a wavy grid of triangles"""
+    import numpy as np
+
+    side = int((faces // 2) ** 0.5) + 1
+    x, y = np.meshgrid(np.arange(side + 1, dtype=np.float64), np.arange(side + 1, dtype=np.float64))
+    z = np.sin(x / 7.0) * np.cos(y / 5.0)
+    vertices = np.stack([x.ravel(), y.ravel(), z.ravel()], axis=1)
+
+    corners = (np.arange(side)[None, :] + np.arange(side)[:, None] * (side + 1)).ravel() + 1
+    triangles = np.concatenate(
+        [
+            np.stack([corners, corners + 1, corners + side + 2], axis=1),
+            np.stack([corners, corners + side + 2, corners + side + 1], axis=1),
+        ]
+    )[:faces]
+
+    with open(path, "w") as f:
+        f.write("# %d vertices, %d faces\n" % (len(vertices), len(triangles)))
+        np.savetxt(f, vertices, fmt="v %.6f %.6f %.6f")
+        np.savetxt(f, triangles, fmt="f %d %d %d")
+
+
+def load_legacy(path: str):
+    from OCP.BRepBuilderAPI import BRepBuilderAPI_MakeFace, BRepBuilderAPI_MakePolygon
+    from OCP.gp import gp_Pnt
+    from partcad.part_factory_obj import create_compound
+
+    vertices = []
+    faces = []
+    with open(path, "r") as file:
+        for line in file:
+            if line.startswith("#"):
+                continue
+            if line.startswith("v "):
+                vertices.append(tuple(map(float, line.strip().split()[1:])))
+            elif line.startswith("f "):
+                faces.append([int(part.split("/")[0]) for part in line.strip().split()[1:]])
+
+    shape_faces = []
+    for face in faces:
+        polygon = BRepBuilderAPI_MakePolygon()
+        for vertex_idx in face:
+            x, y, z = vertices[vertex_idx - 1]
+            polygon.Add(gp_Pnt(x, y, z))
+        polygon.Close()
+        shape_faces.append(BRepBuilderAPI_MakeFace(polygon.Wire()).Face())
+    return create_compound(shape_faces)
+
+
+def run(loader: str, path: str) -> None:
+    from partcad.part_factory_obj import load_obj
+
+    # Import OCP before the measurement starts
+    import OCP.BRepBuilderAPI  # noqa: F401
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    if loader == "legacy":
+        shape = load_legacy(path)
+    else:
+        shape = load_obj(path, 0 if loader == "mesh" else sys.maxsize)
+    elapsed = time.perf_counter() - start
+    assert not shape.IsNull()
+
+    print(
+        json.dumps(
+            {
+                "time": elapsed,
+                "rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+                "rss_before": rss_before * 1024,
+            }
+        )
+    )
+
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == "--run":
+        run(sys.argv[2], sys.argv[3])
+        return
+
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100000, 1000000]
+    loaders = os.environ.get("PC_BENCH_LOADERS", ",".join(LOADERS)).split(",")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for faces in sizes:
+            path = os.path.join(tmp_dir, "mesh_%d.obj" % faces)
+            write_mesh(path, faces)
+            print("%d faces (%.1f MB):" % (faces, os.path.getsize(path) / 1024 / 1024))
+            for loader in loaders:
+                output = subprocess.run(
+                    [sys.executable, __file__, "--run", loader, path],
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                ).stdout
+                result = json.loads(output.strip().splitlines()[-1])
+                print(
+                    "  %-7s %8.2fs  peak RSS %7.1f MB (+%.1f MB)"
+                    % (
+                        loader,
+                        result["time"],
+                        result["rss"] / 1024 / 1024,
+                        (result["rss"] - result["rss_before"]) / 1024 / 1024,
+                    )
+                )
+
+
+if __name__ == "__main__":
+    main()
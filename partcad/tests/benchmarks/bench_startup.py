@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+#
+# PartCAD, 2025
+#
+# Licensed under Apache License, Version 2.0.
+#
+
+# Measures the start-up time of 'import partcad' and of 'pc --help', lists
+# the slowest imports reported by 'python -X importtime' and checks that none
+# of the heavy dependencies (CAD kernels, AI SDKs, Sentry...) is loaded until
+# it is used.
+#
+# Usage: bench_startup.py [<budget for 'pc --help' in ms>]   (default: 300)
+#
+# Exits with a non-zero status if the budget is exceeded or if a heavy module
+# is imported at start-up.
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SRC_DIRS = [
+    os.path.join(os.path.dirname(__file__), "..", "..", "src"),
+    os.path.join(os.path.dirname(__file__), "..", "..", "..", "partcad-cli", "src"),
+]
+
+HEAVY_MODULES = [
+    "build123d",
+    "cadquery",
+    "OCP",
+    "sentry_sdk",
+    "docker",
+    "git",
+    "openai",
+    "anthropic",
+    "google.generativeai",
+    "PIL",
+]
+
+SCRIPTS = {
+    "import partcad": "import partcad",
+    "pc --help": (
+        "import sys\n"
+        "sys.argv = ['pc', '--help']\n"
+        "from partcad_cli.click.command import cli\n"
+        "try:\n"
+        "    cli()\n"
+        "except SystemExit:\n"
+        "    pass\n"
+    ),
+}
+
+RUNS = 5
+TOP_IMPORTS = 10
+
+
+def get_env() -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [os.path.abspath(d) for d in SRC_DIRS] + ([env["PYTHONPATH"]] if env.get("PYTHONPATH") else [])
+    )
+    return env
+
+
+def measure(script: str) -> float:
+    """Returns the median wall time of running the script, in ms"""
+    times = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", script], env=get_env(), capture_output=True, check=True)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def import_times(script: str) -> list[tuple[int, int, str]]:
+    """Returns the cumulative import time (in us), the nesting level and the name of each imported module"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script], env=get_env(), capture_output=True, text=True
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self, cumulative, name = line[len("import time:") :].split("|")
+        level = (len(name) - len(name.lstrip()) - 1) // 2
+        modules.append((int(cumulative), level, name.strip()))
+    return modules
+
+
+def main():
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else 300.0
+    failed = False
+
+    baseline = measure("pass")
+    print("python -c pass: %8.1f ms" % baseline)
+
+    for title, script in SCRIPTS.items():
+        elapsed = measure(script)
+        modules = import_times(script)
+        print("%-14s: %8.1f ms (%d modules imported)" % (title, elapsed, len(modules)))
+
+        # Only the top-level imports, sorted by their cumulative time
+        top_level = sorted([(cumulative, name) for cumulative, level, name in modules if level == 0], reverse=True)
+        for cumulative, name in top_level[:TOP_IMPORTS]:
+            print("    %8.1f ms  %s" % (cumulative / 1000, name))
+
+        loaded = {name for _, _, name in modules}
+        heavy = [m for m in HEAVY_MODULES if m in loaded]
+        if heavy:
+            print("    ERROR: heavy modules imported at start-up: %s" % ", ".join(heavy))
+            failed = True
+
+        if title == "pc --help" and elapsed > budget:
+            print("    ERROR: over the budget of %.0f ms" % budget)
+            failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+#
+# PartCAD, 2025
+#
+# Licensed under Apache License, Version 2.0.
+#
+
+# Measures the extraction of the triangulation of the example assemblies
+# (lists of tuples vs NumPy arrays) and the writers of the mesh formats
+# (line by line and json.dumps vs the writers consuming the arrays).
+#
+# Usage: bench_tessellation.py [<tolerance>]   (default: 0.01, relative to the size of the faces)
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+from OCP.BRepMesh import BRepMesh_IncrementalMesh
+
+import partcad as pc
+from partcad import utils_ocp
+
+EXAMPLES_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "..", "examples")
+ASSEMBLIES = [
+    "//produce_assembly_assy:primitive",
+    "//produce_assembly_assy:logo",
+    "//produce_assembly_assy:logo_embedded",
+]
+
+
+def write_obj_legacy(path, vertices, triangles):
+    with open(path, "w", encoding="utf-8", buffering=256 * 1024) as f:
+        f.write("# OBJ file\n")
+        for v in vertices:
+            f.write(f"v {v[0]:.4f} {v[1]:.4f} {v[2]:.4f}\n")
+        for p in triangles:
+            f.write("f")
+            for i in p:
+                f.write(" %d" % (i + 1))
+            f.write("\n")
+
+
+def write_threejs_legacy(path, vertices, triangles):
+    result = {
+        "vertices": [[x, y, z] for [x, y, z] in vertices],
+        "faces": [[0, i, j, k] for [i, j, k] in triangles],
+        "nVertices": len(vertices),
+        "nFaces": len(triangles),
+    }
+    with open(path, "w", encoding="utf-8", buffering=256 * 1024) as f:
+        f.write(json.dumps(result))
+
+
+def measure(method, *args):
+    start = time.perf_counter()
+    result = method(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    tolerance = float(sys.argv[1]) if len(sys.argv) > 1 else 0.01
+
+    user_config = pc.UserConfig()
+    user_config.cache = False
+    ctx = pc.init(EXAMPLES_DIR, user_config=user_config)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = lambda extension: os.path.join(tmp_dir, "out." + extension)
+
+        for name in ASSEMBLIES:
+            assembly = ctx.get_assembly(name)
+            shape = asyncio.run(assembly.get_wrapped(ctx)) if assembly is not None else None
+            if shape is None:
+                print("%s: failed to build" % name)
+                continue
+            BRepMesh_IncrementalMesh(shape, tolerance, True, 0.1, True)
+
+            legacy_time, (vertices, triangles) = measure(utils_ocp.get_tessellation, shape)
+            arrays_time, (vertex_array, triangle_array) = measure(utils_ocp.get_tessellation_arrays, shape)
+            print("%s: %d vertices, %d triangles" % (name, len(vertices), len(triangles)))
+            print("  tessellation  lists %7.3fs  arrays %7.3fs" % (legacy_time, arrays_time))
+
+            writers = [
+                (
+                    "obj",
+                    "obj",
+                    lambda: write_obj_legacy(path("obj"), vertices, triangles),
+                    lambda: utils_ocp.write_obj(path("obj"), vertex_array, triangle_array),
+                ),
+                (
+                    "threejs",
+                    "json",
+                    lambda: write_threejs_legacy(path("json"), vertices, triangles),
+                    lambda: utils_ocp.write_threejs(path("json"), vertex_array, triangle_array),
+                ),
+                (
+                    "threejs buffer",
+                    "json",
+                    None,
+                    lambda: utils_ocp.write_threejs(path("json"), vertex_array, triangle_array, True),
+                ),
+            ]
+            for format_name, extension, legacy, writer in writers:
+                if legacy is not None:
+                    legacy_time, _ = measure(legacy)
+                    legacy_size = os.path.getsize(path(extension))
+                    legacy_stats = "%7.3fs %8.1f KB" % (legacy_time, legacy_size / 1024)
+                else:
+                    legacy_stats = "%18s" % "-"
+                writer_time, _ = measure(writer)
+                size = os.path.getsize(path(extension))
+                print(
+                    "  %-14s legacy %s  arrays %7.3fs %8.1f KB" % (format_name, legacy_stats, writer_time, size / 1024)
+                )
+
+
+if __name__ == "__main__":
+    main()
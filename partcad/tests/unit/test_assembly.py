@@ -61,3 +61,99 @@ def test_assembly_example_assy_logo_bom():
     assert bom is not None
     assert len(bom.keys()) == 3
     assert sum(bom.values()) == 5
+
+
+def test_assembly_shared_instances():
+    from OCP.TopoDS import TopoDS_Iterator
+
+    ctx = pc.init("examples")
+    cube = ctx.get_part("//produce_part_cadquery_primitive:cube")
+    cylinder = ctx.get_part("//produce_part_cadquery_primitive:cylinder")
+
+    model = pc.Assembly({"name": "fasteners"})
+    for i in range(3):
+        model.add(cube, loc=pc.Location((i * 10, 0, 0), (0, 0, 1), 0))
+    model.add(cylinder, loc=pc.Location((0, 10, 0), (0, 0, 1), 0))
+    compound = asyncio.run(model.get_wrapped(ctx))
+
+    it = TopoDS_Iterator(compound)
+    instances = []
+    while it.More():
+        instances.append(it.Value())
+        it.Next()
+    assert len(instances) == 4
+    # The children are in the order they were added, the cubes share the same geometry
+    assert [shape.Location().Transformation().TranslationPart().X() for shape in instances] == [0, 10, 20, 0]
+    assert instances[0].TShape() == instances[1].TShape() == instances[2].TShape()
+    assert instances[0].TShape() != instances[3].TShape()
+
+
+def test_assembly_incremental_rebuild(tmp_path):
+    import types
+
+    from OCP.BRepPrimAPI import BRepPrimAPI_MakeBox
+    from partcad.cache_memory import MemoryCache
+    from partcad.cache_shape import ShapeCache
+
+    user_config = types.SimpleNamespace(
+        internal_state_dir=str(tmp_path),
+        cache=True,
+        cache_min_entry_size=0,
+        cache_max_entry_size=10 * 1024 * 1024,
+        cache_memory_max_entry_size=100 * 1024 * 1024,
+        cache_memory_double_cache_max_entry_size=1024 * 1024,
+        cache_serialization="brep",
+        cache_compression="none",
+        cache_max_size=0,
+        cache_eviction_policy="lru",
+        cache_hash_algorithm="md5",
+        cache_dependencies_paranoid=False,
+    )
+
+    def build(bolt_size: float):
+        # A new process would construct all objects again
+        ctx = types.SimpleNamespace(
+            user_config=user_config,
+            cache_shapes=ShapeCache(user_config=user_config),
+            cache_memory=MemoryCache(),
+        )
+
+        def part(name, size):
+            part = pc.Part("test", {"name": name})
+            part.hash.add_string(f"{name}-{size}")
+            part.instantiate = lambda _: None
+            part.get_shape = lambda _: asyncio.sleep(0, BRepPrimAPI_MakeBox(size, size, size).Shape())
+            return part
+
+        frame = pc.Assembly("test", {"name": "frame", "child": True})
+        frame.add(part("beam", 100.0), "beam")
+        fasteners = pc.Assembly("test", {"name": "fasteners", "child": True})
+        fasteners.add(part("bolt", bolt_size), "bolt", pc.Location((10, 0, 0), (0, 0, 1), 0))
+        top = pc.Assembly("test", {"name": "top"})
+        top.add(frame, "frame")
+        top.add(fasteners, "fasteners")
+        assert asyncio.run(top.get_wrapped(ctx)) is not None
+        return {name: status for _, name, status in top.explain_rebuild()}
+
+    assert build(1.0) == {
+        "top": "rebuilt",
+        "frame": "rebuilt",
+        "beam": "rebuilt",
+        "fasteners": "rebuilt",
+        "bolt": "rebuilt",
+    }
+    assert build(1.0) == {
+        "top": "reused",
+        "frame": "not loaded",
+        "beam": "not loaded",
+        "fasteners": "not loaded",
+        "bolt": "not loaded",
+    }
+    # Only the path from the modified part to the root is rebuilt
+    assert build(2.0) == {
+        "top": "rebuilt",
+        "frame": "reused",
+        "beam": "not loaded",
+        "fasteners": "rebuilt",
+        "bolt": "rebuilt",
+    }
@@ -0,0 +1,141 @@
+#
+# PartCAD, 2025
+#
+# Licensed under Apache License, Version 2.0.
+#
+
+import hashlib
+import os
+from pathlib import Path
+import types
+
+import pytest
+
+from partcad import cache_digest_index
+from partcad.cache_digest_index import DigestIndex, get_file_digests, hash_file
+from partcad.cache_hash_algorithms import resolve_algorithm
+from partcad import cache_hash
+from partcad.cache_hash import CacheHash, serialize_dict
+
+
+@pytest.fixture
+def user_config(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_digest_index, "RACY_INTERVAL", 0.0)
+    return types.SimpleNamespace(
+        internal_state_dir=str(tmp_path),
+        cache_hash_algorithm="md5",
+        cache_dependencies_paranoid=False,
+    )
+
+
+def write_file(path, data: bytes, mtime_ns: int) -> str:
+    path.write_bytes(data)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+    return str(path)
+
+
+def test_file_digests_order(tmp_path, user_config):
+    filenames = [write_file(tmp_path / f"{i}.step", bytes([i]) * (i + 1), 10**18) for i in range(20)]
+    filenames.insert(5, str(tmp_path / "missing.step"))
+
+    digests = get_file_digests(filenames, "md5", user_config)
+    assert digests[5] is None
+    assert digests[6] == hashlib.md5(bytes([5]) * 6).digest()
+    assert [d for d in digests if d is not None] == [hashlib.md5(bytes([i]) * (i + 1)).digest() for i in range(20)]
+
+
+def test_file_digests_stat_fast_path(tmp_path, user_config):
+    filename = write_file(tmp_path / "part.stl", b"solid 1", 10**18)
+    assert get_file_digests([filename], "md5", user_config) == [hashlib.md5(b"solid 1").digest()]
+
+    # Same size and modification time: the stale digest is trusted
+    write_file(tmp_path / "part.stl", b"solid 2", 10**18)
+    assert get_file_digests([filename], "md5", user_config) == [hashlib.md5(b"solid 1").digest()]
+    # ...unless in the paranoid mode
+    user_config.cache_dependencies_paranoid = True
+    assert get_file_digests([filename], "md5", user_config) == [hashlib.md5(b"solid 2").digest()]
+    user_config.cache_dependencies_paranoid = False
+
+    # Any change to the modification time is detected
+    write_file(tmp_path / "part.stl", b"solid 2", 10**18 + 1)
+    assert get_file_digests([filename], "md5", user_config) == [hashlib.md5(b"solid 2").digest()]
+
+    # The index is persistent
+    digest = DigestIndex(tmp_path / "cache").lookup(filename, "md5", os.stat(filename))
+    assert digest == hashlib.md5(b"solid 2").digest()
+
+
+def test_cache_hash_dependencies(tmp_path, user_config):
+    filenames = [write_file(tmp_path / f"{i}.py", f"print({i})".encode(), 10**18) for i in range(3)]
+
+    def get_hash(dependencies: list[str]) -> str:
+        cache_hash = CacheHash("test", cache=True, user_config=user_config)
+        cache_hash.add_string("test")
+        cache_hash.set_dependencies(dependencies)
+        return cache_hash.get()
+
+    assert get_hash(filenames) == get_hash(filenames)
+    assert get_hash(filenames) != get_hash(list(reversed(filenames)))
+    assert get_hash(filenames) != get_hash(filenames[:2])
+
+
+@pytest.mark.parametrize("algo", ["md5", "sha256", "blake2b", "blake2s", "blake3", "xxh3_128"])
+def test_cache_hash_algorithms(algo):
+    def get_hash() -> str:
+        cache_hash = CacheHash("test", algo=algo, cache=True)
+        cache_hash.add_dict({"parameters": {"size": 1}})
+        return cache_hash.get()
+
+    key = get_hash()
+    assert key == get_hash()
+    if algo == "md5":
+        assert key == hashlib.md5(b'{"parameters":{"size":1}}').hexdigest()
+    elif resolve_algorithm(algo) == algo:
+        assert key.startswith(f"{algo}-")
+
+
+def test_hash_file_mmap(tmp_path, monkeypatch):
+    filename = write_file(tmp_path / "large.step", os.urandom(3 * 1024 * 1024 + 7), 10**18)
+    expected = hashlib.blake2b(Path(filename).read_bytes(), digest_size=32).digest()
+    assert hash_file(filename, "blake2b") == expected
+
+    monkeypatch.setattr(cache_digest_index, "MMAP_MIN_SIZE", 1024)
+    monkeypatch.setattr(cache_digest_index, "MMAP_CHUNK_SIZE", 1024 * 1024)
+    assert hash_file(filename, "blake2b") == expected
+
+
+def test_serialize_dict():
+    assert serialize_dict({"b": (1, 2), "a": {"d": None, "c": 1.5}}) == b'{"a":{"c":1.5,"d":null},"b":[1,2]}'
+    # Not affected by the order of the keys and items of sets
+    assert serialize_dict({"a": 1, "b": {"y", "x"}}) == serialize_dict({"b": {"x", "y"}, "a": 1})
+    # The order of tuple items matters, e.g. for offsets
+    assert serialize_dict({"offset": (1, 0, 0)}) != serialize_dict({"offset": (0, 0, 1)})
+    # Keys of different types and non-JSON values
+    assert serialize_dict({1: "a", "b": Path("c")}) == b'{"1":"a","b":"c"}'
+
+
+def test_cache_hash_lazy(tmp_path, user_config):
+    computed = cache_hash.get_computed_count()
+    config = {"parameters": {"size": 1}}
+    lazy = CacheHash("lazy", cache=True, user_config=user_config)
+    lazy.add_dict(config)
+    lazy.add_filename(write_file(tmp_path / "part.py", b"print(1)", 10**18))
+    lazy.add_filename(str(tmp_path / "missing.py"))
+    lazy.add_string("end")
+    # Nothing is hashed until the key is needed
+    assert lazy.hasher is None
+    assert cache_hash.get_computed_count() == computed
+
+    # The dictionaries are captured when added
+    config["parameters"]["size"] = 2
+    key = lazy.get()
+    assert key == hashlib.md5(b'{"parameters":{"size":1}}' + hashlib.md5(b"print(1)").digest() + b"end").hexdigest()
+    assert lazy.get() == key
+    assert cache_hash.get_computed_count() == computed + 1
+    # The digests are recorded in the internal state folder of the given config
+    assert (tmp_path / "cache" / ".index" / "digests.sqlite").exists()
+
+    # Only missing files
+    empty = CacheHash("empty", cache=True, user_config=user_config)
+    empty.add_filename(str(tmp_path / "missing.py"))
+    assert empty.get() is None
@@ -0,0 +1,100 @@
+#
+# PartCAD, 2025
+#
+# Licensed under Apache License, Version 2.0.
+#
+
+import asyncio
+import os
+import time
+import types
+
+from partcad.cache import Cache
+from partcad.cache_hash import CacheHash
+from partcad.cache_index import CacheIndex, EVICTION_POLICY_LFU
+
+
+def write_entry(cache_dir, data_type: str, name: str, size: int) -> None:
+    os.makedirs(cache_dir / data_type, exist_ok=True)
+    (cache_dir / data_type / name).write_bytes(b"x" * size)
+
+
+def test_cache_index_lru_eviction(tmp_path):
+    index = CacheIndex(tmp_path, max_size=3000)
+    for i in range(4):
+        write_entry(tmp_path, "shapes", f"{i}.part", 1000)
+        index.record_write("shapes", f"{i}.part", 1000)
+        time.sleep(0.01)
+    # Entry 0 is the oldest but it is the most recently used now
+    index.record_hit("shapes", "0.part")
+    index.flush()
+
+    assert index.get_total_size() == 4000
+    assert index.evict() == (2, 2000)
+    assert sorted(os.listdir(tmp_path / "shapes")) == ["0.part", "3.part"]
+    assert index.get_total_size() == 2000
+    index.close()
+
+
+def test_cache_index_lfu_eviction(tmp_path):
+    index = CacheIndex(tmp_path, max_size=2500, policy=EVICTION_POLICY_LFU)
+    for i in range(3):
+        write_entry(tmp_path, "shapes", f"{i}.part", 1000)
+        index.record_write("shapes", f"{i}.part", 1000)
+    for _ in range(3):
+        index.record_hit("shapes", "0.part")
+    index.record_hit("shapes", "2.part")
+    index.flush()
+
+    assert index.evict() == (1, 1000)
+    assert sorted(os.listdir(tmp_path / "shapes")) == ["0.part", "2.part"]
+    index.close()
+
+
+def test_cache_index_gc(tmp_path):
+    # Entries written before the index existed
+    write_entry(tmp_path, "shapes", "a.part", 1000)
+    write_entry(tmp_path, "tests", "a.test", 1)
+    index = CacheIndex(tmp_path)
+    index.record_write("shapes", "removed.part", 1000)
+
+    assert index.gc() == (0, 0)
+    stats = index.get_stats()
+    assert stats["shapes"]["entries"] == 1
+    assert stats["shapes"]["bytes"] == 1000
+    assert stats["tests"]["entries"] == 1
+
+    assert index.gc(max_size=500) == (1, 1000)
+    assert not os.path.exists(tmp_path / "shapes" / "a.part")
+
+    assert index.gc(max_size=0) == (1, 1)
+    assert index.get_total_size() == 0
+    assert not os.path.exists(tmp_path / "tests" / "a.test")
+    index.close()
+
+
+def test_cache_index_stats(tmp_path):
+    user_config = types.SimpleNamespace(
+        internal_state_dir=str(tmp_path),
+        cache=True,
+        cache_min_entry_size=0,
+        cache_max_entry_size=1024,
+        cache_max_size=0,
+        cache_eviction_policy="lru",
+    )
+    cache = Cache("tests", user_config)
+    cache_hash = CacheHash("test", cache=True)
+    cache_hash.add_string("test")
+
+    async def run():
+        await cache.read_data_async(cache_hash, ["result"])
+        await cache.write_data_async(cache_hash, {"result": bytes([1])})
+        await cache.read_data_async(cache_hash, ["result"])
+        await cache.read_data_async(cache_hash, ["result"])
+
+    asyncio.run(run())
+    stats = cache.index.get_stats()["tests"]
+    assert (stats["hits"], stats["misses"]) == (2, 1)
+    # The result and the name of the hashed object
+    assert stats["entries"] == 2
+    cache.index.close()
@@ -0,0 +1,53 @@
+#
+# PartCAD, 2025
+#
+# Licensed under Apache License, Version 2.0.
+#
+
+import gc
+
+from OCP.BRepMesh import BRepMesh_IncrementalMesh
+from OCP.BRepPrimAPI import BRepPrimAPI_MakeBox
+
+from partcad.cache_memory import MemoryCache, estimate_size, FACE_SIZE
+
+
+class Owner:
+    def __init__(self, wrapped):
+        self._wrapped = wrapped
+
+    def drop_wrapped(self):
+        self._wrapped = None
+
+
+def test_estimate_size():
+    box = BRepPrimAPI_MakeBox(10.0, 20.0, 30.0).Shape()
+    assert estimate_size(box) == 6 * FACE_SIZE
+    # Shared geometry is only counted once
+    assert estimate_size([box, box]) == 2 * 6 * FACE_SIZE
+    BRepMesh_IncrementalMesh(box, 0.1)
+    assert estimate_size(box) > 6 * FACE_SIZE
+    assert estimate_size(b"1234") == 4
+
+
+def test_memory_cache_lru():
+    cache = MemoryCache(max_size=300)
+    owners = [Owner(i) for i in range(3)]
+    for owner in owners:
+        assert cache.put(owner, 100)
+    # The first owner is now the most recently used
+    cache.touch(owners[0])
+
+    owner = Owner(3)
+    assert cache.put(owner, 100)
+    assert owners[1]._wrapped is None
+    assert owners[0]._wrapped == 0 and owners[2]._wrapped == 2
+    assert cache.get_stats() == {"entries": 3, "bytes": 300, "hits": 1, "evictions": 1}
+
+    # Too big to be kept in memory at all
+    assert not cache.put(Owner(4), 301)
+
+    # Garbage collected owners are not accounted for anymore
+    del owner
+    gc.collect()
+    assert cache.get_stats()["bytes"] == 200
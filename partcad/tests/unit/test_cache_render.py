@@ -0,0 +1,85 @@
+#
+# PartCAD, 2025
+#
+# Licensed under Apache License, Version 2.0.
+#
+
+import os
+import types
+
+import pytest
+
+from partcad.cache_render import RenderCache, get_wrapper_files, normalize_options
+
+
+@pytest.fixture
+def user_config(tmp_path):
+    return types.SimpleNamespace(
+        internal_state_dir=str(tmp_path / "state"),
+        cache=True,
+        cache_min_entry_size=100,
+        cache_max_entry_size=10 * 1024 * 1024,
+        cache_max_size=0,
+        cache_eviction_policy="lru",
+        cache_hash_algorithm="md5",
+        cache_dependencies_paranoid=False,
+    )
+
+
+def test_render_cache_options(user_config):
+    assert normalize_options({"width": 512, "viewport_origin": (100, -100, 100)}) == {
+        "width": 512.0,
+        "viewport_origin": [100.0, -100.0, 100.0],
+    }
+
+    cache = RenderCache(user_config=user_config)
+
+    def get_key(format_name, options):
+        return cache.get_hash("//pkg:part", "shape", format_name, options).get()
+
+    assert get_key("svg", {"line_weight": 1}) == get_key("svg", {"line_weight": 1.0})
+    assert get_key("svg", {"line_weight": 1}) != get_key("png", {"line_weight": 1})
+
+
+def test_render_cache_wrapper_files():
+    for format_name in ["stl", "obj", "threejs", "3mf", "gltf"]:
+        filenames = [os.path.basename(filename) for filename in get_wrapper_files(format_name)]
+        assert "wrapper_render_mesh.py" in filenames and "utils_ocp.py" in filenames
+    assert "wrapper_render_svg.py" in [os.path.basename(f) for f in get_wrapper_files("png")]
+    for format_name in ["svg", "png", "stl", "step"]:
+        assert all(os.path.exists(filename) for filename in get_wrapper_files(format_name))
+
+
+def test_render_cache_roundtrip(tmp_path, user_config):
+    cache = RenderCache(user_config=user_config)
+
+    def get_hash(options):
+        return cache.get_hash("//pkg:part", "shape", "stl", options)
+
+    assert get_hash({"tolerance": 0.1}).get() == get_hash({"tolerance": 0.1}).get()
+    assert get_hash({"tolerance": 0.1}).get() != get_hash({"tolerance": 0.5}).get()
+
+    path = str(tmp_path / "out" / "part.stl")
+    assert not cache.restore(get_hash({"tolerance": 0.1}), "stl", path)
+
+    os.makedirs(os.path.dirname(path))
+    with open(path, "w") as f:
+        f.write("solid part")
+    cache.store(get_hash({"tolerance": 0.1}), "stl", path)
+
+    os.remove(path)
+    assert cache.restore(get_hash({"tolerance": 0.1}), "stl", path)
+    with open(path) as f:
+        assert f.read() == "solid part"
+    # Restoring the file it is linked to is a no-op
+    assert cache.restore(get_hash({"tolerance": 0.1}), "stl", path)
+    assert cache.get_stats() == {"stl": (2, 1)}
+
+    # Rendering the file again keeps the cached file
+    assert not cache.restore(get_hash({"tolerance": 0.5}), "stl", path)
+    cache.detach(path)
+    with open(path, "w") as f:
+        f.write("solid coarse part")
+    assert cache.restore(get_hash({"tolerance": 0.1}), "stl", path)
+    with open(path) as f:
+        assert f.read() == "solid part"
@@ -0,0 +1,93 @@
+#
+# PartCAD, 2025
+#
+# Licensed under Apache License, Version 2.0.
+#
+
+import asyncio
+import pickle
+import types
+
+import pytest
+from OCP.BRepPrimAPI import BRepPrimAPI_MakeBox
+from OCP.GProp import GProp_GProps
+from OCP.BRepGProp import BRepGProp
+from OCP.TopoDS import TopoDS_Solid
+
+from partcad import cache_serializer
+from partcad.cache_hash import CacheHash
+from partcad.cache_shape import ShapeCache
+
+
+def volume(shape) -> float:
+    props = GProp_GProps()
+    BRepGProp.VolumeProperties_s(shape, props)
+    return props.Mass()
+
+
+@pytest.fixture
+def box():
+    return BRepPrimAPI_MakeBox(10.0, 20.0, 30.0).Shape()
+
+
+@pytest.fixture
+def user_config(tmp_path):
+    return types.SimpleNamespace(
+        internal_state_dir=str(tmp_path),
+        cache=True,
+        cache_min_entry_size=100,
+        cache_max_entry_size=10 * 1024 * 1024,
+        cache_memory_max_entry_size=100 * 1024 * 1024,
+        cache_memory_double_cache_max_entry_size=1024 * 1024,
+        cache_serialization="brep",
+        cache_compression="none",
+        cache_max_size=0,
+        cache_eviction_policy="lru",
+    )
+
+
+@pytest.mark.parametrize("serialization", ["brep", "pickle"])
+@pytest.mark.parametrize("compression", ["none", "zstd", "lz4"])
+def test_cache_serializer_roundtrip(box, serialization, compression):
+    if compression != "none" and cache_serializer.get_compressor(compression) is None:
+        pytest.skip(f"'{compression}' is not installed")
+    data = cache_serializer.dumps(box, [serialization], compression)
+    assert data.startswith(cache_serializer.ENTRY_MAGIC)
+    shape = cache_serializer.loads(data)
+    assert isinstance(shape, TopoDS_Solid)
+    assert volume(shape) == pytest.approx(6000.0)
+
+
+def test_cache_serializer_fallback(box):
+    # BREP can only store a single shape, pickle is used instead
+    data = cache_serializer.dumps([box, [box]], ["brep", "pickle"])
+    _, _, serializer_id, _ = cache_serializer.ENTRY_HEADER.unpack_from(data)
+    assert serializer_id == cache_serializer.PickleSerializer.id
+    components = cache_serializer.loads(data)
+    assert volume(components[1][0]) == pytest.approx(6000.0)
+
+
+def test_cache_serializer_legacy_entries(box):
+    cache_serializer.get_serializer("pickle")  # Registers the OCP reducers
+    assert cache_serializer.loads(pickle.dumps(bytes([1]))) == bytes([1])
+    assert volume(cache_serializer.loads(pickle.dumps(box))) == pytest.approx(6000.0)
+
+
+def test_shape_cache_roundtrip(box, user_config):
+    cache = ShapeCache(user_config=user_config)
+    cache_hash = CacheHash("box", cache=True)
+    cache_hash.add_string("box")
+
+    async def roundtrip():
+        await cache.write_async(cache_hash, {"part": box, "cmps": [box]})
+        return await cache.read_async(cache_hash, ["part", "cmps", "missing"])
+
+    cached, in_memory = asyncio.run(roundtrip())
+    assert volume(cached["part"]) == pytest.approx(6000.0)
+    assert volume(cached["cmps"][0]) == pytest.approx(6000.0)
+    assert cached["missing"] is None
+    assert in_memory["part"] and not in_memory["missing"]
+
+    part_data = (cache.get_cache_path(cache_hash).with_suffix(".part")).read_bytes()
+    _, _, serializer_id, _ = cache_serializer.ENTRY_HEADER.unpack_from(part_data)
+    assert serializer_id == cache_serializer.BrepSerializer.id
@@ -10,6 +10,7 @@
 
 import pytest
 import asyncio
+import os
 import partcad as pc
 from unittest.mock import patch
 
@@ -94,3 +95,32 @@ def test_offline_mode(variation):
                 assert ctx.is_connected() == (has_connection and not offline)
                 if (should_check_connection or force_update) and not offline:
                     check_connectivity_mock.assert_called_once()
+
+
+def test_ctx_import_all(tmp_path):
+    (tmp_path / "partcad.yaml").write_text("name: //\n")
+    for i in range(3):
+        (tmp_path / f"p{i}" / "q").mkdir(parents=True)
+        (tmp_path / f"p{i}" / "partcad.yaml").write_text("parts:\n  a: {type: cadquery}\n")
+        (tmp_path / f"p{i}" / "q" / "partcad.yaml").write_text("parts:\n  b: {type: cadquery}\n")
+    # Not a package
+    (tmp_path / "data").mkdir()
+
+    ctx = pc.Context(str(tmp_path), user_config=pc.UserConfig())
+    packages = ctx.get_all_packages()
+    assert sorted(p["name"] for p in packages) == ["//p0", "//p0/q", "//p1", "//p1/q", "//p2", "//p2/q"]
+    assert all(name in ctx.package_timings for name in ctx.projects)
+    assert ctx.get_project("//").get_child_project_names(absolute=False) == ["p0", "p1", "p2"]
+    assert ctx.get_package_subdirs(str(tmp_path / "p1")) == ["q"]
+
+    # Packages added later are found
+    (tmp_path / "p1" / "r").mkdir()
+    (tmp_path / "p1" / "r" / "partcad.yaml").write_text("parts:\n  c: {type: cadquery}\n")
+    os.utime(tmp_path / "p1", ns=(10**18, 10**18))
+    assert ctx.get_package_subdirs(str(tmp_path / "p1")) == ["q", "r"]
+
+    # Packages created in the existing subfolders are found
+    assert ctx.get_package_subdirs(str(tmp_path)) == ["p0", "p1", "p2"]
+    (tmp_path / "data" / "partcad.yaml").write_text("parts:\n  d: {type: cadquery}\n")
+    os.utime(tmp_path / "data", ns=(10**18, 10**18))
+    assert ctx.get_package_subdirs(str(tmp_path)) == ["data", "p0", "p1", "p2"]
@@ -0,0 +1,65 @@
+#
+# PartCAD, 2025
+#
+# Licensed under Apache License, Version 2.0.
+#
+
+import io
+import pickle
+
+import pytest
+from OCP.BRepPrimAPI import BRepPrimAPI_MakeBox
+from OCP.GProp import GProp_GProps
+from OCP.BRepGProp import BRepGProp
+
+from partcad import wrapper
+from partcad.wrappers import ipc_framing
+
+
+def volume(shape) -> float:
+    props = GProp_GProps()
+    BRepGProp.VolumeProperties_s(shape, props)
+    return props.Mass()
+
+
+def test_ipc_framing_messages():
+    stream = io.BytesIO()
+    ipc_framing.write_message(stream, {"op": "ping"})
+    ipc_framing.write_message(stream, {"op": "run", "stdin": b"\x00" * 1024})
+    stream.seek(0)
+    assert ipc_framing.read_message(stream) == {"op": "ping"}
+    assert ipc_framing.read_message(stream) == {"op": "run", "stdin": b"\x00" * 1024}
+    with pytest.raises(EOFError):
+        ipc_framing.read_message(stream)
+
+
+def test_ipc_framing_truncated_message():
+    stream = io.BytesIO()
+    ipc_framing.write_message(stream, {"op": "ping"})
+    stream = io.BytesIO(stream.getvalue()[:-1])
+    with pytest.raises(EOFError):
+        ipc_framing.read_message(stream)
+
+
+def test_ipc_framing_out_of_band_buffers():
+    blob = bytearray(b"x" * 100000)
+    data = ipc_framing.dumps({"blob": pickle.PickleBuffer(blob)})
+    # The blob is not copied into the pickle stream
+    assert len(data) < 100000 + 100
+    result = ipc_framing.loads(data)
+    assert bytes(result["blob"]) == bytes(blob)
+
+
+def test_ipc_framing_skips_garbage():
+    data = b"Some library printed this\n" + ipc_framing.dumps({"success": True})
+    assert ipc_framing.loads(data) == {"success": True}
+    with pytest.raises(ipc_framing.FrameError):
+        ipc_framing.loads(b"no object here")
+
+
+def test_ipc_framing_shapes():
+    box = BRepPrimAPI_MakeBox(10.0, 20.0, 30.0).Shape()
+    request = wrapper.serialize_request({"shape": box, "shapes": [box, box]})
+    response = wrapper.deserialize_response(request)
+    assert volume(response["shape"]) == pytest.approx(6000.0)
+    assert len(response["shapes"]) == 2
@@ -114,6 +114,24 @@ def test_part_get_obj_2():
     assert wrapped is not None
 
 
+def test_part_obj_mesh(tmp_path):
+    """Load an OBJ file as planar faces and as a single triangulated face"""
+    from partcad.part_factory_obj import load_obj
+    from partcad.utils_ocp import get_faces, tessellate
+
+    path = tmp_path / "quads.obj"
+    path.write_text("v 0 0 0\nv 1 0 0\nv 1 1 0\nv 0 1 0\nv 0 0 1\nf 1/1/1 2/2/2 3/3/3 4/4/4\nf -1 -5 -4\n")
+
+    faces = load_obj(str(path), min_mesh_faces=3)
+    assert len(list(get_faces(faces))) == 2
+
+    mesh = load_obj(str(path), min_mesh_faces=2)
+    assert len(list(get_faces(mesh))) == 1
+    vertices, triangles = tessellate(mesh)
+    assert len(vertices) == 5
+    assert sorted(triangles) == [(0, 1, 2), (0, 2, 3), (4, 0, 1)]
+
+
 def test_part_get_scad():
     """Load an OpenSCAD part"""
     scad_path = shutil.which("openscad")
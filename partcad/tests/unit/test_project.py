@@ -8,7 +8,17 @@
 # Licensed under Apache License, Version 2.0.
 #
 
+import hashlib
+import http.server
+import io
 import os
+import shutil
+import subprocess
+import tarfile
+import threading
+from unittest.mock import patch
+
+import pytest
 
 import partcad as pc
 
@@ -69,3 +79,161 @@ def test_project_import_tar2():
     factory = pc.ProjectFactoryTar(ctx, None, test_config_import_tar)
     assert factory.project is not None
     assert os.path.exists(factory.project.path)
+
+
+def test_project_import_git_local(tmp_path):
+    def git(*args):
+        return subprocess.check_output(["git", "-C", str(tmp_path / "repo"), *args], text=True).strip()
+
+    (tmp_path / "repo").mkdir()
+    git("init", "-q", "-b", "main")
+    git("config", "user.email", "test@partcad.org")
+    git("config", "user.name", "test")
+    for version in ("v1", "v2"):
+        (tmp_path / "repo" / "partcad.yaml").write_text(f"desc: {version}\n")
+        git("add", "partcad.yaml")
+        git("commit", "-q", "-m", version)
+        git("tag", version)
+    first = git("rev-parse", "--short", "v1")
+
+    user_config = pc.UserConfig()
+    user_config.internal_state_dir = str(tmp_path / "state")
+    ctx = pc.Context("examples/produce_part_step", user_config=user_config)
+    url = (tmp_path / "repo").as_uri()
+
+    def import_git(name, revision=None):
+        config = {"name": name, "type": "git", "url": url}
+        if revision is not None:
+            config["revision"] = revision
+        with patch.object(ctx, "is_connected", return_value=True):
+            return ctx.import_project(None, config)
+
+    assert import_git("//head").desc == "v2"
+    assert import_git("//tag", "v1").desc == "v1"
+    assert import_git("//commit", first).desc == "v1"
+
+    # All revisions are checked out from the same mirror
+    mirrors = os.listdir(tmp_path / "state" / "git" / ".mirrors")
+    assert len(mirrors) == 1
+    worktrees = subprocess.check_output(
+        ["git", "-C", str(tmp_path / "state" / "git" / ".mirrors" / mirrors[0]), "worktree", "list"], text=True
+    )
+    assert len(worktrees.splitlines()) == 4
+
+    # The default branch is updated on request
+    (tmp_path / "repo" / "partcad.yaml").write_text("desc: v3\n")
+    git("commit", "-q", "-am", "v3")
+    user_config.force_update = True
+    assert import_git("//updated").desc == "v3"
+
+    # The worktrees are checked out again if the mirror is removed
+    shutil.rmtree(tmp_path / "state" / "git" / ".mirrors")
+    assert import_git("//restored").desc == "v3"
+
+
+class TarballHandler(http.server.BaseHTTPRequestHandler):
+    """Serves the tarball with range support, and cuts the first response short if asked to"""
+
+    def do_GET(self):
+        server = self.server
+        data = server.tarball
+        server.requests.append(self.headers.get("Range"))
+        start = 0
+        if self.headers.get("Range"):
+            start = int(self.headers["Range"].split("=")[1].split("-")[0])
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(data) - start))
+        self.end_headers()
+        if server.cut_after is not None:
+            self.wfile.write(data[start : server.cut_after])
+            server.cut_after = None
+            self.close_connection = True
+            return
+        self.wfile.write(data[start:])
+
+    def log_message(self, *_args):
+        pass
+
+
+def test_project_import_tar_local(tmp_path):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as tar:
+        for name, content in (("pkg/partcad.yaml", b"desc: tarball\n"), ("pkg/data.bin", os.urandom(256 * 1024))):
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            tar.addfile(info, io.BytesIO(content))
+    tarball = buffer.getvalue()
+    sha256 = hashlib.sha256(tarball).hexdigest()
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), TarballHandler)
+    server.tarball = tarball
+    server.requests = []
+    server.cut_after = len(tarball) // 2
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    user_config = pc.UserConfig()
+    user_config.internal_state_dir = str(tmp_path / "state")
+    user_config.set("tar.download.retry.patience", 0.0)
+    ctx = pc.Context("examples/produce_part_step", user_config=user_config)
+
+    def import_tar(name, checksum):
+        config = {
+            "name": name,
+            "type": "tar",
+            "url": f"http://127.0.0.1:{server.server_port}/pkg.tar.gz",
+            "relPath": "pkg",
+            "sha256": checksum,
+        }
+        return ctx.import_project(None, config)
+
+    cache_dir = tmp_path / "state" / "tar"
+    try:
+        # A wrong checksum leaves nothing behind
+        with pytest.raises(RuntimeError, match="Checksum mismatch"):
+            import_tar("//wrong", "0" * 64)
+        assert [f for f in os.listdir(cache_dir) if not f.endswith(".lock")] == []
+
+        # The interrupted download is resumed
+        server.requests.clear()
+        server.cut_after = len(tarball) // 2
+        assert import_tar("//tarball", sha256).desc == "tarball"
+        assert len(server.requests) == 2 and server.requests[0] is None
+        assert 0 < int(server.requests[1][len("bytes=") : -1]) <= len(tarball) // 2
+
+        # Downloaded and extracted once
+        server.requests.clear()
+        assert import_tar("//again", sha256).desc == "tarball"
+        assert server.requests == []
+    finally:
+        server.shutdown()
+
+
+def test_project_lazy_loading():
+    user_config = pc.UserConfig()
+    user_config.lazy_loading = True
+    ctx = pc.Context("examples/produce_part_cadquery_primitive", user_config=user_config)
+    prj = ctx.get_project("")
+    # Nothing is instantiated, but all objects can be listed
+    assert prj.parts == {}
+    descs = prj.get_part_descs()
+    assert descs["cube"] == "This is a cube from examples"
+    assert descs["box"] == "Alias to cube"
+    assert ctx.stats_parts == len(descs)
+
+    # Only the requested objects are instantiated
+    assert prj.get_part("cube_enrich") is not None
+    assert "cube_enrich" in prj.parts
+    assert "cylinder" not in prj.parts
+    assert prj.get_part("box") is not None
+    assert prj.parts["box"].desc == "Alias to cube"
+
+
+def test_project_eager_loading():
+    user_config = pc.UserConfig()
+    user_config.lazy_loading = False
+    ctx = pc.Context("examples/produce_part_cadquery_primitive", user_config=user_config)
+    prj = ctx.get_project("")
+    assert set(prj.parts.keys()) == set(prj.get_part_descs().keys())
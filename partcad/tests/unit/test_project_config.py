@@ -8,7 +8,13 @@
 # Licensed under Apache License, Version 2.0.
 #
 
+import os
+import types
+
 import partcad as pc
+from partcad import cache_package_index
+from partcad.cache_package_index import PackageIndex, get_package_index
+from partcad.project_config import TEMPLATE_CONSTANTS, Configuration
 
 
 def test_project_config_version_1():
@@ -62,3 +68,73 @@ def test_project_config_template_override():
     # the package is called.
     part = ctx._get_part("//that:defined")
     assert not part is None
+
+
+def test_project_config_index(tmp_path, monkeypatch):
+    user_config = types.SimpleNamespace(internal_state_dir=str(tmp_path), cache_dependencies_paranoid=False)
+    index = get_package_index(user_config)
+    monkeypatch.setattr(cache_package_index, "RACY_INTERVAL", 0.0)
+
+    def write_file(path, data: str, mtime_ns: int) -> None:
+        path.write_text(data)
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+    write_file(tmp_path / "partcad.yaml", 'parts:\n  {% include "part.yaml" %}\n', 10**18)
+    write_file(tmp_path / "part.yaml", "cube: {type: cadquery}\n", 10**18)
+    (tmp_path / "sub").mkdir()
+    write_file(tmp_path / "sub" / "partcad.yaml", "parts:\n  sphere: {type: cadquery}\n", 10**18)
+
+    def load(path) -> dict:
+        return Configuration("//test", str(path), user_config=user_config).config_obj
+
+    assert "cube" in load(tmp_path)["parts"]
+    assert "sphere" in load(tmp_path / "sub")["parts"]
+    assert index.get_stats() == {"hits": 0, "misses": 2}
+
+    # Nothing changed, nothing is parsed again
+    assert "cube" in load(tmp_path)["parts"]
+    assert "sphere" in load(tmp_path / "sub")["parts"]
+    assert index.get_stats() == {"hits": 2, "misses": 2}
+
+    # Only the package including the touched file is parsed again
+    write_file(tmp_path / "part.yaml", "box: {type: cadquery}\n", 10**18 + 1)
+    assert "box" in load(tmp_path)["parts"]
+    assert "sphere" in load(tmp_path / "sub")["parts"]
+    assert index.get_stats() == {"hits": 3, "misses": 3}
+
+    # The snapshot is persistent and returns copies that can be modified
+    load(tmp_path)["parts"]["box"]["type"] = "build123d"
+    snapshot = PackageIndex(tmp_path / "cache").lookup(str(tmp_path / "partcad.yaml"), "//test", [], TEMPLATE_CONSTANTS)
+    assert snapshot == {"parts": {"box": {"type": "cadquery"}}}
+
+
+def test_project_config_index_dependencies(tmp_path, monkeypatch):
+    user_config = types.SimpleNamespace(internal_state_dir=str(tmp_path), cache_dependencies_paranoid=False)
+    index = get_package_index(user_config)
+    monkeypatch.setattr(cache_package_index, "RACY_INTERVAL", 0.0)
+
+    def write_file(path, data: str, mtime_ns: int) -> None:
+        path.write_text(data)
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "common").mkdir()
+    write_file(tmp_path / "pkg" / "partcad.yaml", 'parts:\n  {% include "part.yaml" %}\n', 10**18)
+    write_file(tmp_path / "common" / "part.yaml", "cube: {type: cadquery}\n", 10**18)
+
+    def load() -> dict:
+        return Configuration("//test", str(tmp_path / "pkg"), ["../common"], user_config=user_config).config_obj
+
+    assert "cube" in load()["parts"]
+    assert "cube" in load()["parts"]
+    assert index.get_stats() == {"hits": 1, "misses": 1}
+
+    # Touched without any change to the content
+    write_file(tmp_path / "common" / "part.yaml", "cube: {type: cadquery}\n", 10**18 + 1)
+    assert "cube" in load()["parts"]
+    assert index.get_stats() == {"hits": 2, "misses": 1}
+
+    # A template created in the package directory takes precedence over the include path
+    write_file(tmp_path / "pkg" / "part.yaml", "box: {type: cadquery}\n", 10**18)
+    assert "box" in load()["parts"]
+    assert index.get_stats() == {"hits": 2, "misses": 2}
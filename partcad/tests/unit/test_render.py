@@ -8,6 +8,8 @@
 # Licensed under Apache License, Version 2.0.
 #
 
+import asyncio
+import os
 import platform
 import pytest
 import tempfile
@@ -67,3 +69,85 @@ def test_render_project():
     assert prj is not None
     output_dir = tempfile.mkdtemp()
     prj.render(output_dir=output_dir)
+
+
+@pytest.mark.slow
+def test_render_mesh():
+    """Render a part into several mesh formats out of one tessellation"""
+    ctx = pc.init("examples")
+    prj = ctx.get_project("//produce_part_step")
+    bolt = prj.get_part("bolt")
+    assert bolt is not None
+    output_dir = tempfile.mkdtemp()
+    asyncio.run(bolt.render_mesh_async(ctx, ["stl", "obj", "threejs"], prj, output_dir))
+    for extension in ["stl", "obj", "json"]:
+        path = os.path.join(output_dir, "bolt.%s" % extension)
+        assert os.path.exists(path) and os.path.getsize(path) > 0
+
+
+@pytest.mark.slow
+def test_render_batch():
+    """Render several shapes in several formats in one render server"""
+    from partcad.render_server import render_batch_async
+
+    ctx = pc.init("examples")
+    bolt = ctx.get_part("//produce_part_step:bolt")
+    box = ctx.get_part("//produce_part_brep:box")
+    assert bolt is not None and box is not None
+    output_dir = tempfile.mkdtemp()
+    jobs = [
+        (bolt, "svg", os.path.join(output_dir, "bolt.svg"), {}),
+        (bolt, "stl", os.path.join(output_dir, "bolt.stl"), {"tolerance": 0.5}),
+        (bolt, "obj", os.path.join(output_dir, "bolt.obj"), {}),
+        (box, "brep", os.path.join(output_dir, "box.brep"), {}),
+        (box, "stl", os.path.join(output_dir, "box.stl"), {}),
+    ]
+    reported = []
+    results = asyncio.run(
+        render_batch_async(ctx, jobs, on_result=lambda shape, format, path, result: reported.append(path))
+    )
+    assert sorted(reported) == sorted(path for _shape, _format, path, _options in jobs)
+    for (_shape, _format, path, _options), result in zip(jobs, results):
+        assert result["success"], result["exception"]
+        assert os.path.exists(path) and os.path.getsize(path) > 0
+
+
+@pytest.mark.slow
+def test_render_batch_svg_png():
+    """Render the SVG and PNG images of a shape out of one projection"""
+    if platform.system() == "Windows":
+        pytest.skip("Rendering to PNG is not supported in Windows CI due to Cairo")
+    from partcad.render_server import render_batch_async
+
+    ctx = pc.init("examples")
+    bolt = ctx.get_part("//produce_part_step:bolt")
+    assert bolt is not None
+    output_dir = tempfile.mkdtemp()
+    jobs = [
+        (bolt, "svg", os.path.join(output_dir, "bolt.svg"), {}),
+        (bolt, "png", os.path.join(output_dir, "png", "bolt.png"), {"width": 128, "height": 256}),
+    ]
+    results = asyncio.run(render_batch_async(ctx, jobs))
+    for (_shape, _format, path, _options), result in zip(jobs, results):
+        assert result["success"], result["exception"]
+        assert os.path.exists(path) and os.path.getsize(path) > 0
+
+
+@pytest.mark.slow
+def test_render_svg_mesh(tmp_path, monkeypatch):
+    """Render an OBJ part loaded as a single triangulated face to SVG"""
+    from partcad.part_factory_obj import PartFactoryObj
+
+    monkeypatch.setattr(PartFactoryObj, "MIN_MESH_FACES", 1)
+    (tmp_path / "partcad.yaml").write_text("parts:\n  cube:\n    type: obj\n")
+    (tmp_path / "cube.obj").write_text(
+        "v 0 0 0\nv 1 0 0\nv 1 1 0\nv 0 1 0\nv 0 0 1\nv 1 0 1\nv 1 1 1\nv 0 1 1\n"
+        "f 1 4 3 2\nf 5 6 7 8\nf 1 2 6 5\nf 2 3 7 6\nf 3 4 8 7\nf 4 1 5 8\n"
+    )
+    ctx = pc.Context(str(tmp_path))
+    cube = ctx.get_part("//:cube")
+    assert cube is not None
+    path = str(tmp_path / "cube.svg")
+    cube.render(ctx, "svg", filepath=path)
+    with open(path) as f:
+        assert "<line" in f.read()
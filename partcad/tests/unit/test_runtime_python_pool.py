@@ -0,0 +1,87 @@
+#
+# PartCAD, 2025
+#
+# Licensed under Apache License, Version 2.0.
+#
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+from partcad.runtime_python_pool import PythonWorkerPool, WorkerError
+
+SCRIPT = """
+import os
+import sys
+
+request = sys.stdin.read()
+sys.stdout.write("%s:%s:%s" % (os.getpid(), request, ",".join(sys.argv[1:])))
+if request == "fail":
+    raise RuntimeError("job failure")
+if request == "crash":
+    os._exit(3)
+"""
+
+
+@pytest.fixture
+def script_path():
+    with tempfile.NamedTemporaryFile("w", suffix=".py", delete=False) as f:
+        f.write(SCRIPT)
+    yield f.name
+    os.unlink(f.name)
+
+
+def test_worker_pool_reuses_workers(script_path):
+    pool = PythonWorkerPool([sys.executable], size=1, max_jobs=0, preload=[])
+    try:
+        stdout1, stderr1 = pool.run([script_path, "a"], b"first")
+        stdout2, stderr2 = pool.run([script_path, "b"], b"second")
+        pid1, request1, args1 = stdout1.decode().split(":")
+        pid2, request2, args2 = stdout2.decode().split(":")
+        assert (request1, args1) == ("first", "a")
+        assert (request2, args2) == ("second", "b")
+        assert stderr1 == b"" and stderr2 == b""
+        assert pid1 == pid2
+        assert pool.stats_spawned == 1
+    finally:
+        pool.close()
+
+
+def test_worker_pool_recycles_workers(script_path):
+    pool = PythonWorkerPool([sys.executable], size=1, max_jobs=2, preload=[])
+    try:
+        pids = [pool.run([script_path], b"x")[0].decode().split(":")[0] for _ in range(4)]
+        assert pids[0] == pids[1]
+        assert pids[1] != pids[2]
+        assert pids[2] == pids[3]
+        assert pool.stats_recycled == 2
+    finally:
+        pool.close()
+
+
+def test_worker_pool_job_failure(script_path):
+    pool = PythonWorkerPool([sys.executable], size=1, preload=[])
+    try:
+        _, stderr = pool.run([script_path], b"fail")
+        assert b"job failure" in stderr
+        # The worker survives exceptions raised by the job
+        stdout, _ = pool.run([script_path], b"ok")
+        assert stdout.decode().split(":")[1] == "ok"
+        assert pool.stats_spawned == 1
+    finally:
+        pool.close()
+
+
+def test_worker_pool_worker_crash(script_path):
+    pool = PythonWorkerPool([sys.executable], size=1, preload=[])
+    try:
+        with pytest.raises(WorkerError):
+            pool.run([script_path], b"crash")
+        # A new worker replaces the crashed one
+        stdout, _ = pool.run([script_path], b"ok")
+        assert stdout.decode().split(":")[1] == "ok"
+        assert pool.stats_spawned == 2
+    finally:
+        pool.close()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+#
+# PartCAD, 2025
+#
+# Licensed under Apache License, Version 2.0.
+#
+
+import asyncio
+
+import partcad as pc
+from partcad.scheduler import BuildScheduler
+
+
+def test_scheduler_assembly():
+    user_config = pc.UserConfig()
+    user_config.cache = False
+    # Not the context shared with other tests, which may have the parts built already
+    pc.fini()
+    ctx = pc.init("examples", user_config=user_config)
+    logo = ctx._get_assembly("//produce_assembly_assy:logo_embedded")
+    assert logo is not None
+
+    async def build():
+        scheduler = BuildScheduler(ctx, jobs=2)
+        job = await scheduler.add_shape(logo)
+        await scheduler.run()
+        return scheduler, job
+
+    scheduler, job = asyncio.run(build())
+
+    def get_parts(job):
+        if job.kind == "part":
+            return [job]
+        return [part for dependency in job.dependencies for part in get_parts(dependency)]
+
+    # Each part is built once, before the assemblies containing it
+    parts = sorted(part.name.split(":")[-1] for part in get_parts(job))
+    assert parts == ["bolt", "bone", "head_half"]
+    assert len(scheduler.jobs) == 6
+
+    # The parts of the embedded assembly are on the critical path
+    head_half = [part for part in get_parts(job) if part.name.endswith(":head_half")][0]
+    assert head_half.priority == max(j.priority for j in scheduler.jobs.values())
+
+    assert all(j.done and j.error is None for j in scheduler.jobs.values())
+    assert job.result is not None
+
+
+def test_scheduler_limits():
+    scheduler = BuildScheduler(None, jobs=2, max_memory=100)
+    running = []
+    seen_running = {}
+    order = []
+
+    def make_action(name):
+        async def action():
+            running.append(name)
+            order.append(name)
+            await asyncio.sleep(0.01)
+            seen_running[name] = list(running)
+            running.remove(name)
+            return name
+
+        return action
+
+    jobs = {}
+    for name, memory in [("short", 10), ("long1", 10), ("long2", 10), ("big", 100)]:
+        jobs[name] = scheduler.add_task("test", name, make_action(name))
+        jobs[name].memory = memory
+    # "long1" -> "long2" is the critical path
+    jobs["long2"].add_dependency(jobs["long1"])
+
+    asyncio.run(scheduler.run())
+
+    assert order[0] == "long1"
+    assert order.index("long2") > order.index("long1")
+    assert max(len(names) for names in seen_running.values()) <= 2
+    # The big job doesn't fit in memory with any other job
+    assert seen_running["big"] == ["big"]
+    assert all(job.result == name for name, job in jobs.items())
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+#
+# PartCAD, 2025
+#
+# Licensed under Apache License, Version 2.0.
+#
+
+import asyncio
+import threading
+
+from OCP.BRepBuilderAPI import BRepBuilderAPI_MakeFace
+from OCP.BRepGProp import BRepGProp
+from OCP.GProp import GProp_GProps
+from OCP.gp import gp_Pln
+
+from partcad.part_factory_extrude import extrude
+from partcad.sync_processes import ProcessPoolManager
+
+
+def get_volume(shape):
+    props = GProp_GProps()
+    BRepGProp.VolumeProperties_s(shape, props)
+    return props.Mass()
+
+
+def test_process_pool_run():
+    face = BRepBuilderAPI_MakeFace(gp_Pln(), 0.0, 2.0, 0.0, 3.0).Face()
+    manager = ProcessPoolManager(2)
+    try:
+        shape = asyncio.run(manager.run(extrude, face, 4.0))
+        shapes = manager.map(extrude, [(face, 1.0), (face, 2.0)])
+    finally:
+        manager.shutdown()
+
+    assert abs(get_volume(shape) - 24.0) < 1e-6
+    assert [round(get_volume(s), 6) for s in shapes] == [6.0, 12.0]
+
+
+def test_process_pool_disabled():
+    face = BRepBuilderAPI_MakeFace(gp_Pln(), 0.0, 2.0, 0.0, 3.0).Face()
+    manager = ProcessPoolManager(0)
+    assert not manager.is_enabled()
+
+    shape = asyncio.run(manager.run(extrude, face, 4.0))
+    assert abs(get_volume(shape) - 24.0) < 1e-6
+    assert manager.executor is None
+
+
+def get_lock_type(lock, value):
+    return type(lock).__name__, value
+
+
+def test_process_pool_unpicklable():
+    """Arguments that can't be passed to a worker process are processed in the current process"""
+    lock = threading.Lock()
+    manager = ProcessPoolManager(2)
+    try:
+        result = asyncio.run(manager.run(get_lock_type, lock, 1))
+        results = manager.map(get_lock_type, [(lock, 1), (lock, 2)])
+    finally:
+        manager.shutdown()
+
+    assert result == ("lock", 1)
+    assert results == [("lock", 1), ("lock", 2)]
+    # The pool is not started for nothing
+    assert manager.executor is None
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+#
+# PartCAD, 2025
+#
+# Licensed under Apache License, Version 2.0.
+#
+
+import json
+
+import numpy as np
+from OCP.BRepAlgoAPI import BRepAlgoAPI_Fuse
+from OCP.BRepPrimAPI import BRepPrimAPI_MakeBox, BRepPrimAPI_MakeSphere
+from OCP.gp import gp_Ax1, gp_Dir, gp_Pnt, gp_Trsf, gp_Vec
+from OCP.TopLoc import TopLoc_Location
+
+from partcad.part_factory_obj import parse_obj
+from partcad.utils_ocp import get_tessellation_arrays, tessellate, write_obj, write_threejs
+
+
+def get_shape():
+    shape = BRepAlgoAPI_Fuse(BRepPrimAPI_MakeSphere(10).Shape(), BRepPrimAPI_MakeBox(12, 3, 4).Shape()).Shape()
+    trsf = gp_Trsf()
+    trsf.SetRotation(gp_Ax1(gp_Pnt(), gp_Dir(1, 1, 0)), 0.7)
+    trsf.SetTranslationPart(gp_Vec(5, 6, 7))
+    return shape.Moved(TopLoc_Location(trsf))
+
+
+def test_tessellation_arrays():
+    shape = get_shape()
+    vertices, triangles = tessellate(shape, 0.1, 0.1)
+    vertex_array, triangle_array = get_tessellation_arrays(shape)
+
+    assert vertex_array.dtype == np.float32 and triangle_array.dtype == np.uint32
+    assert np.allclose(vertex_array, np.array(vertices), atol=1e-4)
+    assert (triangle_array == np.array(triangles)).all()
+
+
+def test_tessellation_writers(tmp_path):
+    shape = get_shape()
+    tessellate(shape, 0.1, 0.1)
+    vertices, triangles = get_tessellation_arrays(shape)
+
+    write_obj(str(tmp_path / "shape.obj"), vertices, triangles)
+    obj_vertices, obj_indices, obj_counts = parse_obj(str(tmp_path / "shape.obj"))
+    assert np.allclose(obj_vertices, vertices, atol=1e-4)
+    assert (obj_indices.reshape(-1, 3) == triangles).all()
+
+    write_threejs(str(tmp_path / "shape.json"), vertices, triangles)
+    with open(tmp_path / "shape.json") as f:
+        threejs = json.load(f)
+    assert threejs["nVertices"] == len(vertices) and threejs["nFaces"] == len(triangles)
+    assert threejs["faces"][0] == [0, *triangles[0].tolist()]
+
+    write_threejs(str(tmp_path / "shape.json"), vertices, triangles, buffer_geometry=True)
+    with open(tmp_path / "shape.json") as f:
+        geometry = json.load(f)["data"]
+    assert np.allclose(geometry["attributes"]["position"]["array"], vertices.ravel(), rtol=1e-6)
+    assert geometry["index"]["array"] == triangles.ravel().tolist()
+
+
+def test_tessellation_obj_precision(tmp_path):
+    """OBJ files keep the coordinates far from the origin as precise as computed"""
+    shape = BRepPrimAPI_MakeBox(gp_Pnt(12345.6789, 0, 0), 1, 1, 1).Shape()
+    vertices, triangles = tessellate(shape, 0.1, 0.1)
+    vertex_array, triangle_array = get_tessellation_arrays(shape, "float64")
+    assert vertex_array.dtype == np.float64
+
+    write_obj(str(tmp_path / "shape.obj"), vertex_array, triangle_array)
+    with open(tmp_path / "shape.obj") as f:
+        lines = [line for line in f.read().splitlines() if line.startswith("v ")]
+    assert lines == ["v %.4f %.4f %.4f" % tuple(vertex) for vertex in vertices]
+    assert "v 12345.6789 0.0000 0.0000" in lines